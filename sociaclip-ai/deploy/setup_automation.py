@@ -4,10 +4,17 @@ SociaClip AI - Automation Setup
 Sets up cron jobs for automated daily posting
 """
 
+import importlib.util
 import json
+import os
+import shutil
 import subprocess
+import sys
 from datetime import datetime
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISPATCHER_PID_FILE = os.path.join(PROJECT_ROOT, "data", "publish_dispatcher.pid")
+
 def setup_daily_automation():
     """Set up cron jobs for daily automated posting"""
     
@@ -29,17 +36,18 @@ def setup_daily_automation():
         "enabled": True
     }
     
-    # Schedule posting reminder at 8:30 AM  
-    posting_reminder_job = {
-        "name": "SociaClip AI - Posting Reminder", 
+    # Check on the publish dispatcher at 6:30 AM, after content generation
+    # (launched by this setup, it watches data/scheduled_posts and fires each post at its UTC time)
+    publish_dispatcher_job = {
+        "name": "SociaClip AI - Publish Dispatcher", 
         "schedule": {
             "kind": "cron",
-            "expr": "30 8 * * *",  # 8:30 AM daily
+            "expr": "30 6 * * *",  # 6:30 AM daily, after content generation
             "tz": "UTC"
         },
         "payload": {
             "kind": "systemEvent", 
-            "text": "📱 SociaClip AI: Daily posts are ready for publishing! Check scheduled posts and initiate cross-platform posting workflow."
+            "text": "📱 SociaClip AI: Daily posts are scheduled! The publish dispatcher picks up today's data/scheduled_posts file automatically; if it is not running, start it with deploy/setup_automation.py."
         },
         "sessionTarget": "main",
         "enabled": True
@@ -61,7 +69,7 @@ def setup_daily_automation():
         "enabled": True
     }
     
-    jobs = [content_generation_job, posting_reminder_job, analytics_job]
+    jobs = [content_generation_job, publish_dispatcher_job, analytics_job]
     
     for job in jobs:
         try:
@@ -84,11 +92,57 @@ def setup_daily_automation():
     print("📋 Next steps:")
     print("   1. Use OpenClaw cron commands to add these jobs")
     print("   2. Set up social media API credentials") 
-    print("   3. Configure posting automation")
+    print("   3. Register platform publishers with the publish dispatcher")
     print("   4. Test the workflow with manual run")
     
     return jobs
 
+def launch_publish_dispatcher() -> int:
+    """Start the publish dispatcher in the background (once), watching the scheduled posts directory"""
+    
+    try:
+        with open(DISPATCHER_PID_FILE, 'r') as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        print(f"📤 Publish dispatcher already running (pid {pid})")
+        return pid
+    except (OSError, ValueError):
+        pass
+    
+    log_dir = os.path.join(PROJECT_ROOT, "data", "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(os.path.join(PROJECT_ROOT, "data", "scheduled_posts"), exist_ok=True)
+    
+    with open(os.path.join(log_dir, "publish_dispatcher.log"), 'a') as log:
+        process = subprocess.Popen(
+            [sys.executable, "-u", os.path.join("src", "publish_dispatcher.py"), "--watch", "data/scheduled_posts"],
+            cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            start_new_session=True  # keeps running after setup exits
+        )
+    
+    with open(DISPATCHER_PID_FILE, 'w') as f:
+        f.write(str(process.pid))
+    
+    print(f"📤 Started publish dispatcher (pid {process.pid}), log: data/logs/publish_dispatcher.log")
+    return process.pid
+
+def check_dependencies() -> dict:
+    """Report the media dependencies; without them clips fall back to metadata-only analysis"""
+    
+    checks = {
+        "ffmpeg": shutil.which(os.environ.get("SOCIACLIP_FFMPEG", "ffmpeg")) is not None,
+        "ffprobe": shutil.which(os.environ.get("SOCIACLIP_FFPROBE", "ffprobe")) is not None,
+        "numpy": importlib.util.find_spec("numpy") is not None
+    }
+    
+    print("🔍 Checking media dependencies...")
+    for name, found in checks.items():
+        print(f"   {'✅' if found else '⚠️'} {name}{'' if found else ' not found'}")
+    if not all(checks.values()):
+        print("   Install ffmpeg with your package manager and Python packages with: pip install -r deploy/requirements.txt")
+    
+    return checks
+
 def create_deployment_config():
     """Create deployment configuration file"""
     
@@ -149,9 +203,15 @@ def main():
     print("🚀 SociaClip AI - Deployment Setup")
     print("=" * 50)
     
+    # Video processing needs ffmpeg and NumPy
+    check_dependencies()
+    
     # Setup automation
     jobs = setup_daily_automation()
     
+    # Publish scheduled posts at their times
+    launch_publish_dispatcher()
+    
     # Create deployment config
     config = create_deployment_config()
     
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Caption Backend Module
+Pluggable model backends for caption bodies, a batching client and a local stand-in model server
+"""
+
+import json
+import os
+import threading
+import time
+import requests
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from generation_seed import request_rng
+
+def build_caption_prompt(request: Dict) -> str:
+    """Build the instruction for one caption body request"""
+
+    return (
+        f"Write the main body of a {request.get('platform', 'instagram')} caption for a "
+        f"{request.get('niche', 'general')} video.\n"
+        f"Title: {request.get('title', '')}\n"
+        f"Description: {request.get('description', '')}\n"
+        f"Content strategy: {request.get('strategy', 'storytelling')}\n"
+        f"Keep it under {request.get('max_length', 300)} characters. "
+        f"Do not include a hook, call-to-action or hashtags."
+    )
+
+class CaptionBackend(ABC):
+    """Interface for caption model backends used by the batching client"""
+
+    name = "base"
+
+    @abstractmethod
+    def generate_batch(self, caption_requests: List[Dict], timeout: float = None) -> List[Optional[str]]:
+        """Return one caption body (or None) per request, in order"""
+
+class HTTPCaptionBackend(CaptionBackend):
+    """Backend for a caption service speaking the batched /v1/captions protocol"""
+
+    name = "http"
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8765", model: str = "local-stand-in",
+                 api_key: str = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.session = requests.Session()
+
+    def generate_batch(self, caption_requests: List[Dict], timeout: float = None) -> List[Optional[str]]:
+        """Send the whole batch in one POST"""
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        payload = {
+            "model": self.model,
+            "requests": [
+                {"id": i, "prompt": build_caption_prompt(request), "request": request}
+                for i, request in enumerate(caption_requests)
+            ]
+        }
+
+        response = self.session.post(f"{self.base_url}/v1/captions", json=payload,
+                                     headers=headers, timeout=timeout)
+        response.raise_for_status()
+
+        captions = {item["id"]: item.get("text") for item in response.json().get("captions", [])}
+        return [captions.get(i) for i in range(len(caption_requests))]
+
+class AnthropicCaptionBackend(CaptionBackend):
+    """Backend that writes a whole batch of captions in a single Claude Messages API call"""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str = None, model: str = None, max_tokens: int = 4096,
+                 base_url: str = "https://api.anthropic.com/v1/messages"):
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        self.model = model or os.environ.get("SOCIACLIP_CAPTION_MODEL", "claude-3-5-haiku-latest")
+        self.max_tokens = max_tokens
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def generate_batch(self, caption_requests: List[Dict], timeout: float = None) -> List[Optional[str]]:
+        """Ask for a JSON array with one caption body per numbered request"""
+
+        if not self.api_key:
+            raise ValueError("ANTHROPIC_API_KEY is not set")
+
+        numbered = "\n\n".join(
+            f"Request {i + 1}:\n{build_caption_prompt(request)}" for i, request in enumerate(caption_requests)
+        )
+        prompt = (
+            f"{numbered}\n\nAnswer with only a JSON array of {len(caption_requests)} strings, "
+            f"one caption body per request, in order."
+        )
+
+        response = self.session.post(
+            self.base_url,
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            },
+            json={
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "messages": [{"role": "user", "content": prompt}]
+            },
+            timeout=timeout
+        )
+        response.raise_for_status()
+
+        text = "".join(block.get("text", "") for block in response.json().get("content", []))
+        captions = json.loads(text[text.index("["):text.rindex("]") + 1])
+        if len(captions) != len(caption_requests):
+            raise ValueError(f"Expected {len(caption_requests)} captions, got {len(captions)}")
+
+        return [str(caption) if caption else None for caption in captions]
+
+class BatchingCaptionClient:
+    """Coalesces caption requests from many callers into few backend calls"""
+
+    def __init__(self, backend: CaptionBackend, max_batch_size: int = 16,
+                 max_wait_seconds: float = 0.02, max_concurrency: int = 4,
+                 timeout_seconds: float = 30.0, fallback_backend: CaptionBackend = None):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.timeout_seconds = timeout_seconds
+        self.fallback_backend = fallback_backend
+        self.max_concurrency = max_concurrency
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._executor = None
+        self._collector = None
+        self._closed = False
+
+        self.stats = {"requests": 0, "batches": 0, "backend_failures": 0, "fallbacks": 0, "unfilled": 0}
+
+    def submit(self, request: Dict) -> Future:
+        """Queue one caption request; the future resolves to text or None (use the template path)"""
+
+        future = Future()
+        with self._condition:
+            if self._collector is None:
+                # Started on first use, and again after close() when the owning pipeline runs again
+                self._closed = False
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix="caption-batch")
+                self._collector = threading.Thread(target=self._collect_loop, name="caption-collector", daemon=True)
+                self._collector.start()
+
+            self._pending.append((request, future))
+            self.stats["requests"] += 1
+            if len(self._pending) >= self.max_batch_size:
+                self._condition.notify_all()
+
+        return future
+
+    def generate_many(self, caption_requests: List[Dict]) -> List[Optional[str]]:
+        """Generate caption bodies for a list of requests, None where every backend failed"""
+
+        futures = [self.submit(request) for request in caption_requests]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Flush queued requests and stop the worker threads (a later submit restarts them)"""
+
+        with self._condition:
+            collector, executor = self._collector, self._executor
+            self._closed = True
+            self._condition.notify_all()
+
+        if collector:
+            collector.join()
+        if executor:
+            executor.shutdown(wait=True)
+
+        with self._condition:
+            if self._collector is collector:
+                self._collector = None
+                self._executor = None
+
+    def _collect_loop(self):
+        """Form batches of up to max_batch_size, waiting at most max_wait_seconds to fill one"""
+
+        with self._condition:
+            while True:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+
+                deadline = time.monotonic() + self.max_wait_seconds
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(timeout=remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                self.stats["batches"] += 1
+                self._executor.submit(self._run_batch, batch)
+
+    def _call_backend(self, backend: CaptionBackend, caption_requests: List[Dict]) -> List[Optional[str]]:
+        """Call a backend, turning errors and malformed replies into None entries"""
+
+        try:
+            texts = backend.generate_batch(caption_requests, timeout=self.timeout_seconds)
+            if len(texts) != len(caption_requests):
+                raise ValueError(f"{backend.name} returned {len(texts)} captions for {len(caption_requests)} requests")
+        except Exception as e:
+            print(f"Caption backend '{backend.name}' failed for {len(caption_requests)} requests: {e}")
+            with self._condition:
+                self.stats["backend_failures"] += 1
+            return [None] * len(caption_requests)
+
+        return [text.strip() if isinstance(text, str) and text.strip() else None for text in texts]
+
+    def _run_batch(self, batch: List):
+        """Resolve one batch of futures"""
+
+        caption_requests = [request for request, _ in batch]
+        texts = self._call_backend(self.backend, caption_requests)
+
+        missing = [i for i, text in enumerate(texts) if text is None]
+        if missing and self.fallback_backend:
+            fallback_texts = self._call_backend(self.fallback_backend, [caption_requests[i] for i in missing])
+            for i, text in zip(missing, fallback_texts):
+                texts[i] = text
+            with self._condition:
+                self.stats["fallbacks"] += len(missing)
+
+        with self._condition:
+            self.stats["unfilled"] += sum(1 for text in texts if text is None)
+
+        for (_, future), text in zip(batch, texts):
+            future.set_result(text)
+
+def build_caption_backend(config: Dict) -> CaptionBackend:
+    """Build one caption backend from its config section"""
+
+    if config["type"] == "http":
+        return HTTPCaptionBackend(config.get("url", "http://127.0.0.1:8765"),
+                                  config.get("model", "local-stand-in"), config.get("api_key"))
+    if config["type"] == "anthropic":
+        return AnthropicCaptionBackend(config.get("api_key"), config.get("model"))
+    raise ValueError(f"Unknown caption backend type: {config['type']}")
+
+def build_caption_client(config: Optional[Dict]) -> Optional[BatchingCaptionClient]:
+    """Build a caption client from a "caption_backend" config section (None keeps templates only)
+
+    An optional "fallback" section (same keys) names a second backend for requests the first one misses.
+    """
+
+    if not config or config.get("type", "template") == "template":
+        return None
+
+    fallback_config = config.get("fallback")
+    fallback_backend = None
+    if fallback_config and fallback_config.get("type", "template") != "template":
+        fallback_backend = build_caption_backend(fallback_config)
+
+    return BatchingCaptionClient(
+        build_caption_backend(config),
+        max_batch_size=config.get("max_batch_size", 16),
+        max_wait_seconds=config.get("max_wait_seconds", 0.02),
+        max_concurrency=config.get("max_concurrency", 4),
+        timeout_seconds=config.get("timeout_seconds", 30.0),
+        fallback_backend=fallback_backend
+    )
+
+class LocalCaptionServer:
+    """Offline stand-in model server for the /v1/captions protocol, built on the template generator"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, latency_seconds: float = 0.05):
+        from enhanced_content_ai import EnhancedContentAI
+
+        self.content_ai = EnhancedContentAI()
+        self.latency_seconds = latency_seconds
+        self.batch_sizes = []
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        """Build the request handler bound to this server instance"""
+        server = self
+
+        class CaptionHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/v1/captions":
+                    self.send_error(404)
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                body = json.dumps({"captions": server.generate(payload.get("requests", []))}).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return CaptionHandler
+
+    def generate(self, items: List[Dict]) -> List[Dict]:
+        """Answer a batch, simulating one model call's latency"""
+
+        self.batch_sizes.append(len(items))
+        time.sleep(self.latency_seconds)
+
+        captions = []
+        for item in items:
+            request = item.get("request", {})
+            rng = request_rng(0, item.get("prompt", ""))
+            strategy = request.get("strategy", "storytelling")
+            niche = request.get("niche", "fitness")
+            concepts = [niche] if strategy == "storytelling" else []
+
+            if strategy == "educational":
+                text = self.content_ai._generate_educational_content("", "", concepts, niche, rng)
+            elif strategy == "viral_focused":
+                text = self.content_ai._generate_viral_content("", "", concepts, niche, rng)
+            else:
+                text = self.content_ai._generate_story_content("", "", concepts, niche, rng)
+
+            title = request.get("title", "")
+            if title and rng.random() < 0.5:
+                text = f"{text} Inspired by: {title}"
+            captions.append({"id": item["id"], "text": text})
+
+        return captions
+
+    def start(self):
+        """Serve in a background thread"""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="caption-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Shut the server down"""
+
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+def main():
+    """Test batched caption generation against the local stand-in server"""
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+        server = LocalCaptionServer(port=port)
+        print(f"🖥️  Local caption server listening on {server.url}")
+        server._server.serve_forever()
+        return
+
+    server = LocalCaptionServer(port=0)
+    server.start()
+    client = BatchingCaptionClient(HTTPCaptionBackend(server.url), max_batch_size=16, max_concurrency=4)
+
+    caption_requests = [
+        {"platform": ["instagram", "tiktok", "youtube_shorts", "twitter"][i % 4],
+         "niche": ["fitness", "business", "technology"][i % 3],
+         "title": f"Trending video {i}", "description": "", "strategy": "storytelling",
+         "max_length": 300}
+        for i in range(100)
+    ]
+
+    print("🤖 Testing Batched Caption Backend...")
+    start = time.perf_counter()
+    texts = client.generate_many(caption_requests)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    client.close()
+    server.stop()
+
+    print(f"   {len(texts)} captions in {elapsed_ms:.0f} ms over {len(server.batch_sizes)} model calls")
+    print(f"   Client stats: {client.stats}")
+    print(f"   Sample: {texts[0]}")
+
+if __name__ == "__main__":
+    main()
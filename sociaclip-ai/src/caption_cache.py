@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Caption Cache Module
+Size-bounded LRU cache of generated posts keyed by a normalized input fingerprint, persisted as JSON
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from caption_templates import TEMPLATE_VERSION
+
+CACHE_FILE_VERSION = 1
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Normalize text so near-identical inputs share a key (case, unicode forms, punctuation, spacing)"""
+
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _NON_WORD.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def caption_fingerprint(video_data: Dict, platform: str, niche: str, engagement_style: str,
+                        viral_tier: int = 0, backend: str = "template", seed: int = 0) -> str:
+    """Fingerprint every input that shapes a generated post"""
+
+    parts = [
+        normalize_text(video_data.get("title", "")),
+        normalize_text(video_data.get("description", "")),
+        platform,
+        niche,
+        engagement_style,
+        str(viral_tier),
+        backend,
+        str(seed),
+        str(TEMPLATE_VERSION)
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class CaptionCache:
+    """LRU cache of generated posts (captions and hashtags) shared across platforms and tenants"""
+
+    def __init__(self, max_entries: int = 5000, path: str = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get a copy of a cached post, refreshing its recency"""
+
+        with self._lock:
+            post = self._entries.get(key)
+            if post is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+
+        post = copy.deepcopy(post)
+        post["created_at"] = datetime.now().isoformat()
+        post["cache_hit"] = True
+        return post
+
+    def put(self, key: str, post: Dict):
+        """Store a copy of a generated post, evicting the least recently used entries"""
+
+        post = copy.deepcopy(post)
+        post.pop("cache_hit", None)
+
+        with self._lock:
+            self._entries[key] = post
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self._dirty = True
+
+    def load(self) -> int:
+        """Load entries persisted by a previous run, dropping ones from older template versions"""
+
+        if not self.path or not os.path.exists(self.path):
+            return 0
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading caption cache {self.path}: {e}")
+            return 0
+
+        if data.get("version") != CACHE_FILE_VERSION or data.get("template_version") != TEMPLATE_VERSION:
+            return 0
+
+        with self._lock:
+            # Persisted least recently used first
+            for key, post in data.get("entries", []):
+                self._entries[key] = post
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = False
+
+        return len(self._entries)
+
+    def save(self, force: bool = False) -> bool:
+        """Persist the cache atomically if it changed since the last load/save"""
+
+        if not self.path or not (self._dirty or force):
+            return False
+
+        with self._lock:
+            data = {
+                "version": CACHE_FILE_VERSION,
+                "template_version": TEMPLATE_VERSION,
+                "saved_at": datetime.now().isoformat(),
+                "entries": list(self._entries.items())
+            }
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, self.path)
+
+        return True
+
+def build_caption_cache(config: Optional[Dict]) -> Optional[CaptionCache]:
+    """Build a caption cache from a "caption_cache" config section"""
+
+    if not config or not config.get("enabled", True):
+        return None
+
+    return CaptionCache(config.get("max_entries", 5000), config.get("path"))
+
+def main():
+    """Test the caption cache in front of the enhanced content generator"""
+    from enhanced_content_ai import EnhancedContentAI
+
+    cache = CaptionCache(max_entries=100)
+    ai = EnhancedContentAI(caption_cache=cache)
+
+    video_data = {
+        "title": "This 30-Second Fitness Transformation Will Blow Your Mind!",
+        "description": "Amazing workout hack that fitness trainers don't want you to know.",
+        "viral_score": 85
+    }
+    # Same source video reused by another tenant with different casing and spacing
+    reused_video = dict(video_data, title="this 30-second  fitness transformation will blow your mind")
+
+    print("🗄️  Testing Caption Cache...")
+    batch = [(video_data, "instagram", "fitness"), (reused_video, "instagram", "fitness"),
+             (video_data, "tiktok", "fitness")]
+    posts = ai.generate_advanced_posts(batch)
+
+    for (_, platform, _), post in zip(batch, posts):
+        print(f"   {platform:<10} cache_hit={post.get('cache_hit', False)}")
+    print(f"   Stats: {cache.stats}, entries: {len(cache)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Caption Length Module
+Platform-specific caption length (weighted characters for X, grapheme clusters elsewhere) and safe truncation
+"""
+
+import re
+import unicodedata
+from typing import Iterator, List, Tuple
+
+# X counts URLs as a fixed-length t.co link
+X_URL_LENGTH = 23
+URL_PATTERN = re.compile(r"https?://\S+")
+
+# Code point classes, precomputed for the BMP and checked by range above it
+_EXTEND = 1        # combining marks, variation selectors, skin tones, tag characters: join the previous cluster
+_ZWJ = 2           # zero width joiner: joins the previous and the next cluster
+_X_LIGHT = 4       # counts 1 on X (Latin and general punctuation); everything else counts 2
+_EMOJI = 8         # emoji base: an emoji cluster counts 2 on X no matter how many code points it has
+_REGIONAL = 16     # regional indicator: pairs form a flag
+
+_X_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+_EMOJI_RANGES = ((0x2300, 0x23FF), (0x2600, 0x27BF), (0x2B00, 0x2BFF), (0x1F000, 0x1FAFF))
+
+def _build_bmp_table() -> bytearray:
+    """Classify every BMP code point once at import"""
+
+    table = bytearray(0x10000)
+    for code in range(0x10000):
+        char = chr(code)
+        flags = 0
+        if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Mc"):
+            flags |= _EXTEND
+        for start, end in _X_LIGHT_RANGES:
+            if start <= code <= end:
+                flags |= _X_LIGHT
+        for start, end in _EMOJI_RANGES:
+            if start <= code <= end:
+                flags |= _EMOJI
+        table[code] = flags
+
+    for code in range(0xFE00, 0xFE10):  # variation selectors
+        table[code] = _EXTEND
+    table[0xFE0F] = _EXTEND | _EMOJI    # emoji presentation selector
+    table[0x20E3] = _EXTEND | _EMOJI    # combining enclosing keycap
+    table[0x200D] = _ZWJ
+    return table
+
+_BMP_TABLE = _build_bmp_table()
+
+def _char_class(code: int) -> int:
+    """Flags for one code point"""
+
+    if code < 0x10000:
+        return _BMP_TABLE[code]
+    if 0x1F1E6 <= code <= 0x1F1FF:
+        return _REGIONAL | _EMOJI
+    if 0x1F3FB <= code <= 0x1F3FF or 0xE0020 <= code <= 0xE007F or 0xE0100 <= code <= 0xE01EF:
+        return _EXTEND
+    if 0x1F000 <= code <= 0x1FAFF:
+        return _EMOJI
+    return 0
+
+def iter_graphemes(text: str) -> Iterator[Tuple[int, int, int]]:
+    """Yield (start, end, flags) for each (extended) grapheme cluster in a single pass
+
+    Covers the cases that show up in captions: combining marks, variation
+    selectors, skin tones, ZWJ emoji sequences, keycaps, tag sequences and
+    flag pairs. flags is the OR of the cluster's code point classes.
+    """
+
+    length = len(text)
+    i = 0
+    while i < length:
+        start = i
+        code = ord(text[i])
+        flags = _char_class(code)
+        i += 1
+
+        if code == 0x0D and i < length and text[i] == "\n":
+            i += 1
+        elif flags & _REGIONAL and i < length and _char_class(ord(text[i])) & _REGIONAL:
+            i += 1
+
+        while i < length:
+            next_flags = _char_class(ord(text[i]))
+            if next_flags & _EXTEND:
+                flags |= next_flags
+                i += 1
+            elif next_flags & _ZWJ:
+                i += 1
+                flags |= _ZWJ
+                if i < length:
+                    flags |= _char_class(ord(text[i]))
+                    i += 1
+            else:
+                break
+
+        yield start, i, flags
+
+def graphemes(text: str) -> List[str]:
+    """Split text into grapheme clusters"""
+
+    return [text[start:end] for start, end, _ in iter_graphemes(text)]
+
+def _cluster_weight(text: str, start: int, end: int, flags: int, platform: str) -> int:
+    """Length of one cluster as the platform counts it"""
+
+    if platform != "twitter":
+        return 1
+    if flags & _EMOJI:
+        return 2
+    cluster = text[start:end]
+    if end - start > 1:
+        # X counts NFC-normalized code points
+        cluster = unicodedata.normalize("NFC", cluster)
+    return sum(1 if _char_class(ord(char)) & _X_LIGHT else 2 for char in cluster)
+
+def platform_length(text: str, platform: str = None) -> int:
+    """Caption length as the platform measures it"""
+
+    if platform != "twitter":
+        return sum(1 for _ in iter_graphemes(text))
+
+    total = 0
+    position = 0
+    for match in URL_PATTERN.finditer(text):
+        total += _weighted_length(text[position:match.start()]) + X_URL_LENGTH
+        position = match.end()
+    return total + _weighted_length(text[position:])
+
+def _weighted_length(text: str) -> int:
+    """X weighted length of text without URLs"""
+
+    return sum(_cluster_weight(text, start, end, flags, "twitter") for start, end, flags in iter_graphemes(text))
+
+def cut_to_length(text: str, budget: int, platform: str = None, min_word_fraction: float = 0.6) -> str:
+    """Longest prefix within budget, ending at a word boundary when that keeps most of the text
+
+    Never splits a grapheme cluster (so emoji sequences stay intact).
+    """
+
+    used = 0
+    cut = 0
+    word_cut = 0
+    word_used = 0
+
+    for start, end, flags in iter_graphemes(text):
+        weight = _cluster_weight(text, start, end, flags, platform)
+        if used + weight > budget:
+            break
+        if text[start:end].isspace():
+            word_cut, word_used = start, used
+        used += weight
+        cut = end
+    else:
+        return text
+
+    if word_cut and word_used >= budget * min_word_fraction:
+        cut = word_cut
+
+    return text[:cut].rstrip()
+
+def truncate_for_platform(text: str, max_length: int, platform: str = None, ellipsis: str = "...") -> str:
+    """Fit text within the platform's max_length, ending with ellipsis when it had to be cut"""
+
+    if platform_length(text, platform) <= max_length:
+        return text
+
+    budget = max(0, max_length - platform_length(ellipsis, platform))
+    return cut_to_length(text, budget, platform) + ellipsis
+
+def main():
+    """Compare code point slicing with platform-aware truncation"""
+    caption = ("🚨 FITNESS TRAINERS HATE THIS TRICK: 👩🏽‍💻 builds strength fast 🇺🇸 "
+               "and this is exactly what everyone needs to see right now 💪🏾🔥")
+
+    print("✂️  Testing Caption Length...")
+    print(f"   Code points: {len(caption)}, graphemes: {platform_length(caption)}, "
+          f"X weighted: {platform_length(caption, 'twitter')}")
+
+    for limit in [40, 60]:
+        sliced = caption[:limit - 3] + "..."
+        safe = truncate_for_platform(caption, limit, "twitter")
+        print(f"   Slice  {limit}: {sliced}")
+        print(f"   Safe   {limit}: {safe} (X length {platform_length(safe, 'twitter')})")
+
+if __name__ == "__main__":
+    main()
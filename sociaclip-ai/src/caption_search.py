@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Caption Candidate Search Module
+Generates several full captions per post in parallel and keeps the top-k by optimization score with diversity
+"""
+
+import copy
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from enhanced_content_ai import EnhancedContentAI
+from generation_seed import request_rng
+
+_WORD = re.compile(r"\w+")
+
+# Per-process generator for process-pool workers
+_WORKER_AI: Optional[EnhancedContentAI] = None
+
+def _init_worker(seed: int):
+    """Create the worker process's own generator (clients, caches and fingerprints stay in the parent)"""
+    global _WORKER_AI
+    _WORKER_AI = EnhancedContentAI(seed=seed)
+
+def _generate_candidates_in_worker(task: Tuple) -> List[Dict]:
+    """Process-pool entry point"""
+    return generate_candidates(_WORKER_AI, *task)
+
+def generate_candidates(content_ai: EnhancedContentAI, video_data: Dict, platform: str, niche: str,
+                        engagement_style: str, main_content: Optional[str], count: int,
+                        fingerprint: str = None) -> List[Dict]:
+    """Generate count full posts for one request, each from its own RNG stream
+
+    Candidate 0 uses the request's regular stream, so it is the post
+    generate_advanced_posts would return and the search never does worse.
+    Hashtags are left empty: they come from a per-request stream shared by
+    every candidate, so they are assigned once the winners are known.
+    Pass the parent's fingerprint when content_ai is a worker copy without
+    the parent's caption client, so the streams match the parent's.
+    """
+
+    lookups = content_ai._resolve_generation_lookups(platform, niche, video_data.get("viral_score", 0))
+    if fingerprint is None:
+        fingerprint = content_ai._request_fingerprint((video_data, platform, niche, engagement_style))
+
+    candidates = []
+    for index in range(count):
+        if index == 0:
+            rng = request_rng(content_ai.seed, fingerprint)
+        else:
+            rng = request_rng(content_ai.seed, fingerprint, "candidate", index)
+
+        post = content_ai._generate_post_with_lookups(
+            video_data, platform, niche, engagement_style, lookups, main_content, rng, with_hashtags=False
+        )
+        post["candidate_index"] = index
+        candidates.append(post)
+
+    return candidates
+
+def caption_similarity(caption_a: str, caption_b: str) -> float:
+    """Jaccard similarity of the word sets of two captions"""
+
+    words_a = set(_WORD.findall(caption_a.lower()))
+    words_b = set(_WORD.findall(caption_b.lower()))
+    if not words_a and not words_b:
+        return 1.0
+
+    return len(words_a & words_b) / len(words_a | words_b)
+
+class CaptionCandidateSearch:
+    """Multi-candidate caption search on top of EnhancedContentAI"""
+
+    def __init__(self, content_ai: EnhancedContentAI = None, candidates: int = 8, top_k: int = 3,
+                 executor: str = "process", max_workers: int = None, max_similarity: float = 0.7):
+        self.content_ai = content_ai or EnhancedContentAI()
+        self.candidates = max(1, candidates)
+        self.top_k = max(1, top_k)
+        self.executor = executor
+        # CPU budget: number of workers generating candidates at once
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_similarity = max_similarity
+
+    def search(self, batch: List[Tuple], raise_errors: bool = True) -> List[List[Dict]]:
+        """Return the top-k diverse candidates (best first) for each request in the batch"""
+
+        requests, top_lists = self._search(batch, raise_errors)
+        for request, top in zip(requests, top_lists):
+            self.content_ai._assign_hashtags(top, [request] * len(top), record_usage=False)
+
+        return top_lists
+
+    def generate_posts(self, batch: List[Tuple], raise_errors: bool = True) -> List[Dict]:
+        """Return the best candidate per request, with the runner-up captions attached
+
+        Winners get their hashtags in batch order and count against the daily limits.
+        """
+
+        requests, top_lists = self._search(batch, raise_errors)
+        posts = [top[0] for top in top_lists]
+        self.content_ai._assign_hashtags(posts, requests)
+
+        for best, top in zip(posts, top_lists):
+            if "error" not in best:
+                best["candidate_alternatives"] = [
+                    {
+                        "caption": post["caption"],
+                        "optimization_score": self.content_ai._calculate_optimization_score(
+                            post["caption"], best["hashtags"], best["platform"], best["viral_score"]
+                        )
+                    }
+                    for post in top[1:]
+                ]
+
+        return posts
+
+    def _search(self, batch: List[Tuple], raise_errors: bool) -> Tuple[List[Tuple], List[List[Dict]]]:
+        """Normalized requests and their top-k candidates, still without hashtags
+
+        With a caption cache, each request's top-k is cached under its fingerprint
+        plus the search settings, and repeated requests are searched only once.
+        """
+
+        requests = [
+            (request[0], request[1], request[2], request[3] if len(request) > 3 else "viral")
+            for request in batch
+        ]
+        fingerprints = [self.content_ai._request_fingerprint(request) for request in requests]
+        keys = [f"{fingerprint}:search:{self.candidates}:{self.top_k}:{self.max_similarity}"
+                for fingerprint in fingerprints]
+
+        cache = self.content_ai.caption_cache
+        top_lists = [None] * len(requests)
+        first_index = {}
+        pending = []
+
+        for i, key in enumerate(keys):
+            if cache is not None:
+                if key in first_index:
+                    continue
+                entry = cache.get(key)
+                if entry is not None:
+                    top_lists[i] = [dict(post, cache_hit=True) for post in entry["candidates"]]
+                    continue
+                first_index[key] = i
+            pending.append(i)
+
+        # One backend body per request, shared by all of its candidates
+        resolved = []
+        for i in pending:
+            video_data, platform, niche, engagement_style = requests[i]
+            lookups = self.content_ai._resolve_generation_lookups(platform, niche, video_data.get("viral_score", 0))
+            resolved.append((video_data, platform, niche, engagement_style, lookups))
+        main_contents = self.content_ai._request_backend_contents(resolved)
+
+        tasks = [
+            requests[i] + (main_content, self.candidates, fingerprints[i])
+            for i, main_content in zip(pending, main_contents)
+        ]
+        candidate_lists = self._run_tasks(tasks, raise_errors)
+
+        for i, (candidates, error) in zip(pending, candidate_lists):
+            if candidates:
+                top_lists[i] = self.select_top_k(candidates)
+                if cache is not None:
+                    cache.put(keys[i], {"candidates": top_lists[i]})
+            else:
+                top_lists[i] = [{"platform": requests[i][1], "error": error}]
+
+        # Later duplicates of a key searched in this batch
+        for i, key in enumerate(keys):
+            if top_lists[i] is None:
+                top_lists[i] = copy.deepcopy(top_lists[first_index[key]])
+
+        return requests, top_lists
+
+    def _run_tasks(self, tasks: List[Tuple], raise_errors: bool) -> List[Tuple[List[Dict], Optional[str]]]:
+        """Generate candidates for every request on the configured pool"""
+
+        if self.max_workers <= 1:
+            return [
+                self._collect(lambda: generate_candidates(self.content_ai, *task), raise_errors)
+                for task in tasks
+            ]
+
+        # Candidates carry no hashtags, so workers need neither the bandit nor the exclusions
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                       initargs=(self.content_ai.seed,))
+            submit = lambda task: pool.submit(_generate_candidates_in_worker, task)
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="caption-search")
+            submit = lambda task: pool.submit(generate_candidates, self.content_ai, *task)
+
+        with pool:
+            futures = [submit(task) for task in tasks]
+            return [self._collect(future.result, raise_errors) for future in futures]
+
+    def _collect(self, get_result, raise_errors: bool) -> Tuple[List[Dict], Optional[str]]:
+        """Run/await one task, turning errors into an (empty, message) outcome"""
+
+        try:
+            return get_result(), None
+        except Exception as e:
+            if raise_errors:
+                raise
+            return [], str(e)
+
+    def select_top_k(self, candidates: List[Dict]) -> List[Dict]:
+        """Greedy top-k by score, skipping captions too similar to ones already kept"""
+
+        ranked = sorted(
+            candidates,
+            key=lambda post: (
+                -post["optimization_score"],
+                -self.content_ai._score_hook_effectiveness(post["selected_hook"], post["engagement_style"]),
+                post["candidate_index"]
+            )
+        )
+
+        selected = []
+        for post in ranked:
+            if len(selected) >= self.top_k:
+                break
+            if all(caption_similarity(post["caption"], kept["caption"]) <= self.max_similarity for kept in selected):
+                selected.append(post)
+
+        # Not enough diverse captions: fill up with the best remaining ones
+        kept_indices = {post["candidate_index"] for post in selected}
+        for post in ranked:
+            if len(selected) >= self.top_k:
+                break
+            if post["candidate_index"] not in kept_indices:
+                selected.append(post)
+
+        return selected
+
+def build_caption_search(content_ai: EnhancedContentAI, config: Optional[Dict]) -> Optional[CaptionCandidateSearch]:
+    """Build a candidate search from a "candidate_search" config section (None when disabled)"""
+
+    if not config or config.get("candidates", 1) <= 1:
+        return None
+
+    return CaptionCandidateSearch(
+        content_ai,
+        candidates=config["candidates"],
+        top_k=config.get("top_k", 3),
+        executor=config.get("executor", "process"),
+        max_workers=config.get("max_workers"),
+        max_similarity=config.get("max_similarity", 0.7)
+    )
+
+def main():
+    """Compare single-shot generation with multi-candidate search"""
+    ai = EnhancedContentAI()
+
+    platforms = ["instagram", "tiktok", "youtube_shorts", "twitter"]
+    niches = ["fitness", "business", "technology", "comedy"]
+    batch = [
+        ({"title": f"Viral {niches[i % 4]} video {i}", "description": "Amazing tutorial hack",
+          "viral_score": (i * 13) % 100}, platforms[i % 4], niches[i % 4])
+        for i in range(64)
+    ]
+
+    print("🔎 Testing Caption Candidate Search...")
+    single = ai.generate_advanced_posts(batch)
+    single_avg = sum(post["optimization_score"] for post in single) / len(single)
+    print(f"   Single-shot average optimization score: {single_avg:.1f}")
+
+    for executor in ["thread", "process"]:
+        search = CaptionCandidateSearch(ai, candidates=8, top_k=3, executor=executor)
+        start = time.perf_counter()
+        best = search.generate_posts(batch)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        best_avg = sum(post["optimization_score"] for post in best) / len(best)
+        print(f"   {executor:<7} x8 candidates: average {best_avg:.1f} in {elapsed_ms:.0f} ms "
+              f"({search.max_workers} workers)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Caption Template Engine
+Templates compiled once into printf-style formats, with batch rendering
+"""
+
+from string import Formatter
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+# Bump whenever caption templates change so cached captions are invalidated
+TEMPLATE_VERSION = 1
+
+class CompiledTemplate:
+    """A str.format-style template pre-split into literal segments and slot positions"""
+
+    __slots__ = ("template_id", "source", "parts", "slots", "slot_names", "_format")
+
+    def __init__(self, template_id: str, source: str):
+        self.template_id = template_id
+        self.source = source
+
+        parts: List[str] = []
+        slots: List[Tuple[int, str]] = []
+
+        for literal, field_name, format_spec, conversion in Formatter().parse(source):
+            if literal:
+                # Escaped braces split literals; merge them so rendering joins fewer pieces
+                if parts and (not slots or slots[-1][0] != len(parts) - 1):
+                    parts[-1] += literal
+                else:
+                    parts.append(literal)
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Unsupported template field '{field_name}' in {template_id}")
+            slots.append((len(parts), field_name))
+            parts.append("")
+
+        self.parts = tuple(parts)
+        self.slots = tuple(slots)
+        self.slot_names = tuple(dict.fromkeys(name for _, name in slots))
+        self._format = self._compile()
+
+    def _compile(self) -> str:
+        """Build a printf-style `%(name)s` format from the parts, so rendering is one C-level `%`
+
+        Literal text only has its percent signs escaped; no template text is ever evaluated.
+        """
+
+        slot_at = dict(self.slots)
+        return "".join(
+            f"%({slot_at[position]})s" if position in slot_at else part.replace("%", "%%")
+            for position, part in enumerate(self.parts)
+        )
+
+    def render(self, values: Mapping[str, object]) -> str:
+        """Fill the slots from values (extra keys are ignored, like str.format)"""
+
+        return self._format % values
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.template_id!r})"
+
+class TemplateEngine:
+    """Registry of compiled template groups"""
+
+    def __init__(self):
+        self._groups: Dict[str, Tuple[CompiledTemplate, ...]] = {}
+
+    def register_group(self, group: str, templates: Sequence[str]) -> Tuple[CompiledTemplate, ...]:
+        """Compile a list of alternative templates once and register them under a group name"""
+
+        compiled = tuple(
+            CompiledTemplate(f"{group}:{index}", source) for index, source in enumerate(templates)
+        )
+        self._groups[group] = compiled
+        return compiled
+
+    def group(self, group: str) -> Tuple[CompiledTemplate, ...]:
+        """Get a registered template group"""
+
+        return self._groups[group]
+
+    def render(self, template: CompiledTemplate, values: Mapping[str, object]) -> str:
+        """Render a template"""
+
+        return template.render(values)
+
+    def render_batch(self, template: CompiledTemplate, values_list: Sequence[Mapping[str, object]]) -> List[str]:
+        """Render one template for many value sets"""
+
+        render = template.render
+        return [render(values) for values in values_list]
+
+    def render_many(self, requests: Sequence[Tuple[CompiledTemplate, Mapping[str, object]]]) -> List[str]:
+        """Render a batch of (template, values) pairs"""
+
+        return [template.render(values) for template, values in requests]
+
+# Shared engine used by the content generators; templates are compiled at import
+TEMPLATE_ENGINE = TemplateEngine()
+
+def main():
+    """Benchmark compiled template rendering against str.format"""
+    import time
+
+    source = "Here's what most people get wrong about {concept}: {insight}. The better approach? {solution}."
+    template = TEMPLATE_ENGINE.register_group("demo", [source])[0]
+    values_list = [
+        {"concept": f"concept {i % 50}", "insight": "the key insight", "solution": "apply it correctly"}
+        for i in range(100000)
+    ]
+
+    print("🧩 Testing Caption Template Engine...")
+    start = time.perf_counter()
+    formatted = [source.format(**values) for values in values_list]
+    format_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    rendered = TEMPLATE_ENGINE.render_batch(template, values_list)
+    render_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   str.format: {format_ms:.1f} ms, compiled: {render_ms:.1f} ms, identical: {formatted == rendered}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Clip Extraction Module
+Cuts clips for viral moments with ffmpeg worker processes: keyframe-aligned stream copy, re-encode when needed
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from keyframe_index import KeyframeIndex, KeyframeIndexCache
+from media_store import MediaStore
+
+FFMPEG_BINARY = os.environ.get("SOCIACLIP_FFMPEG", "ffmpeg")
+FFPROBE_BINARY = os.environ.get("SOCIACLIP_FFPROBE", "ffprobe")
+
+class ClipExtractionError(Exception):
+    """Raised when ffmpeg cannot cut a clip"""
+
+class ClipExtractor:
+    """Cuts clips from a local source file on a pool of ffmpeg processes sized to the cores"""
+
+    def __init__(self, media_store: MediaStore, max_workers: int = None, snap_tolerance_seconds: float = 0.5,
+                 ffmpeg: str = FFMPEG_BINARY, ffprobe: str = FFPROBE_BINARY, timeout_seconds: float = 300):
+        self.media_store = media_store
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Stream copy starts at the keyframe before the moment if it is at most this much earlier
+        self.snap_tolerance_seconds = snap_tolerance_seconds
+        self.ffmpeg = shutil.which(ffmpeg)
+        self.ffprobe = shutil.which(ffprobe)
+        self.timeout_seconds = timeout_seconds
+        self.keyframe_indexes = KeyframeIndexCache(media_store, self.ffprobe) if self.ffprobe else None
+
+        # Shared by every video, so concurrent videos together stay within max_workers ffmpegs
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        self.stats = {"copied": 0, "reencoded": 0, "reused": 0, "failed": 0}
+        # Clips are cut on pool threads
+        self._stats_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg is not None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="clip-ffmpeg")
+            return self._executor
+
+    def keyframes(self, source_path: str, source_key: str = None) -> Optional[KeyframeIndex]:
+        """Keyframe index of a source (built once per source), or None when it cannot be probed"""
+
+        if self.keyframe_indexes is None:
+            return None
+        try:
+            return self.keyframe_indexes.get(source_path, source_key or self.media_store.content_key(source_path))
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return None
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def extract(self, source_path: str, moments: List[Dict]) -> List[Dict]:
+        """Cut every moment of one source in parallel; one result dict per moment, in order
+
+        Each returned file_path is pinned in the media store until passed to release().
+        """
+
+        if not self.available:
+            return [{"extraction_status": "metadata_ready", "error": "ffmpeg not found"} for _ in moments]
+
+        source_key = self.media_store.content_key(source_path)
+        keyframes = self.keyframes(source_path, source_key)
+
+        futures = [
+            self._pool().submit(self._extract_one, source_path, source_key, moment, keyframes)
+            for moment in moments
+        ]
+        return [future.result() for future in futures]
+
+    def plan(self, start: float, end: float, keyframes: Optional[KeyframeIndex]) -> Dict:
+        """Choose stream copy from a nearby keyframe, or an exact re-encode seeking to the keyframe before"""
+
+        index = keyframes.keyframe_at_or_before(start) if keyframes else None
+        if index is None:
+            return {"method": "reencode", "start": start, "duration": end - start, "seek": start}
+
+        keyframe = keyframes.times[index]
+        if start - keyframe <= self.snap_tolerance_seconds:
+            return {"method": "copy", "start": keyframe, "duration": end - keyframe, "seek": keyframe}
+
+        # Input seek lands on the keyframe; only the frames between it and start are decoded
+        return {"method": "reencode", "start": start, "duration": end - start, "seek": keyframe}
+
+    def _extract_one(self, source_path: str, source_key: str, moment: Dict,
+                     keyframes: Optional[KeyframeIndex]) -> Dict:
+        """Cut one clip into the media store (reusing an identical earlier cut)"""
+
+        start = float(moment["start_time"])
+        end = float(moment.get("end_time", start + moment.get("duration", 15)))
+        plan = self.plan(start, end, keyframes)
+        clip_source = f"clip:{source_key}:{plan['method']}:{plan['start']:.3f}:{plan['duration']:.3f}"
+
+        result = {
+            "extraction_status": "extracted",
+            "extraction_method": plan["method"],
+            "clip_start": plan["start"],
+            "clip_duration": plan["duration"]
+        }
+        if keyframes:
+            result["source_byte_range"] = keyframes.byte_range(plan["start"], plan["start"] + plan["duration"])
+
+        existing = self.media_store.lookup(clip_source, pin=True)
+        if existing:
+            self._count("reused")
+            result["file_path"] = existing
+            return result
+
+        temp_path = self.media_store.temp_path()
+        try:
+            try:
+                self._run_ffmpeg(source_path, temp_path, plan)
+            except ClipExtractionError:
+                if plan["method"] != "copy":
+                    raise
+                # Some streams cannot be copied into mp4; fall back to an exact cut
+                plan = {"method": "reencode", "start": start, "duration": end - start, "seek": plan["seek"]}
+                result.update(extraction_method="reencode", clip_start=start, clip_duration=end - start)
+                self._run_ffmpeg(source_path, temp_path, plan)
+
+            self._count("copied" if plan["method"] == "copy" else "reencoded")
+            result["file_path"] = self.media_store.commit_file(
+                temp_path, self._file_digest(temp_path), ".mp4", source=clip_source, pin=True
+            )
+
+        except (ClipExtractionError, OSError, subprocess.SubprocessError) as e:
+            self._count("failed")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            result.update(extraction_status="failed", error=str(e), file_path=None)
+
+        return result
+
+    def release(self, results: List[Dict]):
+        """Unpin the clip files of extract() results once the caller is done with them"""
+
+        for result in results:
+            self.media_store.release(result.get("file_path"))
+
+    def _run_ffmpeg(self, source_path: str, output_path: str, plan: Dict):
+        """Run one ffmpeg cut"""
+
+        command = [self.ffmpeg, "-nostdin", "-v", "error", "-y",
+                   "-ss", f"{plan['seek']:.3f}", "-i", source_path]
+        if plan["start"] > plan["seek"]:
+            command += ["-ss", f"{plan['start'] - plan['seek']:.3f}"]
+        command += ["-t", f"{plan['duration']:.3f}", "-map", "0:v:0?", "-map", "0:a:0?"]
+        if plan["method"] == "copy":
+            command += ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+        else:
+            # One thread per ffmpeg: the pool already runs one process per core
+            command += ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+                        "-c:a", "aac", "-b:a", "128k", "-threads", "1"]
+        command += ["-movflags", "+faststart", "-f", "mp4", output_path]
+
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout_seconds)
+        if completed.returncode != 0 or not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            raise ClipExtractionError(completed.stderr.strip()[-500:] or f"ffmpeg exited {completed.returncode}")
+
+    def _file_digest(self, path: str) -> str:
+        """sha256 of a file, read in chunks"""
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def close(self):
+        """Stop the worker pool"""
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+def main():
+    """Cut clips from a generated test video"""
+    import tempfile
+    import time
+    from array import array
+
+    store = MediaStore(tempfile.mkdtemp())
+    extractor = ClipExtractor(store)
+
+    print("✂️  Testing Clip Extraction...")
+    if not extractor.available:
+        print("   ⚠️ ffmpeg not found (set SOCIACLIP_FFMPEG); clips stay metadata_ready")
+        keyframes = KeyframeIndex(array('d', [0, 2, 4, 6, 8, 10, 12]), array('q', [-1] * 7))
+        print(f"   Plan at 10.2s with keyframes every 2s: {extractor.plan(10.2, 25.2, keyframes)}")
+        print(f"   Plan at 11.5s with keyframes every 2s: {extractor.plan(11.5, 26.5, keyframes)}")
+        return
+
+    source_path = os.path.join(store.root, "source.mp4")
+    subprocess.run([extractor.ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc=duration=120:size=640x360:rate=30",
+                    "-f", "lavfi", "-i", "sine=duration=120", "-c:v", "libx264", "-g", "60", "-c:a", "aac",
+                    source_path], check=True)
+
+    moments = [{"start_time": start, "duration": 15, "end_time": start + 15} for start in (0, 30, 61, 90)]
+    start = time.perf_counter()
+    results = extractor.extract(source_path, moments)
+    elapsed = time.perf_counter() - start
+
+    for moment, result in zip(moments, results):
+        print(f"   {moment['start_time']:>3}s: {result['extraction_status']} via {result.get('extraction_method')}")
+    print(f"   {len(results)} clips in {elapsed:.2f}s on {extractor.max_workers} workers, stats {extractor.stats}")
+    extractor.release(results)
+    extractor.close()
+
+if __name__ == "__main__":
+    main()
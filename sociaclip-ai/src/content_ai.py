@@ -8,11 +8,56 @@ import json
 import random
 from typing import Dict, List, Optional
 from datetime import datetime
+from caption_length import truncate_for_platform
+from caption_templates import TEMPLATE_ENGINE
+from generation_seed import DEFAULT_RUN_SEED, request_rng
+from hashtag_index import HASHTAG_INDEX, HASHTAG_VOCABULARY
+
+# Caption templates are compiled once at import; generators only pick and render them
+MAIN_CONTENT_TEMPLATES = {
+    length: TEMPLATE_ENGINE.register_group(f"content.main.{length}", [template])[0]
+    for length, template in {
+        "short": "{insight} This is exactly what {niche} content creators need to understand!",
+        "medium": "Here's what caught my attention: {insight}\n\nThis perfectly shows why {niche} is evolving so fast right now.",
+        "long": "Let me break this down for you:\n\n{insight}\n\nThis is the kind of {niche} content that's changing the game. The attention to detail is incredible!"
+    }.items()
+}
+
+CTA_TEMPLATES = {
+    platform: TEMPLATE_ENGINE.register_group(f"content.cta.{platform}", ctas)
+    for platform, ctas in {
+        "instagram": [
+            "Double tap if you agree! 💫\nWhat's your take? Drop it in the comments! 👇",
+            "Save this for later! 📌\nTag someone who needs to see this! 👀",
+            "Hit that follow for more {niche} content! ✨"
+        ],
+        "tiktok": [
+            "Follow for more! ✨",
+            "What's your take? 👇",
+            "Share if this helped! 🔥"
+        ],
+        "youtube_shorts": [
+            "Subscribe for more {niche} content! 🔔",
+            "Like if this was helpful! 👍\nWhat should I cover next?",
+            "Turn on notifications for more! ⚡"
+        ],
+        "twitter": [
+            "Thoughts? 🤔",
+            "RT if you agree! 🔄",
+            "What's your experience? 👇"
+        ]
+    }.items()
+}
 
 class ContentAI:
     """AI-powered content generation for social media posts"""
     
-    def __init__(self):
+    def __init__(self, seed: int = None, hashtag_store=None):
+        # Run seed mixed into every per-request RNG stream
+        self.seed = DEFAULT_RUN_SEED if seed is None else seed
+        # Optional HashtagPerformanceStore backing the trending hashtags
+        self.hashtag_store = hashtag_store
+        
         self.platform_configs = {
             "instagram": {
                 "max_caption_length": 2200,
@@ -48,22 +93,22 @@ class ContentAI:
         viral_score = video_data.get("viral_score", 0)
         
         config = self.platform_configs.get(platform, self.platform_configs["instagram"])
+        rng = request_rng(self.seed, "caption", title, description, platform, niche, viral_score)
         
         # Generate hook based on niche
-        hook = self._generate_hook(niche, viral_score)
+        hook = self._generate_hook(niche, viral_score, rng)
         
         # Generate main content
-        main_content = self._generate_main_content(title, description, niche, platform)
+        main_content = self._generate_main_content(title, description, niche, platform, rng)
         
         # Generate call to action
-        cta = self._generate_cta(platform, niche)
+        cta = self._generate_cta(platform, niche, rng)
         
         # Combine and optimize for platform
         caption = f"{hook}\n\n{main_content}\n\n{cta}"
         
         # Trim if too long for platform
-        if len(caption) > config["max_caption_length"]:
-            caption = caption[:config["max_caption_length"] - 3] + "..."
+        caption = truncate_for_platform(caption, config["max_caption_length"], platform)
         
         return caption
     
@@ -73,26 +118,28 @@ class ContentAI:
         config = self.platform_configs.get(platform, self.platform_configs["instagram"])
         optimal_count = config["optimal_hashtags"]
         
-        # Base hashtags for niche
-        niche_hashtags = self._get_niche_hashtags(niche)
-        
-        # Trending hashtags (would be dynamically updated)
-        trending_hashtags = self._get_trending_hashtags(platform)
-        
-        # Platform-specific hashtags
-        platform_hashtags = self._get_platform_hashtags(platform)
-        
-        # Viral potential hashtags based on score
         viral_hashtags = self._get_viral_hashtags(video_data.get("viral_score", 0))
         
-        # Combine and select best hashtags
-        all_hashtags = niche_hashtags + trending_hashtags + platform_hashtags + viral_hashtags
-        
-        # Remove duplicates and select optimal count
-        unique_hashtags = list(dict.fromkeys(all_hashtags))  # Preserves order
+        # Niche, trending, platform and viral-tier hashtags combined and deduped as
+        # bitsets; the ordered union is memoized per (platform, niche, viral tier, store state)
+        selected, _ = HASHTAG_INDEX.memoized_union(
+            ("content", platform, niche, viral_hashtags[0],
+             self.hashtag_store.store_id if self.hashtag_store is not None else 0,
+             self.hashtag_store.version if self.hashtag_store is not None else 0),
+            lambda: [
+                (ids, len(ids)) for ids in (
+                    HASHTAG_VOCABULARY.intern_all(self._get_niche_hashtags(niche)),
+                    HASHTAG_VOCABULARY.intern_all(self._get_trending_hashtags(platform)),
+                    HASHTAG_VOCABULARY.intern_all(self._get_platform_hashtags(platform)),
+                    HASHTAG_VOCABULARY.intern_all(viral_hashtags)
+                )
+            ]
+        )
+        unique_hashtags = HASHTAG_VOCABULARY.tags(selected)
         
         if isinstance(optimal_count, tuple):
-            count = random.randint(optimal_count[0], optimal_count[1])
+            rng = request_rng(self.seed, "hashtags", video_data.get("title", ""), platform, niche)
+            count = rng.randint(optimal_count[0], optimal_count[1])
         else:
             count = optimal_count
             
@@ -118,9 +165,10 @@ class ContentAI:
             all_times = peak_times + additional_times
             return all_times[:posts_per_day]
     
-    def _generate_hook(self, niche: str, viral_score: int) -> str:
+    def _generate_hook(self, niche: str, viral_score: int, rng: random.Random = None) -> str:
         """Generate attention-grabbing hook based on niche and viral potential"""
         
+        rng = rng or random
         hooks_by_niche = {
             "fitness": [
                 "🔥 This workout hack changes everything!",
@@ -165,37 +213,32 @@ class ContentAI:
         # Add urgency for high viral score content
         if viral_score > 50:
             urgent_prefixes = ["🚨 VIRAL ALERT: ", "⚡ TRENDING NOW: ", "🔥 EVERYONE'S WATCHING: "]
-            base_hook = random.choice(niche_hooks)
-            return random.choice(urgent_prefixes) + base_hook.lower()
+            base_hook = rng.choice(niche_hooks)
+            return rng.choice(urgent_prefixes) + base_hook.lower()
         
-        return random.choice(niche_hooks)
+        return rng.choice(niche_hooks)
     
-    def _generate_main_content(self, title: str, description: str, niche: str, platform: str) -> str:
+    def _generate_main_content(self, title: str, description: str, niche: str, platform: str,
+                               rng: random.Random = None) -> str:
         """Generate main caption content based on video data"""
         
-        # Extract key points from title and description
-        content_templates = {
-            "short": "{insight} This is exactly what {niche} content creators need to understand!",
-            "medium": "Here's what caught my attention: {insight}\n\nThis perfectly shows why {niche} is evolving so fast right now.",
-            "long": "Let me break this down for you:\n\n{insight}\n\nThis is the kind of {niche} content that's changing the game. The attention to detail is incredible!"
-        }
-        
         # Choose template based on platform
         if platform in ["twitter", "tiktok"]:
-            template = content_templates["short"]
+            template = MAIN_CONTENT_TEMPLATES["short"]
         elif platform == "instagram":
-            template = content_templates["medium"]
+            template = MAIN_CONTENT_TEMPLATES["medium"]
         else:
-            template = content_templates["long"]
+            template = MAIN_CONTENT_TEMPLATES["long"]
         
         # Extract insight from title/description
-        insight = self._extract_insight(title, description)
+        insight = self._extract_insight(title, description, rng)
         
-        return template.format(insight=insight, niche=niche)
+        return TEMPLATE_ENGINE.render(template, {"insight": insight, "niche": niche})
     
-    def _extract_insight(self, title: str, description: str) -> str:
+    def _extract_insight(self, title: str, description: str, rng: random.Random = None) -> str:
         """Extract key insight from video title and description"""
         
+        rng = rng or random
         # Simple extraction - in production this would use AI/NLP
         text = f"{title} {description}".lower()
         
@@ -207,38 +250,16 @@ class ContentAI:
             "What's changing the industry"
         ]
         
-        return random.choice(insight_patterns)
+        return rng.choice(insight_patterns)
     
-    def _generate_cta(self, platform: str, niche: str) -> str:
+    def _generate_cta(self, platform: str, niche: str, rng: random.Random = None) -> str:
         """Generate call-to-action based on platform"""
         
-        ctas_by_platform = {
-            "instagram": [
-                "Double tap if you agree! 💫\nWhat's your take? Drop it in the comments! 👇",
-                "Save this for later! 📌\nTag someone who needs to see this! 👀",
-                "Hit that follow for more {niche} content! ✨"
-            ],
-            "tiktok": [
-                "Follow for more! ✨",
-                "What's your take? 👇", 
-                "Share if this helped! 🔥"
-            ],
-            "youtube_shorts": [
-                "Subscribe for more {niche} content! 🔔",
-                "Like if this was helpful! 👍\nWhat should I cover next?",
-                "Turn on notifications for more! ⚡"
-            ],
-            "twitter": [
-                "Thoughts? 🤔",
-                "RT if you agree! 🔄",
-                "What's your experience? 👇"
-            ]
-        }
+        rng = rng or random
+        platform_ctas = CTA_TEMPLATES.get(platform, CTA_TEMPLATES["instagram"])
+        cta = rng.choice(platform_ctas)
         
-        platform_ctas = ctas_by_platform.get(platform, ctas_by_platform["instagram"])
-        cta = random.choice(platform_ctas)
-        
-        return cta.format(niche=niche)
+        return TEMPLATE_ENGINE.render(cta, {"niche": niche})
     
     def _get_niche_hashtags(self, niche: str) -> List[str]:
         """Get hashtags specific to the niche"""
@@ -255,7 +276,13 @@ class ContentAI:
     def _get_trending_hashtags(self, platform: str) -> List[str]:
         """Get currently trending hashtags (would be dynamically updated)"""
         
-        # Mock trending hashtags - in production, these would be fetched from APIs
+        # Best performing tags on the platform once engagement data has been recorded
+        if self.hashtag_store is not None:
+            top_tags = self.hashtag_store.top_tags(platform, limit=6)
+            if top_tags:
+                return top_tags
+        
+        # Mock trending hashtags until there is performance data
         return ["#viral", "#trending", "#fyp", "#explore", "#reels", "#shorts"]
     
     def _get_platform_hashtags(self, platform: str) -> List[str]:
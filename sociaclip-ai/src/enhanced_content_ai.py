@@ -4,16 +4,79 @@ SociaClip AI - Enhanced Content Generation Module
 Advanced AI content generation with improved templates, hooks, and platform optimization
 """
 
+import copy
 import json
 import random
-import re
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from caption_templates import TEMPLATE_ENGINE, CompiledTemplate
+from caption_cache import CaptionCache, caption_fingerprint
+from caption_length import cut_to_length, platform_length, truncate_for_platform
+from generation_seed import DEFAULT_RUN_SEED, request_rng
+from hashtag_index import HASHTAG_INDEX, HASHTAG_VOCABULARY, HashtagIndex, HashtagUsageLimiter
+from hook_scoring import HOOK_SCORER
+
+# Caption templates are compiled once at import; generators only pick and render them
+EDUCATIONAL_TEMPLATES = TEMPLATE_ENGINE.register_group("enhanced.educational", [
+    "Here's what most people get wrong about {concept}: {insight}. The better approach? {solution}.",
+    "Let me break down {concept} for you: {insight}. This changes everything because {reason}.",
+    "The truth about {concept} that nobody talks about: {insight}. Here's why it matters: {solution}."
+])
+
+STORY_TEMPLATES = TEMPLATE_ENGINE.register_group("enhanced.story", [
+    "I used to struggle with {challenge} until I discovered {solution}. The results? {outcome}. Game changer.",
+    "Plot twist: What everyone thinks about {concept} is wrong. Here's what actually works: {insight}.",
+    "True story: I tried this {concept} approach and the results blew my mind. Here's what happened: {outcome}."
+])
+
+VIRAL_TEMPLATES = TEMPLATE_ENGINE.register_group("enhanced.viral", [
+    "This {niche} hack is breaking the internet: {insight}. Try it and thank me later! 🔥",
+    "POV: You discover the {concept} secret that {niche} experts don't want you to know 👀",
+    "Wait... did this just solve the biggest {niche} problem? The answer is YES. 🤯"
+])
+
+SMART_CTA_TEMPLATES = {
+    "instagram": {
+        "high_viral": TEMPLATE_ENGINE.register_group("enhanced.cta.instagram.high_viral", [
+            "Save this before Instagram hides it! 📌 Tag 3 friends who need this!",
+            "Double tap if this blew your mind! 🤯 Share your results in comments!",
+            "This is going viral for a reason! ⚡ Follow for more game-changers!"
+        ]),
+        "medium_viral": TEMPLATE_ENGINE.register_group("enhanced.cta.instagram.medium_viral", [
+            "What's your experience with this? Drop it below! 👇",
+            "Save for later and tag someone who needs this! ✨",
+            "Follow for more {niche} insights like this! 🔥"
+        ])
+    },
+    "tiktok": {
+        "high_viral": TEMPLATE_ENGINE.register_group("enhanced.cta.tiktok.high_viral", [
+            "Duet this with your results! 🔥",
+            "Follow for more viral {niche}! ⚡",
+            "Share if this helped! 💫"
+        ])
+    }
+}
+
+FALLBACK_CTA_TEMPLATES = TEMPLATE_ENGINE.register_group("enhanced.cta.fallback", ["Follow for more!"])
+
+BACKUP_HASHTAG_IDS = HASHTAG_VOCABULARY.intern_all(["#content", "#viral", "#trending", "#discover"])
 
 class EnhancedContentAI:
     """Enhanced AI-powered content generation with advanced templates and optimization"""
     
-    def __init__(self):
+    def __init__(self, caption_client=None, caption_cache: CaptionCache = None, seed: int = None):
+        # Optional BatchingCaptionClient; posts fall back to templates when it has no answer
+        self.caption_client = caption_client
+        self.caption_cache = caption_cache
+        # Run seed mixed into every per-request RNG stream
+        self.seed = DEFAULT_RUN_SEED if seed is None else seed
+        
+        # Hashtag constraints as bitsets over the shared vocabulary
+        self.banned_hashtag_mask = 0
+        self.hashtag_limiter: Optional[HashtagUsageLimiter] = None
+        # Optional HashtagBandit that reorders tag pools by observed engagement
+        self.hashtag_bandit = None
+        
         self.platform_configs = {
             "instagram": {
                 "max_caption_length": 2200,
@@ -59,32 +122,245 @@ class EnhancedContentAI:
                              engagement_style: str = "viral") -> Dict:
         """Generate advanced post with multiple optimization layers"""
         
-        config = self.platform_configs.get(platform, self.platform_configs["instagram"])
+        return self.generate_advanced_posts([(video_data, platform, niche, engagement_style)])[0]
+    
+    def generate_advanced_posts(self, batch: List[Tuple], raise_errors: bool = True) -> List[Dict]:
+        """Generate posts for many (video_data, platform, niche[, engagement_style]) requests at once
+        
+        Platform configs, hook pools, hashtag pools, templates and CTA pools are resolved
+        once per (platform, niche, viral tier) and shared by every request in the batch.
+        With raise_errors=False a failed request yields {"platform", "error"} in its place.
+        With a caption client, every main content body in the batch is requested in one go.
+        With a caption cache, repeated inputs (even within the batch) are generated only once.
+        Hashtags are chosen last, post by post, against the current bans and daily limits.
+        """
+        
+        if self.caption_cache is None:
+            results = self._generate_uncached_posts(batch, raise_errors)
+        else:
+            results = self._generate_cached_posts(batch, raise_errors)
+        
+        self._assign_hashtags(results, batch)
+        return results
+    
+    def _generate_cached_posts(self, batch: List[Tuple], raise_errors: bool) -> List[Dict]:
+        """Generate a batch through the caption cache (cached posts carry no hashtags)"""
+        
+        results = [None] * len(batch)
+        keys = [self._request_fingerprint(request) for request in batch]
+        first_index = {}
+        pending = []
+        
+        for i, key in enumerate(keys):
+            if key in first_index:
+                continue
+            post = self.caption_cache.get(key)
+            if post is not None:
+                results[i] = post
+            else:
+                first_index[key] = i
+                pending.append(i)
+        
+        generated = self._generate_uncached_posts([batch[i] for i in pending], raise_errors)
+        for i, post in zip(pending, generated):
+            results[i] = post
+            if "error" not in post:
+                self.caption_cache.put(keys[i], post)
+        
+        # Later duplicates of a key generated in this batch
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                results[i] = self.caption_cache.get(key) or copy.deepcopy(results[first_index[key]])
+        
+        return results
+    
+    def _request_fingerprint(self, request: Tuple) -> str:
+        """Fingerprint a batch request; keys the caption cache and seeds the request's RNG"""
+        
+        video_data, platform, niche = request[0], request[1], request[2]
+        engagement_style = request[3] if len(request) > 3 else "viral"
+        backend = self.caption_client.backend.name if self.caption_client is not None else "template"
+        
+        return caption_fingerprint(
+            video_data, platform, niche, engagement_style,
+            self._viral_tier(video_data.get("viral_score", 0)), backend, self.seed
+        )
+    
+    def _generate_uncached_posts(self, batch: List[Tuple], raise_errors: bool) -> List[Dict]:
+        """Generate every request in the batch, sharing lookups and backend calls"""
+        
+        lookup_cache = {}
+        resolved = []
+        
+        for request in batch:
+            video_data, platform, niche = request[0], request[1], request[2]
+            engagement_style = request[3] if len(request) > 3 else "viral"
+            viral_score = video_data.get("viral_score", 0)
+            
+            try:
+                key = (platform, niche, self._viral_tier(viral_score))
+                lookups = lookup_cache.get(key)
+                if lookups is None:
+                    lookups = self._resolve_generation_lookups(platform, niche, viral_score)
+                    lookup_cache[key] = lookups
+                resolved.append((video_data, platform, niche, engagement_style, lookups))
+            except Exception as e:
+                if raise_errors:
+                    raise
+                resolved.append((None, platform, niche, engagement_style, str(e)))
+        
+        backend_contents = self._request_backend_contents(resolved)
+        results = []
+        
+        for (video_data, platform, niche, engagement_style, lookups), main_content in zip(resolved, backend_contents):
+            if video_data is None:
+                results.append({"platform": platform, "error": lookups})
+                continue
+            
+            try:
+                # Each request draws from its own stream, so output depends only on inputs and seed
+                rng = request_rng(self.seed, self._request_fingerprint((video_data, platform, niche, engagement_style)))
+                results.append(self._generate_post_with_lookups(
+                    video_data, platform, niche, engagement_style, lookups, main_content, rng, with_hashtags=False
+                ))
+            except Exception as e:
+                if raise_errors:
+                    raise
+                results.append({"platform": platform, "error": str(e)})
+        
+        return results
+    
+    def _assign_hashtags(self, posts: List[Dict], batch: List[Tuple], record_usage: bool = True):
+        """Choose each post's hashtags in batch order and count them against the daily limits
+        
+        Runs after generation and cache lookups, so banned or used-up tags never come
+        back from the cache, the bandit re-ranks on every post, and each post sees the
+        uses of the posts before it in the same batch. Tags come from their own RNG
+        stream, so they do not depend on how the caption was produced.
+        """
+        
+        pools = {}
+        for post, request in zip(posts, batch):
+            if "error" in post:
+                continue
+            
+            video_data, platform, niche = request[0], request[1], request[2]
+            viral_score = video_data.get("viral_score", 0)
+            
+            key = (platform, niche, self._viral_tier(viral_score))
+            lookups = pools.get(key)
+            if lookups is None:
+                lookups = pools[key] = {
+                    "niche_hashtags": self._get_niche_hashtags(niche),
+                    "viral_hashtags": self._get_viral_hashtags(viral_score),
+                    "platform_hashtags": self._get_platform_hashtags(platform)
+                }
+            
+            rng = request_rng(self.seed, self._request_fingerprint(request), "hashtags")
+            hashtags = self._generate_optimized_hashtags(video_data, platform, niche, viral_score, lookups, rng)
+            post.update({
+                "hashtags": hashtags,
+                "full_post": f"{post['caption']}\n\n{' '.join(hashtags)}",
+                "optimization_score": self._calculate_optimization_score(
+                    post["caption"], hashtags, platform, viral_score
+                )
+            })
+            
+            if record_usage and self.hashtag_limiter is not None:
+                self.hashtag_limiter.record(hashtags)
+    
+    def _request_backend_contents(self, resolved: List[Tuple]) -> List[Optional[str]]:
+        """Ask the caption client for every main content body in one batch (None = template path)"""
+        
+        if self.caption_client is None:
+            return [None] * len(resolved)
+        
+        indices, caption_requests = [], []
+        for i, (video_data, platform, niche, _, lookups) in enumerate(resolved):
+            if video_data is None:
+                continue
+            indices.append(i)
+            caption_requests.append({
+                "platform": platform,
+                "niche": niche,
+                "title": video_data.get("title", ""),
+                "description": video_data.get("description", ""),
+                "strategy": lookups["content_strategy"],
+                "max_length": lookups["config"]["max_caption_length"]
+            })
+        
+        contents = [None] * len(resolved)
+        try:
+            for i, text in zip(indices, self.caption_client.generate_many(caption_requests)):
+                contents[i] = text
+        except Exception as e:
+            print(f"Caption backend unavailable, using templates: {e}")
+        
+        return contents
+    
+    def _viral_tier(self, viral_score: int) -> int:
+        """Bucket viral scores by every threshold the generators branch on (30/50/60/70)"""
+        
+        return sum(1 for threshold in (30, 50, 60, 70) if viral_score > threshold)
+    
+    def _resolve_generation_lookups(self, platform: str, niche: str, viral_score: int) -> Dict:
+        """Resolve every per-(platform, niche, viral tier) table a post needs"""
+        
+        return {
+            "config": self.platform_configs.get(platform, self.platform_configs["instagram"]),
+            "content_strategy": self._select_content_strategy(viral_score, platform, niche),
+            "available_hooks": self._get_hook_pool(niche, viral_score),
+            "expertise": self.niche_expertise.get(niche, self.niche_expertise["fitness"]),
+            "available_ctas": self._get_cta_pool(platform, viral_score),
+            "niche_hashtags": self._get_niche_hashtags(niche),
+            "viral_hashtags": self._get_viral_hashtags(viral_score),
+            "platform_hashtags": self._get_platform_hashtags(platform)
+        }
+    
+    def _generate_post_with_lookups(self, video_data: Dict, platform: str, niche: str,
+                                    engagement_style: str, lookups: Dict,
+                                    main_content: str = None, rng: random.Random = None,
+                                    with_hashtags: bool = True) -> Dict:
+        """Generate one advanced post from pre-resolved lookups (and optional backend content)
+        
+        with_hashtags=False leaves the tags to _assign_hashtags (hashtags are drawn last,
+        so the caption does not change either way).
+        """
+        
+        config = lookups["config"]
         viral_score = video_data.get("viral_score", 0)
+        rng = rng or random
         
         # Select optimal content strategy
-        content_strategy = self._select_content_strategy(viral_score, platform, niche)
+        content_strategy = lookups["content_strategy"]
         
         # Generate multiple hook options
-        hook_options = self._generate_multiple_hooks(niche, viral_score, platform, 3)
+        hook_options = self._generate_multiple_hooks(
+            niche, viral_score, platform, 3, lookups["available_hooks"], rng
+        )
         best_hook = self._select_best_hook(hook_options, engagement_style)
         
         # Generate sophisticated main content
-        main_content = self._generate_advanced_content(
-            video_data, platform, niche, content_strategy
-        )
+        if main_content is None:
+            main_content = self._generate_advanced_content(
+                video_data, platform, niche, content_strategy, lookups["expertise"], rng
+            )
+        else:
+            main_content = self._fit_content_to_platform(main_content, platform)
         
         # Generate smart call-to-action
-        cta = self._generate_smart_cta(platform, niche, engagement_style, viral_score)
+        cta = self._generate_smart_cta(
+            platform, niche, engagement_style, viral_score, lookups["available_ctas"], rng
+        )
         
         # Generate optimized hashtags with trending analysis
         hashtags = self._generate_optimized_hashtags(
-            video_data, platform, niche, viral_score
-        )
+            video_data, platform, niche, viral_score, lookups, rng
+        ) if with_hashtags else []
         
         # Combine and optimize
         full_caption = self._combine_and_optimize(
-            best_hook, main_content, cta, config["max_caption_length"]
+            best_hook, main_content, cta, config["max_caption_length"], platform
         )
         
         # Generate posting recommendations
@@ -258,8 +534,8 @@ class EnhancedContentAI:
         else:
             return "storytelling"
     
-    def _generate_multiple_hooks(self, niche: str, viral_score: int, platform: str, count: int) -> List[str]:
-        """Generate multiple hook options and select the best ones"""
+    def _get_hook_pool(self, niche: str, viral_score: int) -> List[str]:
+        """Get the hook pool for a niche at the intensity matching the viral score"""
         
         hooks_db = self.viral_hooks_database.get(niche, self.viral_hooks_database["fitness"])
         
@@ -270,12 +546,20 @@ class EnhancedContentAI:
         else:
             intensity = "low_intensity"
         
-        available_hooks = hooks_db.get(intensity, hooks_db["medium_intensity"])
+        return hooks_db.get(intensity, hooks_db["medium_intensity"])
+    
+    def _generate_multiple_hooks(self, niche: str, viral_score: int, platform: str, count: int,
+                                 available_hooks: List[str] = None, rng: random.Random = None) -> List[str]:
+        """Generate multiple hook options and select the best ones"""
+        
+        rng = rng or random
+        if available_hooks is None:
+            available_hooks = self._get_hook_pool(niche, viral_score)
         
         # Generate variations and select best ones
         hooks = []
         for _ in range(count):
-            base_hook = random.choice(available_hooks)
+            base_hook = rng.choice(available_hooks)
             
             # Add platform-specific optimizations
             if platform == "tiktok" and not base_hook.startswith("🚨"):
@@ -290,52 +574,20 @@ class EnhancedContentAI:
     def _select_best_hook(self, hook_options: List[str], engagement_style: str) -> str:
         """Select the best hook based on engagement style and scoring"""
         
-        scored_hooks = []
-        for hook in hook_options:
-            score = self._score_hook_effectiveness(hook, engagement_style)
-            scored_hooks.append((hook, score))
-        
-        scored_hooks.sort(key=lambda x: x[1], reverse=True)
-        return scored_hooks[0][0]
+        return HOOK_SCORER.best(hook_options)
     
     def _score_hook_effectiveness(self, hook: str, engagement_style: str) -> int:
         """Score hook effectiveness based on engagement triggers"""
         
-        score = 0
-        hook_lower = hook.lower()
-        
-        # Urgency indicators
-        urgency_words = ["now", "today", "immediately", "urgent", "breaking", "alert"]
-        score += sum(5 for word in urgency_words if word in hook_lower)
-        
-        # Curiosity triggers
-        curiosity_words = ["secret", "hack", "trick", "revealed", "nobody knows", "hidden"]
-        score += sum(8 for word in curiosity_words if word in hook_lower)
-        
-        # Social proof
-        social_words = ["everyone", "viral", "trending", "millions", "thousands"]
-        score += sum(6 for word in social_words if word in hook_lower)
-        
-        # Emotional triggers
-        emotion_words = ["amazing", "incredible", "shocking", "unbelievable", "insane"]
-        score += sum(4 for word in emotion_words if word in hook_lower)
-        
-        # Emojis (engagement boost)
-        emoji_count = len(re.findall(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]', hook))
-        score += emoji_count * 3
-        
-        # Length optimization (platform dependent)
-        if len(hook) > 30 and len(hook) < 80:
-            score += 5
-        
-        return score
+        return HOOK_SCORER.score(hook)
     
     def _generate_advanced_content(self, video_data: Dict, platform: str, 
-                                  niche: str, strategy: str) -> str:
+                                  niche: str, strategy: str, expertise: Dict = None,
+                                  rng: random.Random = None) -> str:
         """Generate sophisticated main content using niche expertise"""
         
-        expertise = self.niche_expertise.get(niche, self.niche_expertise["fitness"])
-        template = self.engagement_templates.get(strategy, self.engagement_templates["viral_focused"])
+        if expertise is None:
+            expertise = self.niche_expertise.get(niche, self.niche_expertise["fitness"])
         
         title = video_data.get("title", "")
         description = video_data.get("description", "")
@@ -346,151 +598,170 @@ class EnhancedContentAI:
         
         # Generate content based on strategy
         if strategy == "educational":
-            content = self._generate_educational_content(title, description, key_concepts, niche)
+            content = self._generate_educational_content(title, description, key_concepts, niche, rng)
         elif strategy == "storytelling":
-            content = self._generate_story_content(title, description, key_concepts, niche)
+            content = self._generate_story_content(title, description, key_concepts, niche, rng)
         else:  # viral_focused
-            content = self._generate_viral_content(title, description, key_concepts, niche)
+            content = self._generate_viral_content(title, description, key_concepts, niche, rng)
         
-        # Platform-specific optimizations
-        if platform == "twitter" and len(content) > 180:
-            content = content[:180] + "... (thread below) 🧵"
-        elif platform == "tiktok" and len(content) > 100:
-            content = content[:100] + "..."
+        return self._fit_content_to_platform(content, platform)
+    
+    def _fit_content_to_platform(self, content: str, platform: str) -> str:
+        """Apply platform-specific length optimizations to main content"""
+        
+        if platform == "twitter" and platform_length(content, platform) > 180:
+            content = cut_to_length(content, 180, platform) + "... (thread below) 🧵"
+        elif platform == "tiktok" and platform_length(content, platform) > 100:
+            content = cut_to_length(content, 100, platform) + "..."
         
         return content
     
     def _generate_educational_content(self, title: str, description: str, 
-                                    key_concepts: List[str], niche: str) -> str:
+                                    key_concepts: List[str], niche: str, rng: random.Random = None) -> str:
         """Generate educational-focused content"""
         
-        templates = [
-            "Here's what most people get wrong about {concept}: {insight}. The better approach? {solution}.",
-            "Let me break down {concept} for you: {insight}. This changes everything because {reason}.",
-            "The truth about {concept} that nobody talks about: {insight}. Here's why it matters: {solution}."
-        ]
-        
-        concept = random.choice(key_concepts) if key_concepts else niche
+        rng = rng or random
+        concept = rng.choice(key_concepts) if key_concepts else niche
         insight = f"the key insight from this {niche} content"
         solution = f"applying this {concept} strategy correctly"
         reason = f"it addresses the core {niche} challenge"
         
-        template = random.choice(templates)
-        return template.format(concept=concept, insight=insight, solution=solution, reason=reason)
+        template = rng.choice(EDUCATIONAL_TEMPLATES)
+        return TEMPLATE_ENGINE.render(template, {
+            "concept": concept, "insight": insight, "solution": solution, "reason": reason
+        })
     
     def _generate_story_content(self, title: str, description: str,
-                               key_concepts: List[str], niche: str) -> str:
+                               key_concepts: List[str], niche: str, rng: random.Random = None) -> str:
         """Generate story-focused content"""
         
-        story_templates = [
-            "I used to struggle with {challenge} until I discovered {solution}. The results? {outcome}. Game changer.",
-            "Plot twist: What everyone thinks about {concept} is wrong. Here's what actually works: {insight}.",
-            "True story: I tried this {concept} approach and the results blew my mind. Here's what happened: {outcome}."
-        ]
-        
-        concept = random.choice(key_concepts) if key_concepts else niche
+        rng = rng or random
+        concept = rng.choice(key_concepts) if key_concepts else niche
         challenge = f"{niche} challenges"
         solution = f"this {concept} method"
         outcome = "incredible transformation"
         insight = f"the real {concept} secret"
         
-        template = random.choice(story_templates)
-        return template.format(
-            challenge=challenge, solution=solution, outcome=outcome,
-            concept=concept, insight=insight
-        )
+        template = rng.choice(STORY_TEMPLATES)
+        return TEMPLATE_ENGINE.render(template, {
+            "challenge": challenge, "solution": solution, "outcome": outcome,
+            "concept": concept, "insight": insight
+        })
     
     def _generate_viral_content(self, title: str, description: str,
-                               key_concepts: List[str], niche: str) -> str:
+                               key_concepts: List[str], niche: str, rng: random.Random = None) -> str:
         """Generate viral-focused content with maximum engagement potential"""
         
-        viral_templates = [
-            "This {niche} hack is breaking the internet: {insight}. Try it and thank me later! 🔥",
-            "POV: You discover the {concept} secret that {niche} experts don't want you to know 👀",
-            "Wait... did this just solve the biggest {niche} problem? The answer is YES. 🤯"
-        ]
-        
-        concept = random.choice(key_concepts) if key_concepts else "technique"
+        rng = rng or random
+        concept = rng.choice(key_concepts) if key_concepts else "technique"
         insight = f"the game-changing {concept}"
         
-        template = random.choice(viral_templates)
-        return template.format(niche=niche, concept=concept, insight=insight)
+        template = rng.choice(VIRAL_TEMPLATES)
+        return TEMPLATE_ENGINE.render(template, {"niche": niche, "concept": concept, "insight": insight})
     
-    def _generate_smart_cta(self, platform: str, niche: str, engagement_style: str, viral_score: int) -> str:
-        """Generate intelligent call-to-action based on context"""
-        
-        ctas = {
-            "instagram": {
-                "high_viral": [
-                    "Save this before Instagram hides it! 📌 Tag 3 friends who need this!",
-                    "Double tap if this blew your mind! 🤯 Share your results in comments!",
-                    "This is going viral for a reason! ⚡ Follow for more game-changers!"
-                ],
-                "medium_viral": [
-                    "What's your experience with this? Drop it below! 👇",
-                    "Save for later and tag someone who needs this! ✨",
-                    "Follow for more {niche} insights like this! 🔥"
-                ]
-            },
-            "tiktok": {
-                "high_viral": [
-                    "Duet this with your results! 🔥",
-                    "Follow for more viral {niche}! ⚡",
-                    "Share if this helped! 💫"
-                ]
-            }
-        }
+    def _get_cta_pool(self, platform: str, viral_score: int) -> Tuple[CompiledTemplate, ...]:
+        """Get the compiled CTA pool for a platform at the viral level matching the score"""
         
-        platform_ctas = ctas.get(platform, ctas["instagram"])
+        platform_ctas = SMART_CTA_TEMPLATES.get(platform, SMART_CTA_TEMPLATES["instagram"])
         viral_level = "high_viral" if viral_score > 50 else "medium_viral"
         
-        available_ctas = platform_ctas.get(viral_level, platform_ctas.get("medium_viral", ["Follow for more!"]))
-        cta = random.choice(available_ctas)
+        return platform_ctas.get(viral_level, platform_ctas.get("medium_viral", FALLBACK_CTA_TEMPLATES))
+    
+    def _generate_smart_cta(self, platform: str, niche: str, engagement_style: str, viral_score: int,
+                            available_ctas: Tuple[CompiledTemplate, ...] = None,
+                            rng: random.Random = None) -> str:
+        """Generate intelligent call-to-action based on context"""
+        
+        rng = rng or random
+        if available_ctas is None:
+            available_ctas = self._get_cta_pool(platform, viral_score)
+        cta = rng.choice(available_ctas)
         
-        return cta.format(niche=niche)
+        return TEMPLATE_ENGINE.render(cta, {"niche": niche})
     
     def _generate_optimized_hashtags(self, video_data: Dict, platform: str, 
-                                   niche: str, viral_score: int) -> List[str]:
+                                   niche: str, viral_score: int, lookups: Dict = None,
+                                   rng: random.Random = None) -> List[str]:
         """Generate optimized hashtags with trending analysis"""
         
+        rng = rng or random
+        if lookups is None:
+            lookups = {
+                "niche_hashtags": self._get_niche_hashtags(niche),
+                "viral_hashtags": self._get_viral_hashtags(viral_score),
+                "platform_hashtags": self._get_platform_hashtags(platform)
+            }
+        
         config = self.platform_configs.get(platform, self.platform_configs["instagram"])
         optimal_count = config["optimal_hashtags"]
         
         if isinstance(optimal_count, tuple):
-            count = random.randint(optimal_count[0], optimal_count[1])
+            count = rng.randint(optimal_count[0], optimal_count[1])
         else:
             count = optimal_count
         
-        # Build hashtag strategy
-        hashtags = []
-        
-        # Niche-specific hashtags (40%)
-        niche_hashtags = self._get_niche_hashtags(niche)
-        hashtags.extend(niche_hashtags[:max(1, count // 2)])
+        exclude_mask = self._hashtag_exclude_mask()
+        intern_all = HASHTAG_VOCABULARY.intern_all
+        
+        # Niche (40%), viral/trending (30%) and platform (20%) hashtags
+        if self.hashtag_bandit is None:
+            # Static pools: the ordered union only depends on (platform, niche, tier, count)
+            selected, selected_mask = HASHTAG_INDEX.memoized_union(
+                ("enhanced", platform, niche, self._viral_tier(viral_score), count),
+                lambda: [
+                    (intern_all(lookups["niche_hashtags"]), max(1, count // 2)),
+                    (intern_all(lookups["viral_hashtags"]), max(1, count // 3)),
+                    (intern_all(lookups["platform_hashtags"]), max(1, count // 5))
+                ],
+                exclude_mask
+            )
+        else:
+            rank = lambda tags: self.hashtag_bandit.rank(platform, niche, intern_all(tags), rng)
+            selected, selected_mask = HashtagIndex.ordered_union([
+                (rank(lookups["niche_hashtags"]), max(1, count // 2)),
+                (rank(lookups["viral_hashtags"]), max(1, count // 3)),
+                (rank(lookups["platform_hashtags"]), max(1, count // 5))
+            ], exclude_mask)
         
-        # Viral/trending hashtags (30%)
-        viral_hashtags = self._get_viral_hashtags(viral_score)
-        hashtags.extend(viral_hashtags[:max(1, count // 3)])
+        # Content-specific hashtags (10%)
+        content_ids = intern_all(self._extract_content_hashtags(video_data, niche))
+        selected, selected_mask = HashtagIndex.ordered_union(
+            [(content_ids, max(1, count // 10))], exclude_mask, selected, selected_mask
+        )
         
-        # Platform-specific hashtags (20%)
-        platform_hashtags = self._get_platform_hashtags(platform)
-        hashtags.extend(platform_hashtags[:max(1, count // 5)])
+        # Ensure we hit the target count
+        selected, selected_mask = HashtagIndex.pad(
+            selected, selected_mask, BACKUP_HASHTAG_IDS, count, exclude_mask
+        )
         
-        # Content-specific hashtags (10%)
-        content_hashtags = self._extract_content_hashtags(video_data, niche)
-        hashtags.extend(content_hashtags[:max(1, count // 10)])
+        return HASHTAG_VOCABULARY.tags(selected[:count])
+    
+    def _hashtag_exclude_mask(self) -> int:
+        """Bitset of banned tags plus tags that hit their daily usage limit"""
         
-        # Remove duplicates and optimize
-        unique_hashtags = list(dict.fromkeys(hashtags))
+        mask = self.banned_hashtag_mask
+        if self.hashtag_limiter is not None:
+            mask |= self.hashtag_limiter.exhausted_mask()
+        return mask
+    
+    def configure_hashtag_limits(self, config: Optional[Dict]):
+        """Apply a "hashtag_limits" config section (banned tags, max uses per tag per day)"""
+        
+        if not config:
+            return
+        self.ban_hashtags(config.get("banned", []))
+        if config.get("max_uses_per_day"):
+            self.hashtag_limiter = HashtagUsageLimiter(HASHTAG_VOCABULARY, config["max_uses_per_day"])
+    
+    def ban_hashtags(self, tags: List[str]):
+        """Never generate these hashtags"""
         
-        # Ensure we hit the target count
-        while len(unique_hashtags) < count:
-            backup_tags = ["#content", "#viral", "#trending", "#discover"]
-            unique_hashtags.extend([tag for tag in backup_tags if tag not in unique_hashtags])
-            if len(unique_hashtags) >= count:
-                break
+        self.banned_hashtag_mask |= HASHTAG_VOCABULARY.mask(tags)
+    
+    def excluded_hashtags(self) -> List[str]:
+        """Hashtags currently excluded from generation"""
         
-        return unique_hashtags[:count]
+        return HASHTAG_VOCABULARY.mask_tags(self._hashtag_exclude_mask())
     
     def _extract_content_hashtags(self, video_data: Dict, niche: str) -> List[str]:
         """Extract hashtags from video content analysis"""
@@ -567,25 +838,22 @@ class EnhancedContentAI:
         
         return enhanced_platform_hashtags.get(platform, [])
     
-    def _combine_and_optimize(self, hook: str, content: str, cta: str, max_length: int) -> str:
+    def _combine_and_optimize(self, hook: str, content: str, cta: str, max_length: int,
+                              platform: str = None) -> str:
         """Intelligently combine elements and optimize for length"""
         
-        # Calculate space allocation
-        hook_space = len(hook) + 2  # +2 for line breaks
-        cta_space = len(cta) + 2
+        # Calculate space allocation (in the platform's own length units)
+        hook_space = platform_length(hook, platform) + 2  # +2 for line breaks
+        cta_space = platform_length(cta, platform) + 2
         content_space = max_length - hook_space - cta_space - 10  # -10 buffer
         
-        # Truncate content if needed
-        if len(content) > content_space:
-            content = content[:content_space - 3] + "..."
+        # Truncate content if needed, at a word/emoji boundary
+        content = truncate_for_platform(content, content_space, platform)
         
         combined = f"{hook}\n\n{content}\n\n{cta}"
         
         # Final length check
-        if len(combined) > max_length:
-            combined = combined[:max_length - 3] + "..."
-        
-        return combined
+        return truncate_for_platform(combined, max_length, platform)
     
     def _generate_posting_recommendations(self, platform: str, viral_score: int) -> Dict:
         """Generate smart posting recommendations"""
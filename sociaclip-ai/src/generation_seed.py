@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Generation Seed Utilities
+Per-request RNG streams derived from a stable hash of the inputs plus a run seed
+"""
+
+import hashlib
+import os
+import random
+
+# Same run seed + same inputs = same post; change it to get a fresh set of variations
+DEFAULT_RUN_SEED = int(os.environ.get("SOCIACLIP_RUN_SEED", "0"))
+
+def stable_seed(*parts) -> int:
+    """Hash the parts into a 64-bit seed that is stable across processes and platforms"""
+
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def request_rng(run_seed: int, *parts) -> random.Random:
+    """Create an independent random stream for one generation request"""
+
+    return random.Random(stable_seed(run_seed, *parts))
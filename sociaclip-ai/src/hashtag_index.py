@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Hashtag Index Module
+Interned hashtag vocabulary with integer bitsets for selection, dedup, filtering and padding
+"""
+
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (tag ids, how many to take from the front of the source)
+HashtagSource = Tuple[Sequence[int], int]
+
+class HashtagVocabulary:
+    """Interns hashtags to small integer ids so sets of tags become int bitsets"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._tags: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def intern(self, tag: str) -> int:
+        """Get the id of a tag, assigning the next id to new tags"""
+
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            with self._lock:
+                tag_id = self._ids.get(tag)
+                if tag_id is None:
+                    tag_id = len(self._tags)
+                    self._tags.append(tag)
+                    self._ids[tag] = tag_id
+        return tag_id
+
+    def intern_all(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Intern a list of tags, keeping their order"""
+
+        return tuple(self.intern(tag) for tag in tags)
+
+    def mask(self, tags: Iterable[str]) -> int:
+        """Bitset of a collection of tags"""
+
+        mask = 0
+        for tag in tags:
+            mask |= 1 << self.intern(tag)
+        return mask
+
+    def tags(self, tag_ids: Iterable[int]) -> List[str]:
+        """Turn ids back into tags, keeping their order"""
+
+        return [self._tags[tag_id] for tag_id in tag_ids]
+
+    def mask_tags(self, mask: int) -> List[str]:
+        """Tags whose bits are set, in id order"""
+
+        tags = []
+        while mask:
+            low_bit = mask & -mask
+            tags.append(self._tags[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return tags
+
+class HashtagIndex:
+    """Ordered bitset selection over interned hashtag pools, memoized per caller key"""
+
+    def __init__(self, vocabulary: HashtagVocabulary = None, memo_size: int = 4096):
+        self.vocabulary = vocabulary or HashtagVocabulary()
+        self.memo_size = memo_size
+        self._memo: Dict[Tuple, Tuple[Tuple[int, ...], int]] = {}
+
+    @staticmethod
+    def ordered_union(sources: Sequence[HashtagSource], exclude_mask: int = 0,
+                      selected: Tuple[int, ...] = (), selected_mask: int = 0) -> Tuple[Tuple[int, ...], int]:
+        """Take the first `limit` allowed tags of each source in order, skipping duplicates
+
+        Excluded tags do not count towards a source's limit, so the next tag in that
+        source takes their place. Returns the ordered ids and their bitset.
+        """
+
+        ordered = list(selected)
+        mask = selected_mask
+
+        for tag_ids, limit in sources:
+            taken = 0
+            for tag_id in tag_ids:
+                if taken >= limit:
+                    break
+                bit = 1 << tag_id
+                if exclude_mask & bit:
+                    continue
+                taken += 1
+                if mask & bit:
+                    continue
+                mask |= bit
+                ordered.append(tag_id)
+
+        return tuple(ordered), mask
+
+    @staticmethod
+    def pad(selected: Tuple[int, ...], selected_mask: int, padding: Sequence[int], count: int,
+            exclude_mask: int = 0) -> Tuple[Tuple[int, ...], int]:
+        """Top the selection up to count with padding tags that are not already used or excluded"""
+
+        if len(selected) >= count:
+            return selected, selected_mask
+
+        ordered = list(selected)
+        mask = selected_mask
+        for tag_id in padding:
+            if len(ordered) >= count:
+                break
+            bit = 1 << tag_id
+            if (mask | exclude_mask) & bit:
+                continue
+            mask |= bit
+            ordered.append(tag_id)
+
+        return tuple(ordered), mask
+
+    def memoized_union(self, key: Tuple, build_sources: Callable[[], Sequence[HashtagSource]],
+                       exclude_mask: int = 0) -> Tuple[Tuple[int, ...], int]:
+        """ordered_union of the sources built for key, computed once per (key, exclude_mask)"""
+
+        memo_key = key + (exclude_mask,)
+        result = self._memo.get(memo_key)
+        if result is None:
+            result = self.ordered_union(build_sources(), exclude_mask)
+            if len(self._memo) >= self.memo_size:
+                # Exclusion masks change over time; start over rather than track recency
+                self._memo.clear()
+            self._memo[memo_key] = result
+        return result
+
+class HashtagUsageLimiter:
+    """Tracks per-day hashtag use so tags used max_uses_per_day times get excluded"""
+
+    def __init__(self, vocabulary: HashtagVocabulary, max_uses_per_day: int = 3):
+        self.vocabulary = vocabulary
+        self.max_uses_per_day = max_uses_per_day
+        self._day = None
+        self._counts: Dict[int, int] = {}
+        self._exhausted_mask = 0
+        self._lock = threading.Lock()
+
+    def _roll_day(self, day: Optional[str]) -> str:
+        """Reset the counters when the day changes"""
+
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        if day != self._day:
+            self._day = day
+            self._counts = {}
+            self._exhausted_mask = 0
+        return day
+
+    def exhausted_mask(self, day: str = None) -> int:
+        """Bitset of tags that reached the daily limit"""
+
+        with self._lock:
+            self._roll_day(day)
+            return self._exhausted_mask
+
+    def record(self, tags: Iterable[str], day: str = None):
+        """Count one use of each tag"""
+
+        with self._lock:
+            self._roll_day(day)
+            for tag in tags:
+                tag_id = self.vocabulary.intern(tag)
+                uses = self._counts.get(tag_id, 0) + 1
+                self._counts[tag_id] = uses
+                if uses >= self.max_uses_per_day:
+                    self._exhausted_mask |= 1 << tag_id
+
+# Shared by the content generators so every module uses the same tag ids and memo
+HASHTAG_VOCABULARY = HashtagVocabulary()
+HASHTAG_INDEX = HashtagIndex(HASHTAG_VOCABULARY)
+
+def main():
+    """Test bitset hashtag selection with a daily reuse limit"""
+    from enhanced_content_ai import EnhancedContentAI
+
+    ai = EnhancedContentAI()
+    ai.configure_hashtag_limits({"banned": ["#gains"], "max_uses_per_day": 2})
+
+    video_data = {"title": "Workout transformation", "description": "Quick fitness tip", "viral_score": 75}
+
+    print("#️⃣  Testing Hashtag Index...")
+    for i in range(4):
+        post = ai.generate_advanced_post(dict(video_data, title=f"Workout transformation {i}"), "instagram", "fitness")
+        print(f"   Post {i + 1}: {' '.join(post['hashtags'])}")
+
+    print(f"   Excluded now: {' '.join(ai.excluded_hashtags())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Hashtag Performance Module
+Persistent per-platform/niche hashtag engagement counters and a Thompson sampling / UCB selector
+"""
+
+import itertools
+import json
+import math
+import os
+import random
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from hashtag_index import HASHTAG_VOCABULARY, HashtagVocabulary
+
+STORE_FILE_VERSION = 1
+
+# Process-unique store ids: unlike id(), never reused, so shared memos cannot mix up two stores
+_STORE_IDS = itertools.count(1)
+
+class HashtagPerformanceStore:
+    """Impression and engagement counters per (platform, niche, tag), indexed by vocabulary id"""
+
+    def __init__(self, path: str = None, vocabulary: HashtagVocabulary = None):
+        self.path = path
+        self.vocabulary = vocabulary or HASHTAG_VOCABULARY
+        # (platform, niche) -> (impressions, engagements) arrays indexed by tag id
+        self._counters: Dict[Tuple[str, str], Tuple[array, array]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every update so callers can key memos on (store_id, version)
+        self.store_id = next(_STORE_IDS)
+        self.version = 0
+        # Results file -> bytes already ingested, persisted with the counters
+        self._ingested: Dict[str, int] = {}
+
+        if path:
+            self.load()
+        # State last loaded or saved; save() skips the write while it is unchanged
+        self._saved_state = self._state()
+
+    def _context(self, platform: str, niche: str, size: int) -> Tuple[array, array]:
+        """Get the counter arrays for a context, grown to hold size ids"""
+
+        counters = self._counters.get((platform, niche))
+        if counters is None:
+            counters = (array('d'), array('d'))
+            self._counters[(platform, niche)] = counters
+        for column in counters:
+            if len(column) < size:
+                column.extend([0.0] * (size - len(column)))
+        return counters
+
+    def record(self, platform: str, niche: str, tag: str, impressions: float, engagements: float):
+        """Add one observation for a tag (O(1))"""
+
+        tag_id = self.vocabulary.intern(tag)
+        with self._lock:
+            impressions_col, engagements_col = self._context(platform, niche, tag_id + 1)
+            impressions_col[tag_id] += impressions
+            engagements_col[tag_id] += min(engagements, impressions)
+            self.version += 1
+
+    def record_post(self, post: Dict, impressions: float, engagements: float):
+        """Credit a published post's engagement to each of its hashtags"""
+
+        platform = post.get("platform", "instagram")
+        niche = post.get("niche", "mixed")
+        for tag in post.get("hashtags", []):
+            self.record(platform, niche, tag, impressions, engagements)
+
+    def ingest_results(self, results_path: str) -> int:
+        """Credit post results appended to a JSONL file since the last ingest
+
+        Each line is a published post (platform, niche, hashtags) with its
+        "impressions" and "engagements"; lines without metrics are skipped.
+        Returns the number of posts credited.
+        """
+
+        if not results_path or not os.path.exists(results_path):
+            return 0
+
+        offset = self._ingested.get(results_path, 0)
+        if os.path.getsize(results_path) < offset:
+            offset = 0  # file was rotated or truncated
+
+        credited = 0
+        with open(results_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written line, picked up next time
+                offset += len(line)
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(result, dict) or "impressions" not in result or "engagements" not in result:
+                    continue
+                self.record_post(result, float(result["impressions"]), float(result["engagements"]))
+                credited += 1
+
+        self._ingested[results_path] = offset
+        return credited
+
+    def stats(self, platform: str, niche: str, tag_id: int) -> Tuple[float, float]:
+        """(impressions, engagements) for a tag id"""
+
+        counters = self._counters.get((platform, niche))
+        if counters is None or tag_id >= len(counters[0]):
+            return 0.0, 0.0
+        return counters[0][tag_id], counters[1][tag_id]
+
+    def top_tags(self, platform: str, niche: str = None, limit: int = 6,
+                 min_impressions: float = 100) -> List[str]:
+        """Best tags by engagement rate for a platform (all niches when niche is None)"""
+
+        totals: Dict[int, List[float]] = {}
+        with self._lock:
+            for (ctx_platform, ctx_niche), (impressions_col, engagements_col) in self._counters.items():
+                if ctx_platform != platform or (niche is not None and ctx_niche != niche):
+                    continue
+                for tag_id, impressions in enumerate(impressions_col):
+                    if impressions:
+                        total = totals.setdefault(tag_id, [0.0, 0.0])
+                        total[0] += impressions
+                        total[1] += engagements_col[tag_id]
+
+        ranked = sorted(
+            (tag_id for tag_id, (impressions, _) in totals.items() if impressions >= min_impressions),
+            key=lambda tag_id: (-totals[tag_id][1] / totals[tag_id][0], tag_id)
+        )
+        return self.vocabulary.tags(ranked[:limit])
+
+    def load(self) -> int:
+        """Load counters persisted by a previous run"""
+
+        if not self.path or not os.path.exists(self.path):
+            return 0
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading hashtag performance {self.path}: {e}")
+            return 0
+
+        if data.get("version") != STORE_FILE_VERSION:
+            return 0
+
+        loaded = 0
+        for context_key, tags in data.get("contexts", {}).items():
+            platform, niche = context_key.split("|", 1)
+            for tag, (impressions, engagements) in tags.items():
+                self.record(platform, niche, tag, impressions, engagements)
+                loaded += 1
+        self._ingested.update(data.get("ingested", {}))
+        return loaded
+
+    def _state(self) -> Tuple[int, Tuple]:
+        """Counter version plus ingest offsets, compared to skip no-op saves"""
+
+        return self.version, tuple(sorted(self._ingested.items()))
+
+    def save(self) -> bool:
+        """Persist the counters atomically, keyed by tag text (skipped when nothing changed)"""
+
+        state = self._state()
+        if not self.path or state == self._saved_state:
+            return False
+
+        with self._lock:
+            contexts = {}
+            for (platform, niche), (impressions_col, engagements_col) in self._counters.items():
+                contexts[f"{platform}|{niche}"] = {
+                    tag: [impressions_col[tag_id], engagements_col[tag_id]]
+                    for tag_id, tag in enumerate(self.vocabulary.tags(range(len(impressions_col))))
+                    if impressions_col[tag_id]
+                }
+
+        data = {
+            "version": STORE_FILE_VERSION,
+            "saved_at": datetime.now().isoformat(),
+            "contexts": contexts,
+            "ingested": dict(self._ingested)
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._saved_state = state
+
+        return True
+
+class HashtagBandit:
+    """Ranks candidate tags by Thompson sampling or UCB over the performance store"""
+
+    def __init__(self, store: HashtagPerformanceStore, strategy: str = "thompson",
+                 exploration: float = 1.0, prior_impressions: float = 20.0, prior_rate: float = 0.05):
+        if strategy not in ("thompson", "ucb"):
+            raise ValueError(f"Unknown bandit strategy: {strategy}")
+
+        self.store = store
+        self.strategy = strategy
+        self.exploration = exploration
+        # Beta prior worth prior_impressions observations at prior_rate engagement
+        self.prior_alpha = prior_impressions * prior_rate
+        self.prior_beta = prior_impressions * (1 - prior_rate)
+
+    def rank(self, platform: str, niche: str, tag_ids: Sequence[int],
+             rng: random.Random = None) -> Tuple[int, ...]:
+        """Order tag ids best first; ties keep the pool's original order"""
+
+        rng = rng or random
+        observed = [self.store.stats(platform, niche, tag_id) for tag_id in tag_ids]
+
+        if self.strategy == "thompson":
+            values = [
+                rng.betavariate(self.prior_alpha + engagements, self.prior_beta + impressions - engagements)
+                for impressions, engagements in observed
+            ]
+        else:
+            total = sum(impressions for impressions, _ in observed) + 1
+            log_total = math.log(total)
+            values = []
+            for impressions, engagements in observed:
+                trials = impressions + self.prior_alpha + self.prior_beta
+                mean = (engagements + self.prior_alpha) / trials
+                values.append(mean + self.exploration * math.sqrt(2 * log_total / trials))
+
+        order = sorted(range(len(tag_ids)), key=lambda i: (-values[i], i))
+        return tuple(tag_ids[i] for i in order)
+
+def build_hashtag_bandit(config: Optional[Dict]) -> Optional[HashtagBandit]:
+    """Build a bandit from a "hashtag_bandit" config section (None when disabled)
+
+    The store picks up any post results appended to results_path since the last run.
+    """
+
+    if not config or not config.get("enabled", False):
+        return None
+
+    store = HashtagPerformanceStore(config.get("path"))
+    store.ingest_results(config.get("results_path"))
+    return HashtagBandit(store, config.get("strategy", "thompson"), config.get("exploration", 1.0))
+
+def main():
+    """Simulate engagement feedback and watch the bandit shift hashtag choice"""
+    from enhanced_content_ai import EnhancedContentAI
+
+    store = HashtagPerformanceStore()
+    ai = EnhancedContentAI()
+    ai.hashtag_bandit = HashtagBandit(store)
+
+    # Pretend a few tags perform far better than the rest
+    true_rates = {"#cardio": 0.12, "#gains": 0.10, "#strength": 0.09}
+    sim_rng = random.Random(7)
+
+    print("🎰 Testing Hashtag Bandit...")
+    for round_number in range(1, 201):
+        video_data = {"title": f"Workout {round_number}", "description": "", "viral_score": 40}
+        post = ai.generate_advanced_post(video_data, "instagram", "fitness")
+        post["niche"] = "fitness"
+        for tag in post["hashtags"]:
+            engagements = sum(1 for _ in range(100) if sim_rng.random() < true_rates.get(tag, 0.03))
+            store.record("instagram", "fitness", tag, 100, engagements)
+        if round_number in (1, 50, 200):
+            print(f"   Round {round_number:>3}: {' '.join(post['hashtags'])}")
+
+    print(f"   Top tags: {' '.join(store.top_tags('instagram', 'fitness', limit=5))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Hook Scoring Module
+Engagement trigger tables flattened into one weighted word table, with a memo for repeated hooks
+"""
+
+import re
+import time
+from typing import Dict, List, Sequence, Tuple
+
+# category -> (points per trigger word present, trigger words)
+HOOK_TRIGGERS: Dict[str, Tuple[int, Tuple[str, ...]]] = {
+    "urgency": (5, ("now", "today", "immediately", "urgent", "breaking", "alert")),
+    "curiosity": (8, ("secret", "hack", "trick", "revealed", "nobody knows", "hidden")),
+    "social_proof": (6, ("everyone", "viral", "trending", "millions", "thousands")),
+    "emotion": (4, ("amazing", "incredible", "shocking", "unbelievable", "insane")),
+}
+
+EMOJI_POINTS = 3
+EMOJI_CLASS = "[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]"
+
+# Hooks between these lengths (exclusive) get the length bonus
+LENGTH_BONUS_RANGE = (30, 80)
+LENGTH_BONUS_POINTS = 5
+
+class HookScorer:
+    """Scores hooks by trigger words, emojis and length from precomputed tables"""
+
+    def __init__(self, triggers: Dict[str, Tuple[int, Sequence[str]]] = None, memo_size: int = 4096):
+        triggers = triggers or HOOK_TRIGGERS
+
+        # trigger word -> points; a word present anywhere in the hook counts once
+        self._points: Dict[str, int] = {}
+        for points, words in triggers.values():
+            for word in words:
+                self._points[word] = self._points.get(word, 0) + points
+
+        # One flat (word, points) table: a substring test per word, with no per-category loop
+        self._weighted: Tuple[Tuple[str, int], ...] = tuple(self._points.items())
+        self._emoji = re.compile(EMOJI_CLASS)
+
+        self._category_of = {word: category for category, (_, category_words) in triggers.items()
+                             for word in category_words}
+
+        self.memo_size = memo_size
+        self._memo: Dict[str, int] = {}
+
+    def _scan(self, hook: str) -> Tuple[List[str], int]:
+        """Distinct trigger words and emoji count of a hook"""
+
+        lowered = hook.lower()
+        found = [word for word, _ in self._weighted if word in lowered]
+        return found, len(self._emoji.findall(hook))
+
+    def counts(self, hook: str) -> Dict[str, int]:
+        """Trigger words present per category, plus the emoji count"""
+
+        found, emojis = self._scan(hook)
+        counts = dict.fromkeys(self._category_of.values(), 0)
+        for word in found:
+            counts[self._category_of[word]] += 1
+        counts["emoji"] = emojis
+        return counts
+
+    def score(self, hook: str) -> int:
+        """Effectiveness score of one hook"""
+
+        score = self._memo.get(hook)
+        if score is not None:
+            return score
+
+        lowered = hook.lower()
+        score = sum([points for word, points in self._weighted if word in lowered])
+        score += len(self._emoji.findall(hook)) * EMOJI_POINTS
+        if LENGTH_BONUS_RANGE[0] < len(hook) < LENGTH_BONUS_RANGE[1]:
+            score += LENGTH_BONUS_POINTS
+
+        if self.memo_size:
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[hook] = score
+        return score
+
+    def score_many(self, hooks: Sequence[str]) -> List[int]:
+        """Scores of many hooks, in order (repeated hooks are scanned once)"""
+
+        return [self.score(hook) for hook in hooks]
+
+    def best(self, hooks: Sequence[str]) -> str:
+        """Highest scoring hook; ties go to the earliest"""
+
+        scores = self.score_many(hooks)
+        return hooks[max(range(len(hooks)), key=lambda i: (scores[i], -i))]
+
+# Shared by the content generators
+HOOK_SCORER = HookScorer()
+
+def _reference_score(hook: str) -> int:
+    """Straightforward per-list scoring, kept for the benchmark"""
+
+    hook_lower = hook.lower()
+    score = 0
+    for points, words in HOOK_TRIGGERS.values():
+        score += sum(points for word in words if word in hook_lower)
+    score += len(re.findall(EMOJI_CLASS, hook)) * EMOJI_POINTS
+    if LENGTH_BONUS_RANGE[0] < len(hook) < LENGTH_BONUS_RANGE[1]:
+        score += LENGTH_BONUS_POINTS
+    return score
+
+def main():
+    """Compare per-list hook scoring with the flattened scorer"""
+    hooks = [
+        "🚨 FITNESS TRAINERS HATE THIS TRICK:",
+        "🔥 GOING VIRAL: The 30-second move that changed everything:",
+        "The secret nobody knows about trending hacks 😱🚀",
+        "⚡ Breaking: this insane hidden hack is everywhere right now",
+    ] * 2500
+
+    print("🎯 Testing Hook Scoring...")
+    assert [_reference_score(hook) for hook in hooks[:4]] == HOOK_SCORER.score_many(hooks[:4])
+
+    start = time.perf_counter()
+    reference = [_reference_score(hook) for hook in hooks]
+    reference_ms = (time.perf_counter() - start) * 1000
+
+    # Memo disabled: the table scan alone against the reference
+    unmemoized = HookScorer(memo_size=0)
+    start = time.perf_counter()
+    flat = unmemoized.score_many(hooks)
+    flat_ms = (time.perf_counter() - start) * 1000
+
+    scorer = HookScorer()
+    start = time.perf_counter()
+    scores = scorer.score_many(hooks)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   Scores: {scores[:4]} (match reference: {scores == reference == flat})")
+    print(f"   Per-list scoring: {reference_ms:.1f} ms, flat table: {flat_ms:.1f} ms, "
+          f"batch with memo: {batch_ms:.1f} ms ({len(hooks)} hooks)")
+    print(f"   Counts: {scorer.counts(hooks[3])}")
+
+if __name__ == "__main__":
+    main()
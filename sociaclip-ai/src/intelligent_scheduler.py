@@ -7,8 +7,19 @@ Advanced scheduling with viral optimization, audience analysis, and platform alg
 import json
 import random
 from datetime import datetime, timedelta, time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from scheduler_tables import load_scheduler_tables
+from utc_time import to_utc_epoch_minutes
+
+# Recommendation score components shared by the scalar and batch scoring paths
+COMPETITION_SCORES = {"low": 10, "medium": 5, "high": 0}
+OPTIMIZATION_TYPE_BONUSES = {
+    "viral": 5,
+    "algorithm": 3,
+    "audience": 4,
+    "low_competition": 2
+}
 
 @dataclass
 class ScheduleSlot:
@@ -24,180 +35,17 @@ class ScheduleSlot:
 class IntelligentScheduler:
     """Advanced scheduling system with viral optimization and audience intelligence"""
     
-    def __init__(self):
-        self.platform_algorithms = self._build_algorithm_intelligence()
-        self.audience_patterns = self._build_audience_patterns()
-        self.viral_timing_windows = self._build_viral_windows()
-        self.content_type_optimization = self._build_content_optimization()
-    
-    def _build_algorithm_intelligence(self) -> Dict:
-        """Build platform algorithm intelligence for optimal timing"""
-        
-        return {
-            "instagram": {
-                "algorithm_preference": "engagement_velocity",  # Fast early engagement
-                "golden_window": 60,  # minutes for maximum algorithm boost
-                "peak_algorithm_times": ["11:00", "14:00", "17:00", "20:00"],
-                "low_competition_windows": ["08:00", "10:00", "13:00", "16:00", "19:00"],
-                "engagement_decay": {
-                    "0-1h": 1.0,    # 100% algorithm priority
-                    "1-3h": 0.8,    # 80% algorithm priority  
-                    "3-6h": 0.6,    # 60% algorithm priority
-                    "6-24h": 0.3    # 30% algorithm priority
-                },
-                "viral_boost_threshold": 50  # viral score needed for algorithm boost
-            },
-            "tiktok": {
-                "algorithm_preference": "completion_rate",  # Focus on watch time
-                "golden_window": 120,  # minutes for FYP consideration
-                "peak_algorithm_times": ["18:00", "19:00", "20:00", "21:00", "22:00"],
-                "low_competition_windows": ["15:00", "17:00", "23:00"],
-                "engagement_decay": {
-                    "0-2h": 1.0,
-                    "2-4h": 0.9,
-                    "4-8h": 0.7,
-                    "8-24h": 0.4
-                },
-                "viral_boost_threshold": 40
-            },
-            "youtube_shorts": {
-                "algorithm_preference": "click_through_rate",
-                "golden_window": 180,  # minutes for Shorts shelf consideration
-                "peak_algorithm_times": ["14:00", "16:00", "18:00", "20:00"],
-                "low_competition_windows": ["10:00", "12:00", "15:00", "17:00"],
-                "engagement_decay": {
-                    "0-3h": 1.0,
-                    "3-6h": 0.85,
-                    "6-12h": 0.7,
-                    "12-48h": 0.5
-                },
-                "viral_boost_threshold": 60
-            },
-            "twitter": {
-                "algorithm_preference": "real_time_engagement",
-                "golden_window": 30,  # minutes for trending consideration
-                "peak_algorithm_times": ["09:00", "12:00", "15:00", "18:00"],
-                "low_competition_windows": ["10:00", "11:00", "14:00", "16:00"],
-                "engagement_decay": {
-                    "0-30m": 1.0,
-                    "30m-2h": 0.7,
-                    "2h-6h": 0.4,
-                    "6h-24h": 0.2
-                },
-                "viral_boost_threshold": 35
-            }
-        }
-    
-    def _build_audience_patterns(self) -> Dict:
-        """Build audience behavior patterns for different niches and times"""
-        
-        return {
-            "fitness": {
-                "morning_motivation": {
-                    "times": ["06:00", "07:00", "08:00"],
-                    "engagement_multiplier": 1.4,
-                    "content_preference": "motivational_workout"
-                },
-                "lunch_break": {
-                    "times": ["12:00", "13:00"],
-                    "engagement_multiplier": 1.2,
-                    "content_preference": "quick_tips"
-                },
-                "evening_workout": {
-                    "times": ["17:00", "18:00", "19:00"],
-                    "engagement_multiplier": 1.6,
-                    "content_preference": "workout_routines"
-                },
-                "night_inspiration": {
-                    "times": ["21:00", "22:00"],
-                    "engagement_multiplier": 1.3,
-                    "content_preference": "transformation_stories"
-                }
-            },
-            "business": {
-                "morning_productivity": {
-                    "times": ["07:00", "08:00", "09:00"],
-                    "engagement_multiplier": 1.5,
-                    "content_preference": "productivity_hacks"
-                },
-                "midday_break": {
-                    "times": ["12:00", "13:00", "14:00"],
-                    "engagement_multiplier": 1.3,
-                    "content_preference": "success_stories"
-                },
-                "evening_learning": {
-                    "times": ["19:00", "20:00", "21:00"],
-                    "engagement_multiplier": 1.4,
-                    "content_preference": "educational_content"
-                }
-            },
-            "technology": {
-                "morning_news": {
-                    "times": ["08:00", "09:00"],
-                    "engagement_multiplier": 1.3,
-                    "content_preference": "tech_news"
-                },
-                "afternoon_reviews": {
-                    "times": ["15:00", "16:00", "17:00"],
-                    "engagement_multiplier": 1.4,
-                    "content_preference": "product_reviews"
-                },
-                "evening_tutorials": {
-                    "times": ["20:00", "21:00", "22:00"],
-                    "engagement_multiplier": 1.2,
-                    "content_preference": "how_to_guides"
-                }
-            }
-        }
+    def __init__(self, tables: Mapping = None):
+        # Shared frozen tables: built once per process, never copied per instance
+        self.tables = tables or load_scheduler_tables()
+        self.platform_algorithms = self.tables["platform_algorithms"]
+        self.audience_patterns = self.tables["audience_patterns"]
+        self.viral_timing_windows = self.tables["viral_timing_windows"]
+        self.content_type_optimization = self.tables["content_type_optimization"]
+        self._slot_scorer = None
     
-    def _build_viral_windows(self) -> Dict:
-        """Build viral timing windows when content is most likely to go viral"""
-        
-        return {
-            "weekday_viral_windows": [
-                {"start": "11:00", "end": "13:00", "multiplier": 1.4, "reason": "Lunch scroll sessions"},
-                {"start": "17:00", "end": "19:00", "multiplier": 1.6, "reason": "Post-work entertainment"},
-                {"start": "20:00", "end": "22:00", "multiplier": 1.8, "reason": "Prime entertainment hours"}
-            ],
-            "weekend_viral_windows": [
-                {"start": "10:00", "end": "12:00", "multiplier": 1.3, "reason": "Weekend morning leisure"},
-                {"start": "14:00", "end": "16:00", "multiplier": 1.5, "reason": "Afternoon browsing"},
-                {"start": "19:00", "end": "23:00", "multiplier": 2.0, "reason": "Weekend entertainment peak"}
-            ],
-            "viral_content_boost": {
-                "high_viral": {"min_score": 70, "time_multiplier": 1.5},
-                "medium_viral": {"min_score": 50, "time_multiplier": 1.2},
-                "low_viral": {"min_score": 30, "time_multiplier": 1.0}
-            }
-        }
-    
-    def _build_content_optimization(self) -> Dict:
-        """Build content type optimization for different posting times"""
-        
-        return {
-            "morning": {
-                "optimal_content": ["motivation", "tips", "education"],
-                "avoid_content": ["entertainment", "heavy_topics"],
-                "engagement_boost": 1.2
-            },
-            "midday": {
-                "optimal_content": ["quick_tips", "inspiration", "news"],
-                "avoid_content": ["long_form", "complex_tutorials"],
-                "engagement_boost": 1.1
-            },
-            "evening": {
-                "optimal_content": ["entertainment", "stories", "transformation"],
-                "avoid_content": ["work_related", "productivity"],
-                "engagement_boost": 1.4
-            },
-            "night": {
-                "optimal_content": ["inspiration", "relaxation", "reflection"],
-                "avoid_content": ["high_energy", "workout_intensive"],
-                "engagement_boost": 1.3
-            }
-        }
-    
-    def generate_optimal_schedule(self, posts: List[Dict], target_date: str = None) -> List[Dict]:
+    def generate_optimal_schedule(self, posts: List[Dict], target_date: str = None,
+                                  timezone_name: str = "UTC") -> List[Dict]:
         """Generate optimal posting schedule with viral timing and audience optimization"""
         
         if not target_date:
@@ -205,6 +53,9 @@ class IntelligentScheduler:
         
         scheduled_posts = []
         
+        # Score every post's candidate slots in one vectorized pass when NumPy is available
+        batch_options = self._batch_time_options(posts)
+        
         # Analyze posts and create schedule recommendations
         for i, post in enumerate(posts):
             platform = post.get("platform", "instagram")
@@ -212,7 +63,10 @@ class IntelligentScheduler:
             viral_score = post.get("viral_score", 0)
             
             # Generate multiple time slot options
-            time_options = self._generate_time_options(platform, niche, viral_score)
+            if batch_options is not None:
+                time_options = batch_options[i]
+            else:
+                time_options = self._generate_time_options(platform, niche, viral_score)
             
             # Select best time slot avoiding conflicts
             best_slot = self._select_best_slot(time_options, scheduled_posts, platform)
@@ -222,6 +76,8 @@ class IntelligentScheduler:
             scheduled_post.update({
                 "scheduled_date": target_date,
                 "scheduled_time": best_slot.time,
+                "scheduled_timezone": timezone_name,
+                "scheduled_utc_minute": to_utc_epoch_minutes(target_date, best_slot.time, timezone_name),
                 "scheduling_intelligence": {
                     "expected_engagement": best_slot.expected_engagement,
                     "viral_multiplier": best_slot.viral_multiplier,
@@ -240,39 +96,57 @@ class IntelligentScheduler:
         
         return scheduled_posts
     
-    def _generate_time_options(self, platform: str, niche: str, viral_score: int) -> List[ScheduleSlot]:
-        """Generate optimal time slot options for a specific post"""
+    def _batch_time_options(self, posts: List[Dict]) -> Optional[List[List[ScheduleSlot]]]:
+        """Time options for every post from the batch scorer, or None without NumPy"""
+        
+        if self._slot_scorer is None:
+            # Imported lazily: slot_scoring builds on this module
+            from slot_scoring import BatchSlotScorer, np
+            if np is None:
+                return None
+            self._slot_scorer = BatchSlotScorer(self)
+        
+        return self._slot_scorer.time_options(posts)
+    
+    def _time_option_candidates(self, platform: str, niche: str) -> List[Tuple[str, str, float, float]]:
+        """Candidate (time, optimization type, engagement factor, viral factor) slots for a post"""
         
         algorithm_data = self.platform_algorithms.get(platform, self.platform_algorithms["instagram"])
         audience_data = self.audience_patterns.get(niche, self.audience_patterns["fitness"])
         
-        time_options = []
+        candidates = []
         
         # Platform algorithm optimal times
         for time_str in algorithm_data["peak_algorithm_times"]:
-            slot = self._create_schedule_slot(time_str, platform, niche, viral_score, "algorithm")
-            time_options.append(slot)
+            candidates.append((time_str, "algorithm", 1.0, 1.0))
         
         # Low competition windows
         for time_str in algorithm_data["low_competition_windows"]:
-            slot = self._create_schedule_slot(time_str, platform, niche, viral_score, "low_competition")
-            time_options.append(slot)
+            candidates.append((time_str, "low_competition", 1.0, 1.0))
         
         # Audience behavior optimal times
         for period, data in audience_data.items():
             for time_str in data["times"]:
-                slot = self._create_schedule_slot(time_str, platform, niche, viral_score, "audience")
-                slot.expected_engagement *= data["engagement_multiplier"]
-                time_options.append(slot)
+                candidates.append((time_str, "audience", data["engagement_multiplier"], 1.0))
         
         # Viral window optimization
         viral_windows = self._get_viral_windows_for_day(datetime.now().weekday())
         for window in viral_windows:
-            window_times = self._generate_times_in_window(window["start"], window["end"])
-            for time_str in window_times:
-                slot = self._create_schedule_slot(time_str, platform, niche, viral_score, "viral")
-                slot.viral_multiplier *= window["multiplier"]
-                time_options.append(slot)
+            for time_str in self._generate_times_in_window(window["start"], window["end"]):
+                candidates.append((time_str, "viral", 1.0, window["multiplier"]))
+        
+        return candidates
+    
+    def _generate_time_options(self, platform: str, niche: str, viral_score: int) -> List[ScheduleSlot]:
+        """Generate optimal time slot options for a specific post"""
+        
+        time_options = []
+        
+        for time_str, optimization_type, engagement_factor, viral_factor in self._time_option_candidates(platform, niche):
+            slot = self._create_schedule_slot(time_str, platform, niche, viral_score, optimization_type)
+            slot.expected_engagement *= engagement_factor
+            slot.viral_multiplier *= viral_factor
+            time_options.append(slot)
         
         # Remove duplicates and sort by recommendation score
         unique_slots = self._deduplicate_slots(time_options)
@@ -316,28 +190,7 @@ class IntelligentScheduler:
         """Calculate expected base engagement for time and platform"""
         
         # Platform-specific engagement patterns
-        platform_patterns = {
-            "instagram": {
-                "peak_hours": [11, 14, 17, 20],
-                "good_hours": [8, 10, 13, 16, 19, 21],
-                "low_hours": [0, 1, 2, 3, 4, 5, 6, 22, 23]
-            },
-            "tiktok": {
-                "peak_hours": [18, 19, 20, 21, 22],
-                "good_hours": [15, 16, 17, 23],
-                "low_hours": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
-            },
-            "youtube_shorts": {
-                "peak_hours": [14, 16, 18, 20],
-                "good_hours": [10, 12, 15, 17, 19, 21],
-                "low_hours": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 13, 22, 23]
-            },
-            "twitter": {
-                "peak_hours": [9, 12, 15, 18],
-                "good_hours": [8, 10, 11, 13, 14, 16, 17, 19],
-                "low_hours": [0, 1, 2, 3, 4, 5, 6, 7, 20, 21, 22, 23]
-            }
-        }
+        platform_patterns = self.tables["engagement_hours"]
         
         pattern = platform_patterns.get(platform, platform_patterns["instagram"])
         
@@ -349,11 +202,7 @@ class IntelligentScheduler:
             base = 0.4
         
         # Niche-specific adjustments
-        niche_multipliers = {
-            "fitness": {"morning": 1.2, "evening": 1.3, "night": 1.1},
-            "business": {"morning": 1.4, "midday": 1.2, "evening": 1.1},
-            "technology": {"morning": 1.1, "afternoon": 1.3, "evening": 1.2}
-        }
+        niche_multipliers = self.tables["niche_period_multipliers"]
         
         if 6 <= hour < 12:
             period = "morning"
@@ -384,12 +233,7 @@ class IntelligentScheduler:
         
         # Time-based viral boost
         hour = int(time_str.split(":")[0])
-        viral_hours = {
-            "instagram": [11, 14, 17, 20],
-            "tiktok": [18, 19, 20, 21],
-            "youtube_shorts": [16, 18, 20],
-            "twitter": [12, 15, 18]
-        }
+        viral_hours = self.tables["viral_hours"]
         
         platform_viral_hours = viral_hours.get(platform, viral_hours["instagram"])
         
@@ -406,12 +250,7 @@ class IntelligentScheduler:
         hour = int(time_str.split(":")[0])
         
         # High-competition hours (everyone posts here)
-        high_competition_hours = {
-            "instagram": [12, 18, 20],
-            "tiktok": [19, 20, 21],
-            "youtube_shorts": [18, 20],
-            "twitter": [12, 18]
-        }
+        high_competition_hours = self.tables["overlap_busy_hours"]
         
         platform_busy_hours = high_competition_hours.get(platform, high_competition_hours["instagram"])
         
@@ -427,12 +266,7 @@ class IntelligentScheduler:
         
         hour = int(time_str.split(":")[0])
         
-        high_competition_hours = {
-            "instagram": [12, 17, 18, 20],
-            "tiktok": [19, 20, 21],
-            "youtube_shorts": [18, 20],
-            "twitter": [12, 15, 18]
-        }
+        high_competition_hours = self.tables["competition_busy_hours"]
         
         platform_busy = high_competition_hours.get(platform, high_competition_hours["instagram"])
         
@@ -459,17 +293,10 @@ class IntelligentScheduler:
         score += (1.0 - overlap) * 20
         
         # Competition penalty/bonus (10 points)
-        competition_scores = {"low": 10, "medium": 5, "high": 0}
-        score += competition_scores.get(competition, 5)
+        score += COMPETITION_SCORES.get(competition, 5)
         
         # Optimization type bonus
-        type_bonuses = {
-            "viral": 5,
-            "algorithm": 3, 
-            "audience": 4,
-            "low_competition": 2
-        }
-        score += type_bonuses.get(opt_type, 0)
+        score += OPTIMIZATION_TYPE_BONUSES.get(opt_type, 0)
         
         return min(int(score), 100)  # Cap at 100
     
@@ -626,39 +453,87 @@ class IntelligentScheduler:
         
         return strategy
     
-    def analyze_schedule_performance(self, scheduled_posts: List[Dict]) -> Dict:
+    def analyze_schedule_performance(self, scheduled_posts: Iterable[Dict]) -> Dict:
         """Analyze the overall schedule for optimization opportunities"""
         
-        analysis = {
-            "total_posts": len(scheduled_posts),
-            "platform_distribution": {},
-            "time_distribution": {},
-            "viral_potential_score": 0,
-            "optimization_score": 0,
-            "recommendations": []
-        }
+        return ScheduleAnalyticsAggregator().add_many(scheduled_posts).result()
+
+class ScheduleAnalyticsAggregator:
+    """Single-pass, mergeable aggregator behind analyze_schedule_performance
+    
+    Posts can be fed incrementally with add()/add_many(), and partial aggregates
+    built over separate shards (tenants, days, workers) combined with merge().
+    """
+    
+    def __init__(self):
+        self.total_posts = 0
+        self.platform_distribution = {}
+        self.time_distribution = {}
+        self.viral_score_sum = 0
+        self.optimization_score_sum = 0
+        # Posts per (date, time) slot; bounded by distinct slots, not by posts
+        self.slot_counts = {}
+    
+    def add(self, post: Dict) -> "ScheduleAnalyticsAggregator":
+        """Fold one scheduled post into the aggregate"""
+        
+        self.total_posts += 1
         
-        # Platform distribution
-        for post in scheduled_posts:
-            platform = post.get("platform", "unknown")
-            analysis["platform_distribution"][platform] = analysis["platform_distribution"].get(platform, 0) + 1
+        platform = post.get("platform", "unknown")
+        self.platform_distribution[platform] = self.platform_distribution.get(platform, 0) + 1
         
-        # Time distribution
-        for post in scheduled_posts:
-            time_slot = post.get("scheduled_time", "unknown")
-            hour = time_slot.split(":")[0] if ":" in time_slot else "unknown"
-            analysis["time_distribution"][f"{hour}:xx"] = analysis["time_distribution"].get(f"{hour}:xx", 0) + 1
+        time_slot = post.get("scheduled_time") or "unknown"
+        hour = time_slot.split(":")[0] if ":" in time_slot else "unknown"
+        self.time_distribution[f"{hour}:xx"] = self.time_distribution.get(f"{hour}:xx", 0) + 1
         
-        # Overall viral potential
-        viral_scores = [post.get("viral_score", 0) for post in scheduled_posts]
-        analysis["viral_potential_score"] = sum(viral_scores) / len(viral_scores) if viral_scores else 0
+        self.viral_score_sum += post.get("viral_score", 0)
+        self.optimization_score_sum += post.get("scheduling_intelligence", {}).get("recommendation_score", 50)
         
-        # Overall optimization score
-        optimization_scores = [
-            post.get("scheduling_intelligence", {}).get("recommendation_score", 50) 
-            for post in scheduled_posts
-        ]
-        analysis["optimization_score"] = sum(optimization_scores) / len(optimization_scores) if optimization_scores else 50
+        slot = (post.get("scheduled_date"), post.get("scheduled_time"))
+        self.slot_counts[slot] = self.slot_counts.get(slot, 0) + 1
+        
+        return self
+    
+    def add_many(self, posts: Iterable[Dict]) -> "ScheduleAnalyticsAggregator":
+        """Fold an iterable (or generator) of scheduled posts into the aggregate"""
+        
+        for post in posts:
+            self.add(post)
+        return self
+    
+    def merge(self, other: "ScheduleAnalyticsAggregator") -> "ScheduleAnalyticsAggregator":
+        """Combine another shard's aggregate into this one"""
+        
+        self.total_posts += other.total_posts
+        self.viral_score_sum += other.viral_score_sum
+        self.optimization_score_sum += other.optimization_score_sum
+        
+        for target, source in [(self.platform_distribution, other.platform_distribution),
+                               (self.time_distribution, other.time_distribution),
+                               (self.slot_counts, other.slot_counts)]:
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+        
+        return self
+    
+    @property
+    def conflict_count(self) -> int:
+        """Number of posts sharing a date and time slot with an earlier post"""
+        
+        return self.total_posts - len(self.slot_counts)
+    
+    def result(self) -> Dict:
+        """Build the schedule analysis from the aggregate"""
+        
+        analysis = {
+            "total_posts": self.total_posts,
+            "platform_distribution": dict(self.platform_distribution),
+            "time_distribution": dict(self.time_distribution),
+            "viral_potential_score": self.viral_score_sum / self.total_posts if self.total_posts else 0,
+            "optimization_score": self.optimization_score_sum / self.total_posts if self.total_posts else 50,
+            "conflict_count": self.conflict_count,
+            "recommendations": []
+        }
         
         # Generate recommendations
         if analysis["optimization_score"] < 70:
@@ -667,7 +542,7 @@ class IntelligentScheduler:
         if analysis["viral_potential_score"] > 60:
             analysis["recommendations"].append("High viral potential detected - consider paid promotion")
         
-        if len(set(post.get("scheduled_time") for post in scheduled_posts)) < len(scheduled_posts):
+        if self.conflict_count > 0:
             analysis["recommendations"].append("Some posts scheduled too close together - spread out timing")
         
         return analysis
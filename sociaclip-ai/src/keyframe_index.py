@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Keyframe Index Module
+Per-video keyframe timestamps and byte offsets, built once with ffprobe and stored compactly in the media store
+"""
+
+import bisect
+import struct
+import subprocess
+import threading
+from array import array
+from typing import Dict, Optional, Tuple
+from media_store import MediaStore
+
+INDEX_MAGIC = b"SCKI"
+INDEX_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # magic, version, keyframe count
+
+class KeyframeIndex:
+    """Sorted keyframe times (float64) and their byte positions in the file (int64, -1 if unknown)"""
+
+    def __init__(self, times: array = None, positions: array = None):
+        self.times = times if times is not None else array('d')
+        self.positions = positions if positions is not None else array('q')
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def probe(cls, source_path: str, ffprobe: str = "ffprobe", timeout_seconds: float = 120) -> "KeyframeIndex":
+        """Build the index from one ffprobe packet scan (demux only, no decoding)"""
+
+        command = [
+            ffprobe, "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,pos,flags", "-of", "csv=p=0", source_path
+        ]
+        output = subprocess.run(command, capture_output=True, text=True, timeout=timeout_seconds, check=True).stdout
+
+        keyframes = []
+        for line in output.splitlines():
+            fields = line.split(",")
+            if len(fields) < 3 or "K" not in fields[2] or fields[0] in ("", "N/A"):
+                continue
+            position = int(fields[1]) if fields[1].isdigit() else -1
+            keyframes.append((float(fields[0]), position))
+        keyframes.sort()
+
+        return cls(array('d', (time for time, _ in keyframes)), array('q', (position for _, position in keyframes)))
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form: header, then the two packed columns"""
+
+        return _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self.times)) + self.times.tobytes() + self.positions.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KeyframeIndex":
+        """Parse the binary form written by to_bytes"""
+
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("Unsupported keyframe index")
+
+        times, positions = array('d'), array('q')
+        offset = _HEADER.size
+        times.frombytes(data[offset:offset + count * times.itemsize])
+        offset += count * times.itemsize
+        positions.frombytes(data[offset:offset + count * positions.itemsize])
+        if len(times) != count or len(positions) != count:
+            raise ValueError("Truncated keyframe index")
+        return cls(times, positions)
+
+    def keyframe_at_or_before(self, time: float) -> Optional[int]:
+        """Index of the last keyframe at or before time"""
+
+        index = bisect.bisect_right(self.times, time) - 1
+        return index if index >= 0 else None
+
+    def byte_range(self, start: float, end: float) -> Tuple[Optional[int], Optional[int]]:
+        """Approximate [first, last) bytes a cut from start to end reads (None when unknown / to EOF)"""
+
+        first = self.keyframe_at_or_before(start)
+        first_byte = self.positions[first] if first is not None and self.positions[first] >= 0 else None
+        after = bisect.bisect_right(self.times, end)
+        last_byte = self.positions[after] if after < len(self.positions) and self.positions[after] >= 0 else None
+        return first_byte, last_byte
+
+class KeyframeIndexCache:
+    """Loads or builds the index of each source once, persisting it in the media store"""
+
+    def __init__(self, media_store: MediaStore, ffprobe: str = "ffprobe", memo_size: int = 64):
+        self.media_store = media_store
+        self.ffprobe = ffprobe
+        self.memo_size = memo_size
+        self._memo: Dict[str, KeyframeIndex] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {"memo_hits": 0, "store_hits": 0, "built": 0}
+
+    def get(self, source_path: str, source_key: str) -> KeyframeIndex:
+        """Index for a source identified by source_key (content hash for store objects)"""
+
+        index = self._memo.get(source_key)
+        if index is not None:
+            with self._lock:
+                self.stats["memo_hits"] += 1
+            return index
+
+        store_source = f"keyframes:{source_key}"
+        stored_path = self.media_store.lookup(store_source)
+        index = None
+        if stored_path:
+            try:
+                with open(stored_path, 'rb') as f:
+                    index = KeyframeIndex.from_bytes(f.read())
+                with self._lock:
+                    self.stats["store_hits"] += 1
+            except (OSError, ValueError, struct.error):
+                index = None
+
+        if index is None:
+            index = KeyframeIndex.probe(source_path, self.ffprobe)
+            self.media_store.put_bytes(index.to_bytes(), ".kfi", source=store_source)
+            with self._lock:
+                self.stats["built"] += 1
+
+        with self._lock:
+            if len(self._memo) >= self.memo_size:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[source_key] = index
+        return index
+
+def main():
+    """Round-trip a synthetic index through the media store"""
+    import tempfile
+
+    store = MediaStore(tempfile.mkdtemp())
+    # 10-minute video, keyframe every 2 s at ~500 KB/s
+    index = KeyframeIndex(array('d', (i * 2.0 for i in range(300))), array('q', (i * 1_000_000 for i in range(300))))
+    store.put_bytes(index.to_bytes(), ".kfi", source="keyframes:demo")
+
+    cache = KeyframeIndexCache(store)
+    loaded = cache.get("unused.mp4", "demo")
+
+    print("🗝️  Testing Keyframe Index...")
+    print(f"   {len(loaded)} keyframes in {len(index.to_bytes())} bytes")
+    print(f"   Keyframe before 61.3s: {loaded.times[loaded.keyframe_at_or_before(61.3)]}s")
+    first, last = loaded.byte_range(61.3, 76.3)
+    print(f"   Bytes read for a 15s clip at 61.3s: {(last - first) / 1e6:.0f} MB of {300} MB, stats {cache.stats}")
+
+if __name__ == "__main__":
+    main()
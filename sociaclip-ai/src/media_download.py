@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Media Download Module
+Streaming downloads into the media store: reusable chunk buffer, resumable range requests, sha256 on the fly
+"""
+
+import hashlib
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+from media_store import MediaStore
+
+class DownloadError(Exception):
+    """Raised when a download cannot be completed"""
+
+class StreamingDownloader:
+    """Downloads with memory bounded by chunk_size, whatever the file size"""
+
+    def __init__(self, chunk_size: int = 1024 * 1024, max_attempts: int = 3, timeout_seconds: float = 30):
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.timeout_seconds = timeout_seconds
+        # One buffer per thread, reused for every chunk of every download
+        self._local = threading.local()
+        # Concurrent downloads of one URL would share its partial file; a lock lives while in use
+        self._url_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+        self._locks_lock = threading.Lock()
+
+    def _buffer(self) -> memoryview:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = memoryview(bytearray(self.chunk_size))
+            self._local.buffer = buffer
+        return buffer
+
+    def _hash_existing(self, f, digest) -> int:
+        """Feed bytes already in a partial file to the digest; returns their count"""
+
+        buffer = self._buffer()
+        f.seek(0)
+        total = 0
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                return total
+            digest.update(buffer[:read])
+            total += read
+
+    def download(self, session, url: str, store: MediaStore, suffix: str = "", pin: bool = False,
+                 expected_sha256: str = None, headers: Dict = None) -> str:
+        """Stream url into the store and return the stored path
+
+        A partial file left by a dropped connection (in this call or an earlier
+        run) is resumed with a Range request, guarded by If-Range with the
+        ETag/Last-Modified it was started from, so a changed file is fetched anew.
+        """
+
+        with self._locks_lock:
+            url_lock = self._url_locks.get(url)
+            if url_lock is None:
+                url_lock = threading.Lock()
+                self._url_locks[url] = url_lock
+
+        with url_lock:
+            partial_path = store.partial_path(url)
+            validator_path = f"{partial_path}.validator"
+            with open(partial_path, 'a+b') as f:
+                digest = self._download_to(session, url, f, headers, validator_path)
+            self._remove(validator_path)
+
+            sha256 = digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256:
+                os.remove(partial_path)
+                raise DownloadError(f"Checksum mismatch for {url}: {sha256}")
+
+            return store.commit_file(partial_path, sha256, suffix, source=url, pin=pin)
+
+    def _download_to(self, session, url: str, f, headers: Optional[Dict], validator_path: str):
+        """Complete the partial file f, retrying dropped connections; returns its sha256 object"""
+
+        # Bytes from an earlier run are hashed once; retries continue the same digest
+        state = {"digest": hashlib.sha256(), "validator": self._read_validator(validator_path)}
+        self._hash_existing(f, state["digest"])
+
+        attempt = 0
+        while True:
+            attempt += 1
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+
+            request_headers = dict(headers or {})
+            if offset and state["validator"]:
+                request_headers["Range"] = f"bytes={offset}-"
+                request_headers["If-Range"] = state["validator"]
+            elif offset:
+                # Nothing to tell whether the server's file is still the one we started
+                f.truncate(0)
+                state["digest"] = hashlib.sha256()
+                offset = 0
+
+            try:
+                total = self._fetch(session, url, request_headers, f, offset, state, validator_path)
+            except DownloadError:
+                raise
+            except Exception as e:
+                # Connection drops, timeouts and 5xx: resume from what was written
+                if attempt >= self.max_attempts:
+                    raise DownloadError(f"Download failed after {attempt} attempts: {url}: {e}") from e
+                continue
+
+            written = f.tell()
+            if total is None or written >= total:
+                return state["digest"]
+            if attempt >= self.max_attempts:
+                raise DownloadError(f"Download incomplete ({written}/{total} bytes): {url}")
+
+    def _fetch(self, session, url: str, headers: Dict, f, offset: int, state: Dict,
+               validator_path: str) -> Optional[int]:
+        """One request appending the body to f and to state["digest"]; returns the full size if known"""
+
+        with session.get(url, headers=headers, stream=True, timeout=self.timeout_seconds) as response:
+            if response.status_code == 416 and offset:
+                # Nothing left to fetch: the partial file already holds the whole body
+                return None
+
+            if response.status_code == 206 and offset:
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rsplit("/", 1)[-1]
+                total = int(total) if total.isdigit() else None
+            elif response.status_code == 200:
+                if offset:
+                    # Range ignored or If-Range failed (the file changed): start over
+                    f.truncate(0)
+                    state["digest"] = hashlib.sha256()
+                state["validator"] = self._response_validator(response)
+                self._write_validator(validator_path, state["validator"])
+                length = response.headers.get("Content-Length")
+                total = int(length) if length and length.isdigit() else None
+            elif response.status_code >= 500 or response.status_code in (408, 429):
+                raise ConnectionError(f"HTTP {response.status_code}")
+            else:
+                raise DownloadError(f"HTTP {response.status_code} for {url}")
+
+            raw = response.raw
+            raw.decode_content = True
+            buffer = self._buffer()
+            digest = state["digest"]
+            while True:
+                read = raw.readinto(buffer)
+                if not read:
+                    break
+                chunk = buffer[:read]
+                # Written before hashed, so after a drop the digest covers exactly the file
+                f.write(chunk)
+                digest.update(chunk)
+            f.flush()
+
+            return total
+
+    def _response_validator(self, response) -> Optional[str]:
+        """Strong ETag, else Last-Modified (weak ETags are not allowed in If-Range)"""
+
+        etag = response.headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return response.headers.get("Last-Modified")
+
+    def _read_validator(self, validator_path: str) -> Optional[str]:
+        try:
+            with open(validator_path, 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _write_validator(self, validator_path: str, validator: Optional[str]):
+        if validator:
+            with open(validator_path, 'w') as f:
+                f.write(validator)
+        else:
+            self._remove(validator_path)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def main():
+    """Stream a file from a local server and compare memory use with buffering it whole"""
+    import functools
+    import http.server
+    import requests
+    import tempfile
+    import tracemalloc
+
+    root = tempfile.mkdtemp()
+    with open(os.path.join(root, "video.bin"), 'wb') as f:
+        f.write(os.urandom(20 * 1024 * 1024))
+
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(QuietHandler, directory=root)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/video.bin"
+
+    store = MediaStore(os.path.join(root, "store"))
+    downloader = StreamingDownloader(chunk_size=256 * 1024)
+
+    print("⬇️  Testing Streaming Download...")
+    with requests.Session() as session:
+        tracemalloc.start()
+        buffered = session.get(url).content
+        _, buffered_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        path = downloader.download(session, url, store, ".bin")
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    with open(path, 'rb') as f:
+        matches = f.read() == buffered
+    print(f"   Buffered peak: {buffered_peak / 1024 ** 2:.1f} MB, streamed peak: {streamed_peak / 1024 ** 2:.1f} MB")
+    print(f"   Stored as {os.path.basename(path)[:16]}... (content matches: {matches})")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Media Store Module
+Content-addressed on-disk media store with a size quota, LRU eviction and pinning of in-flight files
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+class MediaStore:
+    """Stores media files under the sha256 of their content, shared by every processor in the process
+
+    objects/<ab>/<digest><suffix> holds the content, refs/<sha256 of source> maps
+    a source (e.g. a thumbnail URL) to its object so it is only downloaded once.
+    Pinned objects (acquired by an in-flight job) are never evicted.
+    """
+
+    def __init__(self, root: str = "data/media", max_bytes: int = 2 * 1024 ** 3,
+                 tmp_grace_seconds: float = 3600):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Temp files modified more recently may be another process's in-progress write
+        self.tmp_grace_seconds = tmp_grace_seconds
+        self.objects_dir = os.path.join(root, "objects")
+        self.refs_dir = os.path.join(root, "refs")
+        self.tmp_dir = os.path.join(root, "tmp")
+        # Interrupted downloads, kept across runs so they can be resumed
+        self.partial_dir = os.path.join(root, "partial")
+        for directory in (self.objects_dir, self.refs_dir, self.tmp_dir, self.partial_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        # path -> [size, last access]; rebuilt from disk so the quota covers earlier runs
+        self._objects: Dict[str, list] = {}
+        self._pins: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._scan()
+
+    def _scan(self):
+        """Index the objects already on disk and drop stale leftovers of interrupted writes"""
+
+        cutoff = time.time() - self.tmp_grace_seconds
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+        for directory, _, names in os.walk(self.objects_dir):
+            for name in names:
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                self._objects[path] = [stat.st_size, stat.st_mtime]
+                self._total_bytes += stat.st_size
+
+    def _object_path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}{suffix}")
+
+    def _ref_path(self, source: str) -> str:
+        return os.path.join(self.refs_dir, hashlib.sha256(source.encode("utf-8")).hexdigest())
+
+    def _touch(self, path: str, pin: bool):
+        """Mark an indexed object as just used (caller holds the lock)"""
+
+        self._objects[path][1] = time.time()
+        if pin:
+            self._pins[path] = self._pins.get(path, 0) + 1
+
+    def lookup(self, source: str, pin: bool = False) -> Optional[str]:
+        """Path of the object previously stored for source, if it is still in the store"""
+
+        try:
+            with open(self._ref_path(source), 'r') as f:
+                path = os.path.join(self.objects_dir, f.read().strip())
+        except OSError:
+            path = None
+
+        with self._lock:
+            if path is None or path not in self._objects:
+                self.stats["misses"] += 1
+                return None
+            self._touch(path, pin)
+            self.stats["hits"] += 1
+
+        # Persist recency for the next run's scan
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def temp_path(self) -> str:
+        """Private path inside the store for writing a file before commit_file"""
+
+        return os.path.join(self.tmp_dir, uuid.uuid4().hex)
+
+    def content_key(self, path: str) -> str:
+        """Identity of a file for caching results derived from it (its hash for store objects)"""
+
+        if os.path.realpath(path).startswith(os.path.realpath(self.objects_dir) + os.sep):
+            return os.path.basename(path).split(".")[0]
+        stat = os.stat(path)
+        return f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def partial_path(self, source: str) -> str:
+        """Stable path for the partial download of source"""
+
+        return os.path.join(self.partial_dir, hashlib.sha256(source.encode("utf-8")).hexdigest())
+
+    def put_bytes(self, data: bytes, suffix: str = "", source: str = None, pin: bool = False) -> str:
+        """Store content and return its path"""
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest, suffix)
+        with self._lock:
+            exists = path in self._objects
+
+        if exists:
+            return self._commit(path, None, len(data), source, pin)
+
+        temp_path = self.temp_path()
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        return self._commit(path, temp_path, len(data), source, pin)
+
+    def commit_file(self, temp_path: str, digest: str, suffix: str = "", source: str = None,
+                    pin: bool = False) -> str:
+        """Move a fully written temp_path file whose sha256 is digest into the store"""
+
+        return self._commit(self._object_path(digest, suffix), temp_path, os.path.getsize(temp_path), source, pin)
+
+    def _commit(self, path: str, temp_path: Optional[str], size: int, source: Optional[str], pin: bool) -> str:
+        """Atomically publish an object and its source ref, then enforce the quota"""
+
+        with self._lock:
+            if path in self._objects:
+                # Same content already stored (maybe by a concurrent job)
+                if temp_path:
+                    os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+                self._objects[path] = [size, 0.0]
+                self._total_bytes += size
+                self.stats["writes"] += 1
+            self._touch(path, pin)
+
+        if source:
+            ref_temp = self.temp_path()
+            with open(ref_temp, 'w') as f:
+                f.write(os.path.relpath(path, self.objects_dir))
+            os.replace(ref_temp, self._ref_path(source))
+
+        self.evict()
+        return path
+
+    def acquire(self, path: str):
+        """Pin an object while a job uses it"""
+
+        with self._lock:
+            if path in self._objects:
+                self._touch(path, pin=True)
+
+    def release(self, path: Optional[str]):
+        """Unpin an object acquired by a job"""
+
+        if not path:
+            return
+        with self._lock:
+            pins = self._pins.get(path, 0) - 1
+            if pins > 0:
+                self._pins[path] = pins
+            else:
+                self._pins.pop(path, None)
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used unpinned objects until the store fits max_bytes"""
+
+        removed = []
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return 0
+            for path, (size, _) in sorted(self._objects.items(), key=lambda item: item[1][1]):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                if path in self._pins:
+                    continue
+                del self._objects[path]
+                self._total_bytes -= size
+                removed.append(path)
+            self.stats["evictions"] += len(removed)
+
+        # Stale refs are harmless: lookup checks the object is still indexed
+        for path in removed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(removed)
+
+    def usage(self) -> Tuple[int, int]:
+        """(objects, bytes) currently stored"""
+
+        with self._lock:
+            return len(self._objects), self._total_bytes
+
+_STORES: Dict[str, MediaStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def shared_media_store(root: str = "data/media", max_bytes: int = 2 * 1024 ** 3) -> MediaStore:
+    """The process-wide store for a root directory (one index and quota per directory)"""
+
+    key = os.path.realpath(root)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = MediaStore(root, max_bytes)
+            _STORES[key] = store
+        return store
+
+def build_media_store(config: Optional[Dict]) -> MediaStore:
+    """Get the shared store for a "media_store" config section"""
+
+    config = config or {}
+    return shared_media_store(config.get("root", "data/media"), int(config.get("max_mb", 2048) * 1024 ** 2))
+
+def main():
+    """Test content-addressed storage, dedup and LRU eviction"""
+    import tempfile
+
+    store = MediaStore(tempfile.mkdtemp(), max_bytes=3000)
+
+    print("📦 Testing Media Store...")
+    first = store.put_bytes(b"a" * 1000, ".jpg", source="https://example.com/a.jpg")
+    same = store.put_bytes(b"a" * 1000, ".jpg", source="https://example.com/a-copy.jpg")
+    print(f"   Identical content shares one object: {first == same}")
+    print(f"   Lookup by source: {store.lookup('https://example.com/a.jpg') == first}")
+
+    pinned = store.put_bytes(b"b" * 1000, ".jpg", pin=True)
+    for i in range(3):
+        store.put_bytes(bytes([i]) * 1000, ".jpg")
+
+    print(f"   Pinned object kept: {os.path.exists(pinned)}, first object evicted: {not os.path.exists(first)}")
+    store.release(pinned)
+    print(f"   Usage: {store.usage()}, stats: {store.stats}")
+
+if __name__ == "__main__":
+    main()
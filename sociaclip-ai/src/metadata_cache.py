@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Metadata Cache Module
+Persistent SQLite cache of video metadata keyed by canonical video ID, with TTLs and negative entries
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_metadata (
+    key TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    negative INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+# SQLite's default limit on host parameters per statement is 999
+_QUERY_CHUNK = 500
+
+class MetadataCache:
+    """Key-value store of oEmbed results; failed lookups are cached too, for a shorter time"""
+
+    def __init__(self, path: str = ":memory:", ttl_seconds: float = 7 * 24 * 3600,
+                 negative_ttl_seconds: float = 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # One connection shared by the processing threads, serialized by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(CACHE_SCHEMA)
+
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached info for a key, or None when missing or expired"""
+
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Fresh cached info for each key that has it
+
+        Negative entries come back as the stored fallback info with "negative": True.
+        """
+
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        found = {}
+
+        with self._lock:
+            for offset in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[offset:offset + _QUERY_CHUNK]
+                rows = self._connection.execute(
+                    f"SELECT key, info, negative FROM video_metadata "
+                    f"WHERE expires_at > ? AND key IN ({','.join('?' * len(chunk))})",
+                    [now] + chunk
+                ).fetchall()
+                for key, info, negative in rows:
+                    info = json.loads(info)
+                    if negative:
+                        info["negative"] = True
+                    found[key] = info
+
+            negative_hits = sum(1 for info in found.values() if info.get("negative"))
+            self.stats["hits"] += len(found) - negative_hits
+            self.stats["negative_hits"] += negative_hits
+            self.stats["misses"] += len(keys) - len(found)
+
+        return found
+
+    def put(self, key: str, info: Dict, negative: bool = False):
+        """Store info for a key; negative marks a failed lookup"""
+
+        self.put_many({key: info}, negative)
+
+    def put_many(self, items: Dict[str, Dict], negative: bool = False):
+        """Store several entries in one transaction"""
+
+        now = time.time()
+        expires_at = now + (self.negative_ttl_seconds if negative else self.ttl_seconds)
+        rows = [
+            (key, json.dumps({k: v for k, v in info.items() if k not in ("cache_hit", "negative")}, default=str),
+             int(negative), now, expires_at)
+            for key, info in items.items()
+        ]
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO video_metadata (key, info, negative, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired entries"""
+
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM video_metadata WHERE expires_at <= ?", (time.time(),))
+            return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM video_metadata").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+
+        with self._lock:
+            self._connection.close()
+
+def build_metadata_cache(config: Optional[Dict]) -> Optional[MetadataCache]:
+    """Build a metadata cache from a "metadata_cache" config section"""
+
+    if not config or not config.get("enabled", True):
+        return None
+
+    return MetadataCache(
+        config.get("path", ":memory:"),
+        ttl_seconds=config.get("ttl_hours", 168) * 3600,
+        negative_ttl_seconds=config.get("negative_ttl_minutes", 60) * 60
+    )
+
+def main():
+    """Test the metadata cache in front of the video processor"""
+    from video_processor import VideoProcessor
+
+    processor = VideoProcessor()
+    processor.metadata_cache = MetadataCache()
+
+    urls = ["https://www.youtube.com/watch?v=dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ",
+            "https://www.tiktok.com/@user/video/7123456789012345678?lang=en"]
+
+    print("🗃️  Testing Metadata Cache...")
+    for attempt in range(2):
+        start = time.perf_counter()
+        for url in urls:
+            processor._extract_video_info(url)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"   Pass {attempt + 1}: {elapsed_ms:.1f} ms, stats {processor.metadata_cache.stats}")
+
+    print(f"   Entries: {len(processor.metadata_cache)}")
+
+if __name__ == "__main__":
+    main()
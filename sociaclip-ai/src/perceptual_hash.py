@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Perceptual Hash Module
+64-bit dHash of thumbnails and a multi-index hash table for near-duplicate lookup by Hamming distance
+"""
+
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+HASH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS thumbnail_hashes (
+    video_key TEXT PRIMARY KEY,
+    hash INTEGER NOT NULL,
+    added_at REAL NOT NULL
+)
+"""
+
+_HASH_WIDTH, _HASH_HEIGHT = 9, 8  # one extra column: each bit compares a pixel with its right neighbour
+
+def dhash_from_pixels(pixels: bytes, width: int = _HASH_WIDTH, height: int = _HASH_HEIGHT) -> int:
+    """Difference hash of a width x height grayscale image: (width - 1) * height bits"""
+
+    value = 0
+    for row in range(height):
+        offset = row * width
+        for column in range(width - 1):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+def image_dhash(image_path: str, ffmpeg: str = "ffmpeg", timeout_seconds: float = 30) -> int:
+    """dHash of an image file, downscaled to 9x8 grayscale by ffmpeg"""
+
+    command = [ffmpeg, "-nostdin", "-v", "error", "-i", image_path, "-frames:v", "1",
+               "-vf", f"scale={_HASH_WIDTH}:{_HASH_HEIGHT}:flags=area,format=gray", "-f", "rawvideo", "-"]
+    pixels = subprocess.run(command, capture_output=True, timeout=timeout_seconds, check=True).stdout
+    if len(pixels) < _HASH_WIDTH * _HASH_HEIGHT:
+        raise ValueError(f"Could not decode {image_path}")
+    return dhash_from_pixels(pixels)
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+class MultiIndexHash:
+    """Hamming-radius lookup by multi-index hashing
+
+    Each 64-bit hash is split into chunks, with one table per chunk. Two hashes
+    within max_distance differ in at most max_distance // chunks bits of some
+    chunk (pigeonhole), so a lookup only reads the buckets of chunk values that
+    close to the query's instead of comparing against every stored hash.
+    """
+
+    def __init__(self, max_distance: int = 6, chunks: int = 4):
+        self.max_distance = max_distance
+        self.chunks = chunks
+        self._chunk_bits = 64 // chunks
+        self._chunk_mask = (1 << self._chunk_bits) - 1
+        chunk_radius = max_distance // chunks
+        self._flip_masks = [mask for mask in range(1 << self._chunk_bits) if mask.bit_count() <= chunk_radius]
+        # Per chunk: chunk value -> [(hash, item)]
+        self._tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(chunks)]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _chunk_values(self, value: int) -> List[int]:
+        return [(value >> (chunk * self._chunk_bits)) & self._chunk_mask for chunk in range(self.chunks)]
+
+    def add(self, value: int, item: str):
+        """Index an item under its hash"""
+
+        entry = (value, item)
+        for table, chunk_value in zip(self._tables, self._chunk_values(value)):
+            table.setdefault(chunk_value, []).append(entry)
+        self._size += 1
+
+    def search(self, value: int) -> List[Tuple[int, str]]:
+        """(distance, item) for every item within max_distance, nearest first"""
+
+        matches = {}
+        for table, chunk_value in zip(self._tables, self._chunk_values(value)):
+            for mask in self._flip_masks:
+                for entry in table.get(chunk_value ^ mask, ()):
+                    if entry[1] not in matches:
+                        distance = hamming_distance(value, entry[0])
+                        if distance <= self.max_distance:
+                            matches[entry[1]] = distance
+
+        return sorted((distance, item) for item, distance in matches.items())
+
+class DuplicateIndex:
+    """Thumbnail hashes of processed videos, persisted in SQLite and shared by every process using the file"""
+
+    def __init__(self, path: str = ":memory:", max_distance: int = 6):
+        self.path = path
+        self.max_distance = max_distance
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(HASH_SCHEMA)
+
+        self._index = MultiIndexHash(max_distance)
+        self._hashes: Dict[str, int] = {}
+        self._loaded_rowid = 0
+        with self._lock:
+            self._refresh()
+
+        self.stats = {"duplicates": 0, "unique": 0}
+
+    def _refresh(self):
+        """Load hashes other processes added since the last refresh (caller holds the lock)"""
+
+        # rowids only grow, so this is an index range read rather than a table scan
+        rows = self._connection.execute(
+            "SELECT rowid, video_key, hash FROM thumbnail_hashes WHERE rowid > ? ORDER BY rowid",
+            (self._loaded_rowid,)
+        ).fetchall()
+        for rowid, video_key, value in rows:
+            if video_key not in self._hashes:
+                value &= 0xFFFFFFFFFFFFFFFF  # stored as a signed 64-bit integer
+                self._hashes[video_key] = value
+                self._index.add(value, video_key)
+            self._loaded_rowid = rowid
+
+    def find(self, value: int, exclude: str = None) -> Optional[Tuple[int, str]]:
+        """Nearest indexed (distance, video_key) within max_distance, ignoring exclude"""
+
+        with self._lock:
+            self._refresh()
+            for distance, video_key in self._index.search(value):
+                if video_key != exclude:
+                    return distance, video_key
+        return None
+
+    def check_and_add(self, video_key: str, value: int) -> Optional[Tuple[int, str]]:
+        """Return the near duplicate of a video if one is indexed, else index the video and return None"""
+
+        with self._lock, self._connection:
+            self._refresh()
+            for distance, other_key in self._index.search(value):
+                if other_key != video_key:
+                    self.stats["duplicates"] += 1
+                    return distance, other_key
+
+            self.stats["unique"] += 1
+            if video_key not in self._hashes:
+                signed = value - (1 << 64) if value >= 1 << 63 else value
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO thumbnail_hashes (video_key, hash, added_at) VALUES (?, ?, ?)",
+                    (video_key, signed, time.time())
+                )
+                self._hashes[video_key] = value
+                self._index.add(value, video_key)
+        return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def close(self):
+        """Close the database connection"""
+
+        with self._lock:
+            self._connection.close()
+
+def build_duplicate_index(config: Optional[Dict]) -> Optional[DuplicateIndex]:
+    """Build a duplicate index from a "duplicate_detection" config section"""
+
+    if not config or not config.get("enabled", True) or not shutil.which(config.get("ffmpeg", "ffmpeg")):
+        return None
+
+    return DuplicateIndex(config.get("path", ":memory:"), max_distance=config.get("max_distance", 6))
+
+def main():
+    """Index random hashes and look up slightly altered copies"""
+    import random
+
+    rng = random.Random(0)
+    index = DuplicateIndex(max_distance=6)
+    hashes = [rng.getrandbits(64) for _ in range(20000)]
+
+    print("🧬 Testing Perceptual Hash Index...")
+    start = time.perf_counter()
+    for number, value in enumerate(hashes):
+        index.check_and_add(f"video-{number}", value)
+    print(f"   Indexed {len(index)} hashes in {time.perf_counter() - start:.2f} s")
+
+    # Re-uploads: a few bits flipped by re-encoding, cropping or a watermark
+    start = time.perf_counter()
+    found = 0
+    for number in range(0, 20000, 100):
+        altered = hashes[number] ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+        match = index.find(altered)
+        found += bool(match and match[1] == f"video-{number}")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   {found}/200 re-uploads matched in {elapsed_ms:.0f} ms ({elapsed_ms / 200:.2f} ms per lookup)")
+
+    # dHash compares neighbouring pixels, so a brightened re-upload keeps (nearly) the same hash
+    pixels = bytes(rng.randrange(40, 200) for _ in range(_HASH_WIDTH * _HASH_HEIGHT))
+    brightened = bytes(min(255, pixel + 30) for pixel in pixels)
+    print(f"   Distance between a thumbnail and its brightened copy: "
+          f"{hamming_distance(dhash_from_pixels(pixels), dhash_from_pixels(brightened))} bits")
+
+if __name__ == "__main__":
+    main()
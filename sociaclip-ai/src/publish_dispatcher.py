@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Publish Dispatcher Module
+Long-running heap-ordered timer queue that publishes scheduled posts at their UTC time
+"""
+
+import glob
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from utc_time import post_utc_epoch_minutes
+
+# Named pipe schedule writers use to announce new files to a watching dispatcher
+DISPATCHER_FIFO = os.path.join("data", "publish_dispatcher.fifo")
+# Published-post results JSONL that HashtagPerformanceStore.ingest_results reads
+POST_RESULTS_PATH = os.path.join("data", "analytics", "post_results.jsonl")
+
+def notify_dispatcher(filepath: str, fifo_path: str = DISPATCHER_FIFO) -> bool:
+    """Announce a newly written schedule file to a running watch_directory dispatcher
+
+    Returns False when no dispatcher is listening; it picks the file up when it next starts.
+    """
+
+    try:
+        fd = os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+    except OSError:  # ENOENT: never started, ENXIO: not running
+        return False
+    try:
+        # One short line per write is atomic on a pipe, so concurrent writers never interleave
+        os.write(fd, (os.path.abspath(filepath) + "\n").encode())
+    finally:
+        os.close(fd)
+    return True
+
+class Publisher(ABC):
+    """Interface for platform publishers used by the dispatcher"""
+
+    @abstractmethod
+    def publish(self, post: Dict) -> Dict:
+        """Publish a post and return a result dict with at least a "status" key"""
+
+class LocalPublisher(Publisher):
+    """Stand-in publisher that appends posts to a local JSONL outbox per platform"""
+
+    def __init__(self, outbox_dir: str = "data/published"):
+        self.outbox_dir = outbox_dir
+        self._lock = threading.Lock()
+        os.makedirs(outbox_dir, exist_ok=True)
+
+    def publish(self, post: Dict) -> Dict:
+        """Write the post to the outbox as if it had been published"""
+
+        platform = post.get("platform", "unknown")
+        published_at = datetime.now(timezone.utc).isoformat()
+        record = {
+            "id": post.get("id"),
+            "platform": platform,
+            "full_post": post.get("full_post", post.get("caption", "")),
+            "scheduled_utc_minute": post.get("scheduled_utc_minute"),
+            "published_at": published_at
+        }
+
+        outbox_path = os.path.join(self.outbox_dir, f"{platform}.jsonl")
+        with self._lock:
+            with open(outbox_path, 'a') as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+        return {
+            "status": "published",
+            "published_at": published_at,
+            "platform_post_id": f"local_{platform}_{post.get('id', 'post')}"
+        }
+
+class ScheduleStatusWriter:
+    """on_result callback that writes each post's publish status back into the schedule file it came from
+
+    Without it a restarted dispatcher would reload already published posts
+    as "scheduled" and publish them again.
+    """
+
+    STATUS_FIELDS = ("status", "published_at", "platform_post_id", "publish_error", "publish_attempts")
+
+    def __init__(self):
+        # id(post) -> (schedule file, post id, index in the file)
+        self._locations: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def track(self, filepath: str, post: Dict, index: int):
+        """Remember where a queued post lives"""
+
+        with self._lock:
+            self._locations[id(post)] = (filepath, post.get("id"), index)
+
+    def forget(self, post: Dict):
+        """Drop a post that was tracked but never queued"""
+
+        with self._lock:
+            self._locations.pop(id(post), None)
+
+    def __call__(self, post: Dict, result: Dict):
+        with self._lock:
+            location = self._locations.get(id(post))
+            if location is None:
+                return
+            filepath, post_id, index = location
+
+            updates = {field: post[field] for field in self.STATUS_FIELDS if field in post}
+            if result.get("platform_post_id"):
+                updates["platform_post_id"] = result["platform_post_id"]
+
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+            posts = (data.get("posts") or data.get("scheduled_posts") or []) if isinstance(data, dict) else data
+
+            # Match by id (the file may have been regenerated since loading), by position without one
+            if post_id is not None:
+                target = next((p for p in posts if p.get("id") == post_id), None)
+            else:
+                target = posts[index] if index < len(posts) else None
+            if target is None:
+                return
+            target.update(updates)
+
+            # Write-then-rename: a crash mid-write never leaves a truncated schedule
+            temp_path = f"{filepath}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
+            os.replace(temp_path, filepath)
+
+            if post.get("status") in ("published", "failed", "expired"):
+                del self._locations[id(post)]
+
+class PostResultsWriter:
+    """on_result callback that appends each published post to the results JSONL the hashtag store ingests
+
+    A line carries "impressions"/"engagements" when the publisher reports them; collectors
+    that fetch metrics later append them with record_metrics.
+    """
+
+    RESULT_FIELDS = ("id", "platform", "niche", "hashtags", "published_at")
+
+    def __init__(self, results_path: str = POST_RESULTS_PATH):
+        self.results_path = results_path
+        self._lock = threading.Lock()
+
+    def __call__(self, post: Dict, result: Dict):
+        if post.get("status") != "published":
+            return
+
+        extra = {field: result[field] for field in ("platform_post_id", "impressions", "engagements")
+                 if field in result}
+        self._append(post, extra)
+
+    def record_metrics(self, post: Dict, impressions: float, engagements: float):
+        """Append a published post's final metrics so the next ingest credits its hashtags"""
+
+        self._append(post, {"impressions": impressions, "engagements": engagements})
+
+    def _append(self, post: Dict, extra: Dict):
+        """Append one JSON line (whole lines only, so a concurrent ingest never reads half of one)"""
+
+        record = {field: post[field] for field in self.RESULT_FIELDS if field in post}
+        record.update(extra)
+        line = json.dumps(record, default=str) + "\n"
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.results_path) or ".", exist_ok=True)
+            with open(self.results_path, 'a') as f:
+                f.write(line)
+
+class PublishDispatcher:
+    """Fires scheduled posts at their due time with bounded concurrency per platform"""
+
+    def __init__(self, publishers: Dict[str, Publisher] = None, default_publisher: Publisher = None,
+                 max_workers_per_platform: int = 2, timezone_name: str = "UTC",
+                 max_attempts: int = 3, retry_delay_seconds: float = 60,
+                 max_lateness_minutes: Optional[float] = 60,
+                 results_path: Optional[str] = POST_RESULTS_PATH,
+                 on_result: Callable[[Dict, Dict], None] = None):
+        self.publishers = publishers or {}
+        self.default_publisher = default_publisher or LocalPublisher()
+        self.max_workers_per_platform = max_workers_per_platform
+        self.timezone_name = timezone_name
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        # Posts due longer ago than this (e.g. after downtime) expire instead of firing late; None disables
+        self.max_lateness_minutes = max_lateness_minutes
+        self.on_result = on_result
+        self.status_writer = ScheduleStatusWriter()
+        # Feeds the hashtag performance store; None disables
+        self.results_writer = PostResultsWriter(results_path) if results_path else None
+        # Posts already queued from schedule files, so re-reading a file does not queue them twice
+        self._loaded_keys = set()
+
+        # Heap of (due_epoch_seconds, sequence, post); sequence keeps FIFO order on ties
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._pending = 0
+        self._running = False
+        self._thread = None
+
+        self.stats = {"scheduled": 0, "published": 0, "failed": 0, "retried": 0, "skipped": 0,
+                      "expired": 0}
+
+    def schedule(self, post: Dict) -> bool:
+        """Queue a post for publishing at its scheduled time
+
+        Posts without a resolvable time are skipped; posts more than max_lateness_minutes
+        overdue are marked "expired" rather than published immediately.
+        """
+
+        due_minute = post_utc_epoch_minutes(post, self.timezone_name)
+        if due_minute is None:
+            with self._condition:
+                self.stats["skipped"] += 1
+            return False
+
+        if self.max_lateness_minutes is not None and time.time() - due_minute * 60 > self.max_lateness_minutes * 60:
+            post["status"] = "expired"
+            with self._condition:
+                self.stats["expired"] += 1
+            return False
+
+        self._push(due_minute * 60, post)
+        with self._condition:
+            self.stats["scheduled"] += 1
+        return True
+
+    def schedule_many(self, posts: List[Dict]) -> int:
+        """Queue several posts, returning how many were accepted"""
+
+        return sum(1 for post in posts if self.schedule(post))
+
+    def load_schedule_file(self, filepath: str) -> int:
+        """Queue every not-yet-published post from a scheduled posts or export JSON file"""
+
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+
+        if isinstance(data, dict):
+            posts = data.get("posts") or data.get("scheduled_posts") or []
+        else:
+            posts = data
+
+        accepted = 0
+        for index, post in enumerate(posts):
+            key = (os.path.abspath(filepath), post.get("id", index))
+            if post.get("status", "scheduled") != "scheduled" or key in self._loaded_keys:
+                continue
+            self._loaded_keys.add(key)
+
+            # Tracked before queueing so a post that fires at once still finds its file
+            self.status_writer.track(filepath, post, index)
+            if self.schedule(post):
+                accepted += 1
+            elif post.get("status") == "expired":
+                # Written back so restarts do not reconsider it; the writer then drops it
+                try:
+                    self.status_writer(post, {})
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Could not record status of {post.get('id')}: {e}")
+                    self.status_writer.forget(post)
+            else:
+                self.status_writer.forget(post)
+        return accepted
+
+    def watch_directory(self, directory: str, pattern: str = "posts_*.json",
+                        fifo_path: str = DISPATCHER_FIFO):
+        """Run in the foreground, queueing the directory's schedule files and then each file
+        announced through notify_dispatcher
+
+        The dispatcher blocks on a named pipe between announcements instead of rescanning the directory.
+        """
+
+        if not os.path.exists(fifo_path):
+            os.makedirs(os.path.dirname(fifo_path) or ".", exist_ok=True)
+            os.mkfifo(fifo_path)
+
+        self.start()
+        try:
+            for filepath in sorted(glob.glob(os.path.join(directory, pattern))):
+                self._load_announced(filepath)
+
+            # Opened read-write so the pipe always has a writer: reads block instead of hitting EOF,
+            # and writers never find it without a reader between announcements
+            with os.fdopen(os.open(fifo_path, os.O_RDWR), 'r') as fifo:
+                for line in fifo:
+                    filepath = line.strip()
+                    if filepath:
+                        self._load_announced(filepath)
+        except KeyboardInterrupt:
+            print("🛑 Stopping publish dispatcher...")
+        finally:
+            self.stop()
+
+    def _load_announced(self, filepath: str):
+        """Queue a schedule file, reporting instead of raising on unreadable files"""
+
+        try:
+            loaded = self.load_schedule_file(filepath)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load {filepath}: {e}")
+            return
+        if loaded:
+            print(f"📥 Queued {loaded} posts from {filepath}")
+
+    def _push(self, due_epoch_seconds: float, post: Dict):
+        """Push onto the timer heap, waking the loop if the head changed"""
+
+        with self._condition:
+            heapq.heappush(self._queue, (due_epoch_seconds, next(self._sequence), post))
+            self._pending += 1
+            if self._queue[0][2] is post:
+                self._condition.notify_all()
+
+    def start(self):
+        """Start the dispatch loop in a background thread"""
+
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run_loop, name="publish-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Stop the dispatch loop; in-flight publishes finish when wait is True"""
+
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._executors = {}
+
+    def run_forever(self):
+        """Run the dispatcher in the foreground until interrupted"""
+
+        self.start()
+        try:
+            while self._thread and self._thread.is_alive():
+                self._thread.join(timeout=3600)
+        except KeyboardInterrupt:
+            print("🛑 Stopping publish dispatcher...")
+        finally:
+            self.stop()
+
+    def wait_until_idle(self, timeout: float = None) -> bool:
+        """Block until every queued post has been published or failed"""
+
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(timeout=remaining)
+        return True
+
+    def _run_loop(self):
+        """Sleep until the earliest due post, then hand it to its platform's workers"""
+
+        with self._condition:
+            while self._running:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+
+                delay = self._queue[0][0] - time.time()
+                if delay > 0:
+                    # Woken early by stop() or by a post that became the new head
+                    self._condition.wait(timeout=delay)
+                    continue
+
+                due_epoch_seconds, _, post = heapq.heappop(self._queue)
+                self._executor_for(post.get("platform", "unknown")).submit(self._publish, post)
+
+    def _executor_for(self, platform: str) -> ThreadPoolExecutor:
+        """Get the bounded worker pool for a platform"""
+
+        executor = self._executors.get(platform)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=self.max_workers_per_platform,
+                thread_name_prefix=f"publish-{platform}"
+            )
+            self._executors[platform] = executor
+        return executor
+
+    def _publish(self, post: Dict):
+        """Publish one post, re-queueing it with a delay on failure"""
+
+        platform = post.get("platform", "unknown")
+        publisher = self.publishers.get(platform, self.default_publisher)
+        attempt = post.get("publish_attempts", 0) + 1
+        post["publish_attempts"] = attempt
+
+        try:
+            result = publisher.publish(post)
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+
+        retry = False
+        with self._condition:
+            if result.get("status") == "published":
+                post["status"] = "published"
+                post["published_at"] = result.get("published_at")
+                self.stats["published"] += 1
+            elif attempt < self.max_attempts:
+                self.stats["retried"] += 1
+                retry = True
+            else:
+                post["status"] = "failed"
+                post["publish_error"] = result.get("error", "Unknown error")
+                self.stats["failed"] += 1
+
+        if retry:
+            self._push(time.time() + self.retry_delay_seconds * attempt, post)
+
+        try:
+            self.status_writer(post, result)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not record status of {post.get('id')}: {e}")
+
+        if self.results_writer:
+            try:
+                self.results_writer(post, result)
+            except OSError as e:
+                print(f"⚠️ Could not record result of {post.get('id')}: {e}")
+
+        if self.on_result:
+            self.on_result(post, result)
+
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify_all()
+
+def main():
+    """Run the dispatcher on a schedule file or directory, or test it with the local stand-in publisher"""
+    dispatcher = PublishDispatcher(max_workers_per_platform=2)
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--watch":
+        print(f"📤 Publish dispatcher watching {sys.argv[2]}")
+        dispatcher.watch_directory(sys.argv[2])
+        return
+
+    if len(sys.argv) > 1:
+        loaded = dispatcher.load_schedule_file(sys.argv[1])
+        print(f"📤 Publish dispatcher running with {loaded} scheduled posts from {sys.argv[1]}")
+        dispatcher.run_forever()
+        return
+
+    now_minute = int(time.time()) // 60
+    test_posts = [
+        {"id": f"{platform}_test_{i}", "platform": platform, "caption": f"Test post {i}",
+         "scheduled_utc_minute": now_minute, "status": "scheduled"}
+        for i, platform in enumerate(["instagram", "tiktok", "youtube_shorts", "twitter"])
+    ]
+
+    print("📤 Testing Publish Dispatcher...")
+    dispatcher.schedule_many(test_posts)
+    dispatcher.start()
+    dispatcher.wait_until_idle(timeout=10)
+    dispatcher.stop()
+
+    print(f"   Stats: {dispatcher.stats}")
+    print(f"   Outbox: {dispatcher.default_publisher.outbox_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Scene Detection Module
+Scene cuts from low-resolution grayscale frames scored with batched NumPy histogram and pixel differences
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+from clip_extraction import FFMPEG_BINARY
+from media_store import MediaStore
+
+try:
+    import numpy as np
+except ImportError:  # optional: without NumPy moments keep their unsnapped boundaries
+    np = None
+
+SCENE_CACHE_VERSION = 1
+HISTOGRAM_BINS = 16  # power of two: a pixel's bin is its value shifted right
+_BIN_SHIFT = 8 - (HISTOGRAM_BINS - 1).bit_length()
+
+def decode_frame_batches(source_path: str, fps: float = 4.0, width: int = 64, height: int = 36,
+                         batch_frames: int = 256, ffmpeg: str = FFMPEG_BINARY) -> Iterator["np.ndarray"]:
+    """Yield (frames, height * width) uint8 grayscale batches sampled at fps"""
+
+    command = [ffmpeg, "-nostdin", "-v", "error", "-i", source_path, "-an",
+               "-vf", f"fps={fps},scale={width}:{height},format=gray", "-f", "rawvideo", "-"]
+    frame_bytes = width * height
+    buffer = bytearray(frame_bytes * batch_frames)
+    view = memoryview(buffer)
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        finished = False
+        while not finished:
+            filled = 0
+            while filled < len(buffer):
+                read = process.stdout.readinto(view[filled:])
+                if not read:
+                    finished = True
+                    break
+                filled += read
+            frames = filled // frame_bytes
+            if frames:
+                yield np.frombuffer(buffer, dtype=np.uint8, count=frames * frame_bytes).reshape(frames, frame_bytes).copy()
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+def frame_change_scores(batches: Iterator["np.ndarray"]) -> "np.ndarray":
+    """Change score between each sampled frame and the previous one (score[0] is 0)
+
+    Half normalized histogram distance (robust to motion), half mean absolute
+    pixel difference (catches cuts between similarly lit shots).
+    """
+
+    previous_frame = None
+    previous_histogram = None
+    parts = []
+
+    for frames in batches:
+        count, pixels = frames.shape
+        bins = (frames >> _BIN_SHIFT).astype(np.int64)
+        offsets = np.arange(count, dtype=np.int64)[:, None] * HISTOGRAM_BINS
+        histograms = np.bincount((bins + offsets).ravel(), minlength=count * HISTOGRAM_BINS)
+        histograms = histograms.reshape(count, HISTOGRAM_BINS).astype(np.float32) / pixels
+
+        signed = frames.astype(np.int16)
+        if previous_frame is None:
+            previous_frame, previous_histogram = signed[:1], histograms[:1]
+
+        stacked_frames = np.concatenate((previous_frame, signed))
+        stacked_histograms = np.concatenate((previous_histogram, histograms))
+        pixel_diff = np.abs(np.diff(stacked_frames, axis=0)).mean(axis=1) / 255.0
+        histogram_diff = np.abs(np.diff(stacked_histograms, axis=0)).sum(axis=1) / 2.0
+        parts.append(0.5 * histogram_diff + 0.5 * pixel_diff)
+
+        previous_frame, previous_histogram = signed[-1:], histograms[-1:]
+
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+def pick_cuts(scores: "np.ndarray", fps: float, threshold: float = 0.3, sensitivity: float = 3.0,
+              min_scene_seconds: float = 1.0) -> List[float]:
+    """Timestamps where the change score spikes above max(threshold, mean + sensitivity * std)"""
+
+    if len(scores) < 2:
+        return []
+
+    limit = max(threshold, float(scores.mean() + sensitivity * scores.std()))
+    cuts = []
+    for index in np.flatnonzero(scores > limit):
+        time = index / fps
+        if cuts and time - cuts[-1] < min_scene_seconds:
+            continue
+        cuts.append(round(float(time), 3))
+    return cuts
+
+def snap_moment(moment: Dict, cuts: List[float], tolerance_seconds: float = 2.0,
+                min_duration: float = 5.0, max_duration: float = None) -> Dict:
+    """Move a moment's start/end onto the nearest scene cuts within tolerance
+
+    A snap that would stretch the clip past max_duration is dropped (end first, then start).
+    """
+
+    if not cuts:
+        return moment
+
+    def nearest(time: float) -> Optional[float]:
+        best = min(cuts, key=lambda cut: abs(cut - time))
+        return best if abs(best - time) <= tolerance_seconds else None
+
+    start, end = moment["start_time"], moment["end_time"]
+    snapped_start = nearest(start)
+    snapped_end = nearest(end)
+
+    new_start = snapped_start if snapped_start is not None else start
+    new_end = snapped_end if snapped_end is not None and snapped_end - new_start >= min_duration else end
+    if max_duration is not None:
+        if new_end - new_start > max_duration:
+            new_end = end
+        if new_end - new_start > max_duration:
+            new_start = start
+    if new_end - new_start < min_duration:
+        return moment
+
+    snapped = dict(moment)
+    snapped.update(start_time=new_start, end_time=new_end, duration=round(new_end - new_start, 3),
+                   scene_snapped=(new_start != start or new_end != end))
+    return snapped
+
+class SceneDetector:
+    """Scene cut detection on a worker pool, cached in the media store per video content hash"""
+
+    def __init__(self, media_store: MediaStore, fps: float = 4.0, max_workers: int = None,
+                 threshold: float = 0.3, ffmpeg: str = FFMPEG_BINARY):
+        self.media_store = media_store
+        self.fps = fps
+        self.threshold = threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.ffmpeg = shutil.which(ffmpeg)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        self.stats = {"cached": 0, "detected": 0}
+        # detect runs on pool threads
+        self._stats_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return np is not None and self.ffmpeg is not None
+
+    def submit(self, source_path: str) -> Future:
+        """Start detection on the pool (e.g. alongside audio analysis); result is the cut list"""
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scene-detect")
+        return self._executor.submit(self.detect, source_path)
+
+    def detect(self, source_path: str) -> List[float]:
+        """Scene cut timestamps of a video, computed once per content hash"""
+
+        cache_source = (f"scenes:v{SCENE_CACHE_VERSION}:{self.media_store.content_key(source_path)}:"
+                        f"{self.fps}:{self.threshold}")
+        cached_path = self.media_store.lookup(cache_source)
+        if cached_path:
+            try:
+                with open(cached_path, 'r') as f:
+                    cuts = json.load(f)["cuts"]
+                with self._stats_lock:
+                    self.stats["cached"] += 1
+                return cuts
+            except (OSError, ValueError, KeyError):
+                pass
+
+        scores = frame_change_scores(decode_frame_batches(source_path, self.fps, ffmpeg=self.ffmpeg))
+        cuts = pick_cuts(scores, self.fps, self.threshold)
+        self.media_store.put_bytes(json.dumps({"cuts": cuts}).encode("utf-8"), ".json", source=cache_source)
+        with self._stats_lock:
+            self.stats["detected"] += 1
+        return cuts
+
+def main():
+    """Detect cuts in synthetic shots and snap a moment onto them"""
+    import time
+
+    if np is None:
+        print("⚠️ NumPy is not installed")
+        return
+
+    rng = np.random.default_rng(0)
+    fps = 4.0
+    shot_starts = [0, 37, 81, 140, 212, 300]
+
+    def synthetic_batches(seconds=600, batch_frames=256):
+        frames = []
+        for index in range(int(seconds * fps)):
+            shot = sum(1 for start in shot_starts if index / fps >= start)
+            base = (shot * 53) % 200
+            gradient = np.linspace(0, 40, 64 * 36) if shot % 2 else np.zeros(64 * 36)
+            frames.append(np.clip(base + gradient + rng.normal(0, 4, 64 * 36), 0, 255).astype(np.uint8))
+        for offset in range(0, len(frames), batch_frames):
+            yield np.stack(frames[offset:offset + batch_frames])
+
+    print("🎞️  Testing Scene Detection...")
+    batches = list(synthetic_batches())
+    start = time.perf_counter()
+    cuts = pick_cuts(frame_change_scores(iter(batches)), fps)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   Cuts: {cuts} (true shot starts {shot_starts[1:]}) in {elapsed_ms:.0f} ms for 10 min at {fps:.0f} fps")
+    moment = {"start_time": 79.5, "duration": 15, "end_time": 94.5}
+    print(f"   Moment 79.5-94.5s snapped to: {snap_moment(moment, cuts)}")
+
+if __name__ == "__main__":
+    main()
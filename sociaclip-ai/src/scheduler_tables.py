@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Scheduler Intelligence Tables
+Module-level, immutable scheduling intelligence shared by every IntelligentScheduler instance
+"""
+
+import json
+import os
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+SCHEDULER_TABLES_VERSION = 1
+
+# Built-in tables; frozen once at import and optionally replaced by a versioned data file
+_BUILTIN_TABLES = {
+    "platform_algorithms": {
+        "instagram": {
+            "algorithm_preference": "engagement_velocity",  # Fast early engagement
+            "golden_window": 60,  # minutes for maximum algorithm boost
+            "peak_algorithm_times": ["11:00", "14:00", "17:00", "20:00"],
+            "low_competition_windows": ["08:00", "10:00", "13:00", "16:00", "19:00"],
+            "engagement_decay": {
+                "0-1h": 1.0,    # 100% algorithm priority
+                "1-3h": 0.8,    # 80% algorithm priority  
+                "3-6h": 0.6,    # 60% algorithm priority
+                "6-24h": 0.3    # 30% algorithm priority
+            },
+            "viral_boost_threshold": 50  # viral score needed for algorithm boost
+        },
+        "tiktok": {
+            "algorithm_preference": "completion_rate",  # Focus on watch time
+            "golden_window": 120,  # minutes for FYP consideration
+            "peak_algorithm_times": ["18:00", "19:00", "20:00", "21:00", "22:00"],
+            "low_competition_windows": ["15:00", "17:00", "23:00"],
+            "engagement_decay": {
+                "0-2h": 1.0,
+                "2-4h": 0.9,
+                "4-8h": 0.7,
+                "8-24h": 0.4
+            },
+            "viral_boost_threshold": 40
+        },
+        "youtube_shorts": {
+            "algorithm_preference": "click_through_rate",
+            "golden_window": 180,  # minutes for Shorts shelf consideration
+            "peak_algorithm_times": ["14:00", "16:00", "18:00", "20:00"],
+            "low_competition_windows": ["10:00", "12:00", "15:00", "17:00"],
+            "engagement_decay": {
+                "0-3h": 1.0,
+                "3-6h": 0.85,
+                "6-12h": 0.7,
+                "12-48h": 0.5
+            },
+            "viral_boost_threshold": 60
+        },
+        "twitter": {
+            "algorithm_preference": "real_time_engagement",
+            "golden_window": 30,  # minutes for trending consideration
+            "peak_algorithm_times": ["09:00", "12:00", "15:00", "18:00"],
+            "low_competition_windows": ["10:00", "11:00", "14:00", "16:00"],
+            "engagement_decay": {
+                "0-30m": 1.0,
+                "30m-2h": 0.7,
+                "2h-6h": 0.4,
+                "6h-24h": 0.2
+            },
+            "viral_boost_threshold": 35
+        }
+    },
+    "audience_patterns": {
+        "fitness": {
+            "morning_motivation": {
+                "times": ["06:00", "07:00", "08:00"],
+                "engagement_multiplier": 1.4,
+                "content_preference": "motivational_workout"
+            },
+            "lunch_break": {
+                "times": ["12:00", "13:00"],
+                "engagement_multiplier": 1.2,
+                "content_preference": "quick_tips"
+            },
+            "evening_workout": {
+                "times": ["17:00", "18:00", "19:00"],
+                "engagement_multiplier": 1.6,
+                "content_preference": "workout_routines"
+            },
+            "night_inspiration": {
+                "times": ["21:00", "22:00"],
+                "engagement_multiplier": 1.3,
+                "content_preference": "transformation_stories"
+            }
+        },
+        "business": {
+            "morning_productivity": {
+                "times": ["07:00", "08:00", "09:00"],
+                "engagement_multiplier": 1.5,
+                "content_preference": "productivity_hacks"
+            },
+            "midday_break": {
+                "times": ["12:00", "13:00", "14:00"],
+                "engagement_multiplier": 1.3,
+                "content_preference": "success_stories"
+            },
+            "evening_learning": {
+                "times": ["19:00", "20:00", "21:00"],
+                "engagement_multiplier": 1.4,
+                "content_preference": "educational_content"
+            }
+        },
+        "technology": {
+            "morning_news": {
+                "times": ["08:00", "09:00"],
+                "engagement_multiplier": 1.3,
+                "content_preference": "tech_news"
+            },
+            "afternoon_reviews": {
+                "times": ["15:00", "16:00", "17:00"],
+                "engagement_multiplier": 1.4,
+                "content_preference": "product_reviews"
+            },
+            "evening_tutorials": {
+                "times": ["20:00", "21:00", "22:00"],
+                "engagement_multiplier": 1.2,
+                "content_preference": "how_to_guides"
+            }
+        }
+    },
+    "viral_timing_windows": {
+        "weekday_viral_windows": [
+            {"start": "11:00", "end": "13:00", "multiplier": 1.4, "reason": "Lunch scroll sessions"},
+            {"start": "17:00", "end": "19:00", "multiplier": 1.6, "reason": "Post-work entertainment"},
+            {"start": "20:00", "end": "22:00", "multiplier": 1.8, "reason": "Prime entertainment hours"}
+        ],
+        "weekend_viral_windows": [
+            {"start": "10:00", "end": "12:00", "multiplier": 1.3, "reason": "Weekend morning leisure"},
+            {"start": "14:00", "end": "16:00", "multiplier": 1.5, "reason": "Afternoon browsing"},
+            {"start": "19:00", "end": "23:00", "multiplier": 2.0, "reason": "Weekend entertainment peak"}
+        ],
+        "viral_content_boost": {
+            "high_viral": {"min_score": 70, "time_multiplier": 1.5},
+            "medium_viral": {"min_score": 50, "time_multiplier": 1.2},
+            "low_viral": {"min_score": 30, "time_multiplier": 1.0}
+        }
+    },
+    "content_type_optimization": {
+        "morning": {
+            "optimal_content": ["motivation", "tips", "education"],
+            "avoid_content": ["entertainment", "heavy_topics"],
+            "engagement_boost": 1.2
+        },
+        "midday": {
+            "optimal_content": ["quick_tips", "inspiration", "news"],
+            "avoid_content": ["long_form", "complex_tutorials"],
+            "engagement_boost": 1.1
+        },
+        "evening": {
+            "optimal_content": ["entertainment", "stories", "transformation"],
+            "avoid_content": ["work_related", "productivity"],
+            "engagement_boost": 1.4
+        },
+        "night": {
+            "optimal_content": ["inspiration", "relaxation", "reflection"],
+            "avoid_content": ["high_energy", "workout_intensive"],
+            "engagement_boost": 1.3
+        }
+    },
+    "engagement_hours": {
+        "instagram": {
+            "peak_hours": [11, 14, 17, 20],
+            "good_hours": [8, 10, 13, 16, 19, 21],
+            "low_hours": [0, 1, 2, 3, 4, 5, 6, 22, 23]
+        },
+        "tiktok": {
+            "peak_hours": [18, 19, 20, 21, 22],
+            "good_hours": [15, 16, 17, 23],
+            "low_hours": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
+        },
+        "youtube_shorts": {
+            "peak_hours": [14, 16, 18, 20],
+            "good_hours": [10, 12, 15, 17, 19, 21],
+            "low_hours": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 13, 22, 23]
+        },
+        "twitter": {
+            "peak_hours": [9, 12, 15, 18],
+            "good_hours": [8, 10, 11, 13, 14, 16, 17, 19],
+            "low_hours": [0, 1, 2, 3, 4, 5, 6, 7, 20, 21, 22, 23]
+        }
+    },
+    "niche_period_multipliers": {
+        "fitness": {"morning": 1.2, "evening": 1.3, "night": 1.1},
+        "business": {"morning": 1.4, "midday": 1.2, "evening": 1.1},
+        "technology": {"morning": 1.1, "afternoon": 1.3, "evening": 1.2}
+    },
+    "viral_hours": {
+        "instagram": [11, 14, 17, 20],
+        "tiktok": [18, 19, 20, 21],
+        "youtube_shorts": [16, 18, 20],
+        "twitter": [12, 15, 18]
+    },
+    # High-overlap hours (everyone posts here)
+    "overlap_busy_hours": {
+        "instagram": [12, 18, 20],
+        "tiktok": [19, 20, 21],
+        "youtube_shorts": [18, 20],
+        "twitter": [12, 18]
+    },
+    "competition_busy_hours": {
+        "instagram": [12, 17, 18, 20],
+        "tiktok": [19, 20, 21],
+        "youtube_shorts": [18, 20],
+        "twitter": [12, 15, 18]
+    }
+}
+
+_TABLE_CACHE: Dict[Optional[str], Mapping[str, Any]] = {}
+
+def freeze_table(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_table(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_table(item) for item in value)
+    return value
+
+def load_scheduler_tables(path: str = None) -> Mapping[str, Any]:
+    """Load the frozen scheduler tables, built once per source and shared afterwards
+    
+    With no path the built-in tables are used, unless SOCIACLIP_SCHEDULER_TABLES
+    points at a data file written by export_scheduler_tables().
+    """
+
+    path = path or os.environ.get("SOCIACLIP_SCHEDULER_TABLES") or None
+
+    tables = _TABLE_CACHE.get(path)
+    if tables is not None:
+        return tables
+
+    if path is None:
+        raw_tables = _BUILTIN_TABLES
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        version = data.get("version")
+        if version != SCHEDULER_TABLES_VERSION:
+            raise ValueError(
+                f"Scheduler tables file {path} has version {version}, expected {SCHEDULER_TABLES_VERSION}"
+            )
+
+        # Data files may override a subset of tables; the rest fall back to the built-ins
+        raw_tables = dict(_BUILTIN_TABLES)
+        raw_tables.update(data.get("tables", {}))
+
+    tables = freeze_table(raw_tables)
+    _TABLE_CACHE[path] = tables
+    return tables
+
+def export_scheduler_tables(path: str):
+    """Write the built-in tables to a versioned data file for editing"""
+
+    with open(path, 'w') as f:
+        json.dump({"version": SCHEDULER_TABLES_VERSION, "tables": _BUILTIN_TABLES}, f, indent=2)
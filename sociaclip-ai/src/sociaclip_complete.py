@@ -10,7 +10,12 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from trend_scanner import TrendScanner
 from enhanced_content_ai import EnhancedContentAI
+from caption_backend import build_caption_client
+from caption_cache import build_caption_cache
+from caption_search import build_caption_search
+from hashtag_performance import build_hashtag_bandit
 from intelligent_scheduler import IntelligentScheduler
+from timezone_scheduling import AudienceTimezoneScheduler
 
 class SociaClipComplete:
     """Complete SociaClip AI system with all advanced features integrated"""
@@ -20,8 +25,16 @@ class SociaClipComplete:
         
         # Initialize all components
         self.trend_scanner = TrendScanner(self.config.get("brave_api_key"))
-        self.content_ai = EnhancedContentAI()
+        self.content_ai = EnhancedContentAI(
+            build_caption_client(self.config.get("caption_backend")),
+            build_caption_cache(self.config.get("caption_cache")),
+            seed=self.config.get("generation_seed")
+        )
+        self.content_ai.configure_hashtag_limits(self.config.get("hashtag_limits"))
+        self.content_ai.hashtag_bandit = build_hashtag_bandit(self.config.get("hashtag_bandit"))
+        self.caption_search = build_caption_search(self.content_ai, self.config.get("candidate_search"))
         self.scheduler = IntelligentScheduler()
+        self.timezone_scheduler = AudienceTimezoneScheduler(self.scheduler)
         
         # Performance tracking
         self.session_stats = {
@@ -39,6 +52,37 @@ class SociaClipComplete:
             "posts_per_day": 5,
             "target_niches": ["fitness", "business", "technology", "comedy"],
             "platforms": ["instagram", "tiktok", "youtube_shorts", "twitter"],
+            "caption_backend": {
+                "type": "template",  # "http" (e.g. caption_backend.py serve) or "anthropic"
+                "max_batch_size": 16,
+                "max_concurrency": 4,
+                "timeout_seconds": 30,
+                "fallback": None  # optional second backend section for captions the first one misses
+            },
+            "generation_seed": None,  # None uses SOCIACLIP_RUN_SEED (default 0)
+            "candidate_search": {
+                "candidates": 1,  # > 1 generates that many captions per post and keeps the best
+                "top_k": 3,
+                "executor": "process",
+                "max_workers": 4
+            },
+            "hashtag_limits": {
+                "banned": [],
+                "max_uses_per_day": None  # e.g. 3 to rotate tags across the day's posts
+            },
+            "hashtag_bandit": {
+                "enabled": False,
+                "strategy": "thompson",  # or "ucb"
+                "path": "data/cache/hashtag_performance.json",
+                # JSONL of published posts with "impressions"/"engagements", ingested at startup
+                "results_path": "data/analytics/post_results.jsonl"
+            },
+            "audience_timezones": None,  # see AudienceTimezoneScheduler.schedule_for_config
+            "caption_cache": {
+                "enabled": True,
+                "path": "data/cache/caption_cache.json",
+                "max_entries": 5000
+            },
             "content_strategy": {
                 "viral_threshold": 50,
                 "engagement_style": "viral",
@@ -125,6 +169,14 @@ class SociaClipComplete:
             })
             print(f"❌ Workflow Error: {e}")
             return workflow_results
+            
+        finally:
+            # Keep whatever the bandit learned, even from a failed run
+            if self.content_ai.hashtag_bandit is not None:
+                self.content_ai.hashtag_bandit.store.save()
+            # Flush and stop the caption batching threads
+            if self.content_ai.caption_client is not None:
+                self.content_ai.caption_client.close()
     
     def _run_discovery_phase(self, niche: str = None) -> Dict:
         """Run intelligent content discovery phase"""
@@ -187,37 +239,42 @@ class SociaClipComplete:
         generated_posts = []
         platform_counts = {platform: 0 for platform in platforms}
         
+        # Assign videos to platforms, then generate the whole set as one batch
+        assignments = []
         video_index = 0
         for platform in platforms:
             for i in range(posts_per_platform):
                 if video_index >= len(selected_content):
                     break
                 
-                video = selected_content[video_index]
-                
-                try:
-                    print(f"   🎨 Generating {platform} content (viral score: {video.get('viral_score', 0)})")
-                    
-                    # Generate advanced post
-                    post = self.content_ai.generate_advanced_post(
-                        video, platform, niche or "mixed", self.config["content_strategy"]["engagement_style"]
-                    )
-                    
-                    # Add metadata
-                    post.update({
-                        "source_video": video,
-                        "niche": niche or video.get("discovered_niche", "mixed"),
-                        "generation_timestamp": datetime.now().isoformat()
-                    })
-                    
-                    generated_posts.append(post)
-                    platform_counts[platform] += 1
-                    video_index += 1
-                    
-                except Exception as e:
-                    print(f"   ⚠️  Warning: Generation error for {platform}: {e}")
-                    video_index += 1
-                    continue
+                assignments.append((selected_content[video_index], platform))
+                video_index += 1
+        
+        print(f"   🎨 Generating {len(assignments)} posts across {len(platforms)} platforms in one batch")
+        
+        engagement_style = self.config["content_strategy"]["engagement_style"]
+        batch = [(video, platform, niche or "mixed", engagement_style) for video, platform in assignments]
+        if self.caption_search is not None:
+            posts = self.caption_search.generate_posts(batch, raise_errors=False)
+        else:
+            posts = self.content_ai.generate_advanced_posts(batch, raise_errors=False)
+        if self.content_ai.caption_cache is not None:
+            self.content_ai.caption_cache.save()
+        
+        for (video, platform), post in zip(assignments, posts):
+            if "error" in post:
+                print(f"   ⚠️  Warning: Generation error for {platform}: {post['error']}")
+                continue
+            
+            # Add metadata
+            post.update({
+                "source_video": video,
+                "niche": niche or video.get("discovered_niche", "mixed"),
+                "generation_timestamp": datetime.now().isoformat()
+            })
+            
+            generated_posts.append(post)
+            platform_counts[platform] += 1
         
         results["generated_posts"] = generated_posts
         results["platform_distribution"] = platform_counts
@@ -240,7 +297,7 @@ class SociaClipComplete:
         print(f"   📅 Optimizing schedule for {len(generated_posts)} posts")
         
         # Generate optimal schedule
-        scheduled_posts = self.scheduler.generate_optimal_schedule(generated_posts, target_date)
+        scheduled_posts = self.timezone_scheduler.schedule_for_config(generated_posts, self.config, target_date)
         
         # Analyze scheduling results
         scheduling_analysis = self.scheduler.analyze_schedule_performance(scheduled_posts)
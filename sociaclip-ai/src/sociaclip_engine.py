@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from trend_scanner import TrendScanner
 from content_ai import ContentAI
+from hashtag_performance import HashtagPerformanceStore
+from utc_time import to_utc_epoch_minutes
+from publish_dispatcher import notify_dispatcher
 
 class SociaClipEngine:
     """Main engine for SociaClip AI automation"""
@@ -17,7 +20,12 @@ class SociaClipEngine:
     def __init__(self, config: Dict = None):
         self.config = config or self._get_default_config()
         self.trend_scanner = TrendScanner()
-        self.content_ai = ContentAI()
+        
+        # Engagement from published posts steers the trending hashtags
+        performance = self.config.get("hashtag_performance") or {}
+        self.hashtag_store = HashtagPerformanceStore(performance.get("path"))
+        self.hashtag_store.ingest_results(performance.get("results_path"))
+        self.content_ai = ContentAI(hashtag_store=self.hashtag_store)
         self.daily_posts = []
         
     def _get_default_config(self) -> Dict:
@@ -27,8 +35,14 @@ class SociaClipEngine:
             "target_niches": ["fitness", "business", "technology", "comedy"],
             "platforms": ["instagram", "tiktok", "youtube_shorts", "twitter"],
             "posting_schedule": ["09:00", "12:00", "15:00", "18:00", "21:00"],
+            "timezone": "UTC",  # Zone the posting_schedule times are expressed in
             "min_viral_score": 30,
-            "content_freshness_hours": 24
+            "content_freshness_hours": 24,
+            "hashtag_performance": {
+                "path": "data/cache/hashtag_performance.json",
+                # JSONL of published posts with "impressions"/"engagements", ingested at startup
+                "results_path": "data/analytics/post_results.jsonl"
+            }
         }
     
     def run_daily_workflow(self, niche: str = None) -> Dict:
@@ -85,6 +99,9 @@ class SociaClipEngine:
             results["errors"].append(str(e))
             print(f"❌ Error in workflow: {e}")
             return results
+            
+        finally:
+            self.hashtag_store.save()
     
     def _discover_content(self, niche: str = None) -> List[Dict]:
         """Discover trending content across niches"""
@@ -170,6 +187,7 @@ class SociaClipEngine:
         """Schedule posts for optimal engagement times"""
         
         schedule = self.config["posting_schedule"]
+        timezone_name = self.config.get("timezone", "UTC")
         scheduled_posts = []
         
         for i, post in enumerate(generated_posts):
@@ -179,6 +197,8 @@ class SociaClipEngine:
             posting_time = schedule[i]
             post["scheduled_time"] = posting_time
             post["scheduled_date"] = datetime.now().strftime("%Y-%m-%d")
+            post["scheduled_timezone"] = timezone_name
+            post["scheduled_utc_minute"] = to_utc_epoch_minutes(post["scheduled_date"], posting_time, timezone_name)
             post["status"] = "scheduled"
             
             scheduled_posts.append(post)
@@ -204,6 +224,10 @@ class SociaClipEngine:
             }, f, indent=2)
         
         print(f"   Saved {len(posts)} posts to {filepath}")
+        
+        # Wake a watching publish dispatcher; without one the file is loaded when it starts
+        if notify_dispatcher(filepath):
+            print("   Announced schedule to the publish dispatcher")
     
     def get_performance_summary(self, days: int = 7) -> Dict:
         """Get performance summary for recent posts"""
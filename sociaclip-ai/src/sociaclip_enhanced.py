@@ -10,7 +10,12 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from trend_scanner import TrendScanner
 from enhanced_content_ai import EnhancedContentAI
+from caption_backend import build_caption_client
+from caption_cache import build_caption_cache
+from caption_search import build_caption_search
+from hashtag_performance import build_hashtag_bandit
 from intelligent_scheduler import IntelligentScheduler
+from timezone_scheduling import AudienceTimezoneScheduler
 from video_processor import VideoProcessor
 
 class SociaClipEnhanced:
@@ -21,8 +26,16 @@ class SociaClipEnhanced:
         
         # Initialize all components
         self.trend_scanner = TrendScanner(self.config.get("brave_api_key"))
-        self.content_ai = EnhancedContentAI()
+        self.content_ai = EnhancedContentAI(
+            build_caption_client(self.config.get("caption_backend")),
+            build_caption_cache(self.config.get("caption_cache")),
+            seed=self.config.get("generation_seed")
+        )
+        self.content_ai.configure_hashtag_limits(self.config.get("hashtag_limits"))
+        self.content_ai.hashtag_bandit = build_hashtag_bandit(self.config.get("hashtag_bandit"))
+        self.caption_search = build_caption_search(self.content_ai, self.config.get("candidate_search"))
         self.scheduler = IntelligentScheduler()
+        self.timezone_scheduler = AudienceTimezoneScheduler(self.scheduler)
         self.video_processor = VideoProcessor()
         
     def _get_default_config(self) -> Dict:
@@ -32,11 +45,45 @@ class SociaClipEnhanced:
             "posts_per_day": 5,
             "target_niches": ["fitness", "business", "technology", "comedy"],
             "platforms": ["instagram", "tiktok", "youtube_shorts", "twitter"],
+            "caption_backend": {
+                "type": "template",  # "http" (e.g. caption_backend.py serve) or "anthropic"
+                "max_batch_size": 16,
+                "max_concurrency": 4,
+                "timeout_seconds": 30,
+                "fallback": None  # optional second backend section for captions the first one misses
+            },
+            "generation_seed": None,  # None uses SOCIACLIP_RUN_SEED (default 0)
+            "candidate_search": {
+                "candidates": 1,  # > 1 generates that many captions per post and keeps the best
+                "top_k": 3,
+                "executor": "process",
+                "max_workers": 4
+            },
+            "hashtag_limits": {
+                "banned": [],
+                "max_uses_per_day": None  # e.g. 3 to rotate tags across the day's posts
+            },
+            "hashtag_bandit": {
+                "enabled": False,
+                "strategy": "thompson",  # or "ucb"
+                "path": "data/cache/hashtag_performance.json",
+                # JSONL of published posts with "impressions"/"engagements", ingested at startup
+                "results_path": "data/analytics/post_results.jsonl"
+            },
+            "audience_timezones": None,  # see AudienceTimezoneScheduler.schedule_for_config
+            "caption_cache": {
+                "enabled": True,
+                "path": "data/cache/caption_cache.json",
+                "max_entries": 5000
+            },
             "video_processing": {
                 "enabled": True,
                 "max_clips_per_video": 3,
                 "preferred_clip_duration": 15,
-                "quality_threshold": 60
+                "quality_threshold": 60,
+                "max_videos": 3,  # top selected videos to process per run
+                "concurrency": 8,  # videos processed at once (requests per host are capped separately)
+                "source_files": {}  # video URL -> local copy of the footage, cut with ffmpeg
             },
             "content_enhancement": {
                 "use_video_insights": True,
@@ -118,6 +165,18 @@ class SociaClipEnhanced:
             })
             print(f"❌ Enhanced Workflow Error: {e}")
             return workflow_results
+            
+        finally:
+            # Keep whatever the bandit learned, even from a failed run
+            if self.content_ai.hashtag_bandit is not None:
+                self.content_ai.hashtag_bandit.store.save()
+            # Flush and stop the caption batching threads
+            if self.content_ai.caption_client is not None:
+                self.content_ai.caption_client.close()
+            # Exported clips are no longer in use: let the media store evict them again
+            processing_results = workflow_results["phases"].get("video_processing")
+            if processing_results:
+                self.video_processor.release_clips(processing_results["clips_ready_for_use"])
     
     def _run_enhanced_discovery(self, niche: str = None) -> Dict:
         """Run discovery with enhanced video selection"""
@@ -230,17 +289,33 @@ class SociaClipEnhanced:
         all_clips = []
         processing_summary = []
         
-        for video in selected_videos[:3]:  # Process top 3 videos
-            video_url = video.get("url")
-            if not video_url:
-                continue
-                
+        processing_config = self.config.get("video_processing", {})
+        videos_by_url = {}
+        for video in selected_videos[:processing_config.get("max_videos", 3)]:  # Process top videos
+            if video.get("url"):
+                videos_by_url.setdefault(video["url"], video)
+        
+        for video in videos_by_url.values():
+            print(f"   🎬 Processing: {video.get('title', 'Unknown')[:50]}...")
+        
+        # Local footage from the config, or attached to a discovered video as "source_file"
+        source_files = dict(processing_config.get("source_files") or {})
+        for video_url, video in videos_by_url.items():
+            if video.get("source_file"):
+                source_files.setdefault(video_url, video["source_file"])
+        
+        # Videos are processed concurrently; collect in completion order, report in selection order
+        processing_results = {}
+        for processing_result in self.video_processor.process_videos(
+            list(videos_by_url), concurrency=processing_config.get("concurrency", 8),
+            source_files=source_files
+        ):
+            processing_results[processing_result["video_url"]] = processing_result
+        
+        for video_url, video in videos_by_url.items():
+            processing_result = processing_results[video_url]
+            
             try:
-                print(f"   🎬 Processing: {video.get('title', 'Unknown')[:50]}...")
-                
-                # Process video with full analysis
-                processing_result = self.video_processor.process_video(video_url)
-                
                 if processing_result["processing_success"]:
                     clips = processing_result.get("clips_extracted", [])
                     
@@ -250,13 +325,16 @@ class SociaClipEnhanced:
                     all_clips.extend(enhanced_clips)
                     results["clips_by_video"][video_url] = enhanced_clips
                     
-                    processing_summary.append({
+                    summary = {
                         "video_url": video_url,
                         "title": video.get("title", ""),
                         "clips_extracted": len(clips),
                         "analysis_quality": processing_result.get("analysis_quality", 0),
                         "best_clip_potential": max([c.get("viral_potential", 0) for c in clips]) if clips else 0
-                    })
+                    }
+                    if processing_result.get("duplicate_of"):
+                        summary["duplicate_of"] = processing_result["duplicate_of"]
+                    processing_summary.append(summary)
                 else:
                     results["processing_errors"].append({
                         "video_url": video_url,
@@ -264,6 +342,7 @@ class SociaClipEnhanced:
                     })
                     
             except Exception as e:
+                self.video_processor.release_clips(processing_result.get("clips_extracted", []))
                 results["processing_errors"].append({
                     "video_url": video_url,
                     "error": str(e)
@@ -405,37 +484,39 @@ class SociaClipEnhanced:
         platforms = self.config["platforms"]
         enhanced_posts = []
         
-        clips_used = 0
-        for platform in platforms:
-            if clips_used >= len(clips):
-                break
-                
-            clip = clips[clips_used]
-            
-            try:
-                print(f"   🎨 Generating enhanced {platform} content from clip...")
-                
-                # Create enhanced post with video insights
-                post = self._generate_video_enhanced_post(clip, platform, niche)
-                enhanced_posts.append(post)
-                clips_used += 1
-                
-            except Exception as e:
-                print(f"   ⚠️ Warning: Generation error for {platform}: {e}")
+        # Pair top clips with platforms and generate them as one batch
+        assignments = list(zip(clips, platforms))
+        print(f"   🎨 Generating enhanced content for {len(assignments)} clips in one batch...")
+        
+        batch = [
+            (self._build_enhanced_video_data(clip), platform, niche, "viral")
+            for clip, platform in assignments
+        ]
+        if self.caption_search is not None:
+            posts = self.caption_search.generate_posts(batch, raise_errors=False)
+        else:
+            posts = self.content_ai.generate_advanced_posts(batch, raise_errors=False)
+        if self.content_ai.caption_cache is not None:
+            self.content_ai.caption_cache.save()
+        
+        for (clip, platform), post in zip(assignments, posts):
+            if "error" in post:
+                print(f"   ⚠️ Warning: Generation error for {platform}: {post['error']}")
                 continue
+            
+            enhanced_posts.append(self._attach_clip_metadata(post, clip))
         
         results["enhanced_posts"] = enhanced_posts
         return results
     
-    def _generate_video_enhanced_post(self, clip: Dict, platform: str, niche: str) -> Dict:
-        """Generate post enhanced with video processing insights"""
+    def _build_enhanced_video_data(self, clip: Dict) -> Dict:
+        """Create enhanced video data for content generation from clip insights"""
         
         # Extract insights from clip
         original_video = clip.get("original_video_metadata", {})
         processing_insights = clip.get("processing_insights", {})
         
-        # Create enhanced video data for content generation
-        enhanced_video_data = {
+        return {
             "title": original_video.get("title", ""),
             "description": clip.get("description", ""),
             "viral_score": clip.get("viral_potential", 0),
@@ -450,13 +531,10 @@ class SociaClipEnhanced:
                 "engagement_prediction": clip.get("engagement_prediction", {})
             }
         }
+    
+    def _attach_clip_metadata(self, post: Dict, clip: Dict) -> Dict:
+        """Enhance post with clip-specific information"""
         
-        # Generate advanced post with video insights
-        post = self.content_ai.generate_advanced_post(
-            enhanced_video_data, platform, niche, "viral"
-        )
-        
-        # Enhance post with clip-specific information
         post.update({
             "clip_source": clip,
             "video_enhanced": True,
@@ -483,7 +561,7 @@ class SociaClipEnhanced:
             return results
         
         # Generate optimal schedule with clip considerations
-        scheduled_posts = self.scheduler.generate_optimal_schedule(enhanced_posts, target_date)
+        scheduled_posts = self.timezone_scheduler.schedule_for_config(enhanced_posts, self.config, target_date)
         
         # Add clip-specific scheduling intelligence
         for post in scheduled_posts:
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - Timezone-Aware Scheduling Module
+Audience-region engagement lattices in UTC epoch minutes, blended for multi-region accounts
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from intelligent_scheduler import IntelligentScheduler
+from utc_time import (
+    MINUTES_PER_DAY, to_utc_epoch_minutes, format_local_time, utc_offset_minutes
+)
+
+LATTICE_STEP_MINUTES = 30
+SLOTS_PER_DAY = MINUTES_PER_DAY // LATTICE_STEP_MINUTES
+
+# Local-time lattices only depend on the shared scheduler tables and (platform, niche),
+# so one copy serves every tenant and timezone; per-zone UTC lattices are rotations.
+_LOCAL_LATTICE_CACHE: Dict[Tuple[int, str, str], Tuple[float, ...]] = {}
+
+class AudienceTimezoneScheduler:
+    """Schedules posts in UTC using engagement lattices weighted by audience timezone mix"""
+
+    def __init__(self, scheduler: IntelligentScheduler = None):
+        self.scheduler = scheduler or IntelligentScheduler()
+
+    def local_lattice(self, platform: str, niche: str) -> Tuple[float, ...]:
+        """Get the expected engagement for every local-time slot of the day"""
+
+        key = (id(self.scheduler.tables), platform, niche)
+        lattice = _LOCAL_LATTICE_CACHE.get(key)
+        if lattice is not None:
+            return lattice
+
+        audience_data = self.scheduler.audience_patterns.get(niche, self.scheduler.audience_patterns["fitness"])
+
+        # Strongest audience multiplier per "HH:MM" (matches _generate_time_options boosts)
+        audience_boosts = {}
+        for period, data in audience_data.items():
+            for time_str in data["times"]:
+                audience_boosts[time_str] = max(audience_boosts.get(time_str, 1.0), data["engagement_multiplier"])
+
+        values = []
+        for slot in range(SLOTS_PER_DAY):
+            minute = slot * LATTICE_STEP_MINUTES
+            time_str = f"{minute // 60:02d}:{minute % 60:02d}"
+            engagement = self.scheduler._calculate_base_engagement(minute // 60, platform, niche)
+            values.append(engagement * audience_boosts.get(time_str, 1.0))
+
+        lattice = tuple(values)
+        _LOCAL_LATTICE_CACHE[key] = lattice
+        return lattice
+
+    def utc_lattice(self, platform: str, niche: str, tz_name: str, target_date: str = None) -> List[float]:
+        """Rotate the shared local lattice into UTC slots for an audience in tz_name"""
+
+        local = self.local_lattice(platform, niche)
+        offset = utc_offset_minutes(tz_name, target_date)
+
+        return [
+            local[((slot * LATTICE_STEP_MINUTES + offset) % MINUTES_PER_DAY) // LATTICE_STEP_MINUTES]
+            for slot in range(SLOTS_PER_DAY)
+        ]
+
+    def blended_lattice(self, platform: str, niche: str, audience_mix: Dict[str, float],
+                        target_date: str = None) -> List[float]:
+        """Blend per-timezone UTC lattices by audience share"""
+
+        total_weight = sum(weight for weight in audience_mix.values() if weight > 0)
+        if total_weight <= 0:
+            return self.utc_lattice(platform, niche, "UTC", target_date)
+
+        blended = [0.0] * SLOTS_PER_DAY
+        for tz_name, weight in audience_mix.items():
+            if weight <= 0:
+                continue
+            share = weight / total_weight
+            for slot, value in enumerate(self.utc_lattice(platform, niche, tz_name, target_date)):
+                blended[slot] += value * share
+
+        return blended
+
+    def schedule_for_config(self, posts: List[Dict], config: Dict, target_date: str = None) -> List[Dict]:
+        """Schedule posts for a pipeline config
+
+        config["audience_timezones"] is the audience share per IANA timezone, e.g.
+        {"America/New_York": 0.6, "Europe/London": 0.4}; when set, posts go to the best
+        UTC slots for the blended audience, otherwise to the scheduler's local-time picks.
+        """
+
+        audience_mix = config.get("audience_timezones")
+        if audience_mix:
+            min_gap = config.get("scheduling_strategy", {}).get("minimum_gap_minutes", 30)
+            return self.schedule_posts(posts, audience_mix, target_date, min_gap)
+
+        return self.scheduler.generate_optimal_schedule(posts, target_date)
+
+    def slot_intelligence(self, epoch_minute: int, platform: str, niche: str, viral_score: int,
+                          audience_mix: Dict[str, float]) -> Dict:
+        """The scheduler's slot scores at each audience's local time, blended by audience share"""
+
+        weights = {tz_name: weight for tz_name, weight in audience_mix.items() if weight > 0} or {"UTC": 1.0}
+        total_weight = sum(weights.values())
+        dominant = max(weights, key=weights.get)
+
+        blended = {"viral_multiplier": 0.0, "audience_overlap": 0.0, "recommendation_score": 0.0}
+        competition_level = "medium"
+        for tz_name, weight in weights.items():
+            slot = self.scheduler._create_schedule_slot(
+                format_local_time(epoch_minute, tz_name), platform, niche, viral_score, "audience"
+            )
+            share = weight / total_weight
+            blended["viral_multiplier"] += slot.viral_multiplier * share
+            blended["audience_overlap"] += slot.audience_overlap * share
+            blended["recommendation_score"] += slot.recommendation_score * share
+            if tz_name == dominant:
+                competition_level = slot.competition_level
+
+        return {
+            "viral_multiplier": round(blended["viral_multiplier"], 3),
+            "audience_overlap": round(blended["audience_overlap"], 3),
+            "competition_level": competition_level,
+            "recommendation_score": int(round(blended["recommendation_score"]))
+        }
+
+    def schedule_posts(self, posts: List[Dict], audience_mix: Dict[str, float],
+                       target_date: str = None, min_gap_minutes: int = 30) -> List[Dict]:
+        """Assign each post the best free UTC slot for the account's audience mix"""
+
+        if not target_date:
+            target_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+        day_start = to_utc_epoch_minutes(target_date, "00:00", "UTC")
+        lattices = {}
+        taken_minutes = []
+        scheduled_posts = []
+
+        for post in posts:
+            platform = post.get("platform", "instagram")
+            niche = post.get("niche", "fitness")
+
+            key = (platform, niche)
+            if key not in lattices:
+                lattices[key] = self.blended_lattice(platform, niche, audience_mix, target_date)
+            lattice = lattices[key]
+
+            # Best free slot first, earliest wins on ties
+            ranked_slots = sorted(range(SLOTS_PER_DAY), key=lambda s: (-lattice[s], s))
+            chosen_slot = ranked_slots[0]
+            for slot in ranked_slots:
+                minute = slot * LATTICE_STEP_MINUTES
+                if all(abs(minute - taken) >= min_gap_minutes for taken in taken_minutes):
+                    chosen_slot = slot
+                    break
+
+            minute = chosen_slot * LATTICE_STEP_MINUTES
+            taken_minutes.append(minute)
+            epoch_minute = day_start + minute
+
+            scheduled_time = f"{minute // 60:02d}:{minute % 60:02d}"
+            scheduled_post = post.copy()
+            scheduled_post.update({
+                "scheduled_date": target_date,
+                "scheduled_time": scheduled_time,
+                "scheduled_timezone": "UTC",
+                "scheduled_utc_minute": epoch_minute,
+                "audience_local_times": {
+                    tz_name: format_local_time(epoch_minute, tz_name) for tz_name in audience_mix
+                },
+                "blended_engagement": round(lattice[chosen_slot], 3),
+                # Same shape as IntelligentScheduler.generate_optimal_schedule, for the pipelines' analytics
+                "scheduling_intelligence": {
+                    "expected_engagement": round(lattice[chosen_slot], 3),
+                    **self.slot_intelligence(epoch_minute, platform, niche, post.get("viral_score", 0), audience_mix),
+                    "algorithm_optimization": self.scheduler._get_algorithm_tips(platform, scheduled_time),
+                    "posting_strategy": self.scheduler._get_posting_strategy(
+                        platform, niche, post.get("viral_score", 0)
+                    )
+                }
+            })
+            scheduled_posts.append(scheduled_post)
+
+        scheduled_posts.sort(key=lambda x: x["scheduled_utc_minute"])
+
+        return scheduled_posts
+
+def main():
+    """Test the timezone-aware scheduling layer"""
+    tz_scheduler = AudienceTimezoneScheduler()
+
+    test_posts = [
+        {"platform": "instagram", "niche": "fitness", "viral_score": 85},
+        {"platform": "tiktok", "niche": "fitness", "viral_score": 45},
+        {"platform": "twitter", "niche": "technology", "viral_score": 35}
+    ]
+
+    # Account with a mostly US audience and a European segment
+    audience_mix = {"America/New_York": 0.5, "America/Los_Angeles": 0.3, "Europe/London": 0.2}
+
+    print("🌍 Testing Timezone-Aware Scheduling...")
+    scheduled_posts = tz_scheduler.schedule_posts(test_posts, audience_mix)
+
+    for post in scheduled_posts:
+        print(f"   {post['platform']:<12} {post['scheduled_time']} UTC -> "
+              f"{json.dumps(post['audience_local_times'])} "
+              f"(score {post['scheduling_intelligence']['recommendation_score']})")
+
+if __name__ == "__main__":
+    main()
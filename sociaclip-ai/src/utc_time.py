@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+SociaClip AI - UTC Time Utilities
+Conversions between naive "HH:MM" schedule strings, IANA timezones and UTC epoch minutes
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+MINUTES_PER_DAY = 1440
+
+def to_utc_epoch_minutes(date_str: str, time_str: str, tz_name: str = "UTC") -> int:
+    """Convert a local date and "HH:MM" time in tz_name to minutes since the UTC epoch"""
+
+    local_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+    local_dt = local_dt.replace(tzinfo=ZoneInfo(tz_name))
+
+    return int(local_dt.timestamp()) // 60
+
+def from_utc_epoch_minutes(epoch_minutes: int, tz_name: str = "UTC") -> datetime:
+    """Convert minutes since the UTC epoch to an aware datetime in tz_name"""
+
+    utc_dt = datetime.fromtimestamp(epoch_minutes * 60, tz=timezone.utc)
+    return utc_dt.astimezone(ZoneInfo(tz_name))
+
+def format_local_time(epoch_minutes: int, tz_name: str = "UTC") -> str:
+    """Format a UTC epoch minute as a local "HH:MM" string in tz_name"""
+
+    return from_utc_epoch_minutes(epoch_minutes, tz_name).strftime("%H:%M")
+
+def utc_offset_minutes(tz_name: str, date_str: Optional[str] = None) -> int:
+    """Get the UTC offset of tz_name in minutes, evaluated at local noon of date_str"""
+
+    if not date_str:
+        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    local_noon = datetime.strptime(f"{date_str} 12:00", "%Y-%m-%d %H:%M")
+    offset = local_noon.replace(tzinfo=ZoneInfo(tz_name)).utcoffset()
+
+    return int(offset.total_seconds()) // 60
+
+def post_utc_epoch_minutes(post: dict, default_tz: str = "UTC") -> Optional[int]:
+    """Resolve the UTC epoch minute a scheduled post should be published at"""
+
+    if post.get("scheduled_utc_minute") is not None:
+        return int(post["scheduled_utc_minute"])
+
+    date_str = post.get("scheduled_date")
+    time_str = post.get("scheduled_time")
+    if not date_str or not time_str:
+        return None
+
+    return to_utc_epoch_minutes(date_str, time_str, post.get("scheduled_timezone", default_tz))
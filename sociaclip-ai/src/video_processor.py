@@ -4,24 +4,83 @@ SociaClip AI - Video Processing Module
 Autonomous video download, analysis, and clip extraction without FFmpeg dependency
 """
 
+import functools
 import json
 import os
 import re
 import requests
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
-import tempfile
+from audio_moments import AudioMomentDetector
+from clip_extraction import ClipExtractor
+from media_download import StreamingDownloader
+from media_store import build_media_store
+from metadata_cache import build_metadata_cache
+from perceptual_hash import build_duplicate_index, image_dhash
+from scene_detection import SceneDetector, snap_moment
+
+class VideoAnalysisContext:
+    """Text analysis state of one video, shared by its analysis, moment and clip steps"""
+    
+    def __init__(self, video_info: Dict):
+        self.video_info = video_info
+        self.title = video_info.get("title", "").lower()
+        self._keyword_hits: Dict[str, bool] = {}
+        self._steps: Dict[str, object] = {}
+    
+    def matches(self, keywords: List[str]) -> List[str]:
+        """Keywords found in the lowered title (each keyword is searched for once per video)"""
+        
+        hits = self._keyword_hits
+        found = []
+        for keyword in keywords:
+            hit = hits.get(keyword)
+            if hit is None:
+                hit = hits[keyword] = keyword in self.title
+            if hit:
+                found.append(keyword)
+        return found
+
+def once_per_video(step):
+    """Compute a VideoProcessor analysis step once per VideoAnalysisContext and reuse the result"""
+    
+    @functools.wraps(step)
+    def wrapper(self, context: VideoAnalysisContext):
+        result = context._steps.get(step.__name__)
+        if result is None:
+            result = context._steps[step.__name__] = step(self, context)
+        return result
+    
+    return wrapper
 
 class VideoProcessor:
     """Autonomous video processing system with clip extraction and content analysis"""
     
     def __init__(self, config: Dict = None):
         self.config = config or self._get_default_config()
-        self.temp_dir = tempfile.mkdtemp()
+        # Shared, content-addressed: thumbnails survive across runs and processors
+        self.media_store = build_media_store(self.config.get("media_store"))
+        self.downloader = StreamingDownloader(self.config.get("download_chunk_kb", 1024) * 1024)
+        self.clip_extractor = ClipExtractor(self.media_store, self.config.get("clip_workers"))
+        self.audio_detector = AudioMomentDetector()
+        self.scene_detector = SceneDetector(self.media_store, max_workers=self.config.get("clip_workers"))
         self.supported_platforms = ["youtube", "tiktok", "instagram", "twitter"]
         
+        # Concurrent workers share these: at most per_host_limit requests in flight per host
+        self.per_host_limit = self.config.get("per_host_limit", 4)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self._local = threading.local()
+        
+        self.metadata_cache = build_metadata_cache(self.config.get("metadata_cache"))
+        # Thumbnail hashes of every video processed so far (shared through the database file)
+        self.duplicate_index = build_duplicate_index(self.config.get("duplicate_detection"))
+        
     def _get_default_config(self) -> Dict:
         """Get default configuration for video processing"""
         return {
@@ -31,13 +90,76 @@ class VideoProcessor:
             "quality_preference": "medium",  # low, medium, high
             "audio_analysis": True,
             "visual_analysis": True,
-            "clip_selection_strategy": "viral_moments"  # viral_moments, even_distribution, custom
+            "clip_selection_strategy": "viral_moments",  # viral_moments, even_distribution, custom
+            "per_host_limit": 4,  # concurrent requests per host in process_videos
+            "metadata_cache": {
+                "enabled": True,
+                "path": "data/cache/video_metadata.sqlite",
+                "ttl_hours": 168,
+                "negative_ttl_minutes": 60  # failed oEmbed lookups are retried after this
+            },
+            "media_store": {
+                "root": "data/media",
+                "max_mb": 2048  # least recently used files are evicted beyond this
+            },
+            "duplicate_detection": {
+                "enabled": True,
+                "path": "data/cache/thumbnail_hashes.sqlite",
+                "max_distance": 6  # differing dHash bits still counted as the same footage
+            },
+            "download_chunk_kb": 1024,  # per-worker download buffer; bounds memory regardless of file size
+            "clip_workers": None  # concurrent ffmpeg processes (None: one per core)
         }
     
-    def process_video(self, video_url: str, analysis_type: str = "full") -> Dict:
-        """Process video with autonomous analysis and clip extraction"""
+    def process_videos(self, video_urls: List[str], concurrency: int = 8,
+                       analysis_type: str = "full", source_files: Dict[str, str] = None) -> Iterator[Dict]:
+        """Process many videos concurrently, yielding each result as soon as it completes
+        
+        Metadata fetch, thumbnail download and analysis of different videos overlap;
+        requests to one host are still capped at per_host_limit. Duplicate URLs are
+        processed once. source_files maps URLs to local copies of their footage.
+        """
+        
+        source_files = source_files or {}
+        
+        unique_urls = list(dict.fromkeys(url for url in video_urls if url))
+        if not unique_urls:
+            return
+        
+        # One bulk lookup for every cached video instead of one query per worker;
+        # misses go straight to the fetch rather than querying the cache again
+        cached_info = {}
+        cache_checked = self.metadata_cache is not None
+        if cache_checked:
+            cache_keys = {url: self._canonical_video_key(url) for url in unique_urls}
+            cached = self.metadata_cache.get_many(key for key in cache_keys.values() if key)
+            cached_info = {url: self._info_from_cache(cached[key], url)
+                           for url, key in cache_keys.items() if key in cached}
+        
+        workers = max(1, min(concurrency, len(unique_urls)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-process") as pool:
+            futures = [
+                pool.submit(self.process_video, url, analysis_type, False, cached_info.get(url), cache_checked,
+                            source_files.get(url))
+                for url in unique_urls
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def process_video(self, video_url: str, analysis_type: str = "full", verbose: bool = True,
+                      video_info: Dict = None, cache_checked: bool = False, source_file: str = None) -> Dict:
+        """Process video with autonomous analysis and clip extraction (video_info skips the metadata fetch)
+        
+        cache_checked=True means the caller already missed the metadata cache for this URL.
+        source_file is a local copy of the video: it is cut, scene-detected and audio-analysed
+        with ffmpeg instead of downloading anything.
+        Extracted clip files stay pinned in the media store until passed to release_clips.
+        """
         
-        print(f"🎬 Processing video: {video_url}")
+        # Step output would interleave when videos are processed concurrently
+        log = print if verbose else (lambda *args: None)
+        
+        log(f"🎬 Processing video: {video_url}")
         
         results = {
             "video_url": video_url,
@@ -52,31 +174,59 @@ class VideoProcessor:
         
         try:
             # Step 1: Extract video information
-            print("   📊 Extracting video metadata...")
-            video_info = self._extract_video_info(video_url)
+            log("   📊 Extracting video metadata...")
+            if video_info is None:
+                video_info = self._extract_video_info(video_url, cache_checked)
             results["video_info"] = video_info
+            # Title text work is done once here and reused by every step and clip below
+            context = VideoAnalysisContext(video_info)
+            
+            # Re-uploads of footage already processed are skipped before anything else is downloaded
+            thumbnail_hash = self._check_duplicate(video_info)
+            if thumbnail_hash.get("duplicate_of"):
+                log(f"   ♻️ Duplicate of {thumbnail_hash['duplicate_of']}, skipping download and analysis")
+                results.update({
+                    "processing_success": True,
+                    "duplicate_of": thumbnail_hash["duplicate_of"],
+                    "content_analysis": {"thumbnail_analysis": thumbnail_hash},
+                    "processing_end": datetime.now().isoformat(),
+                    "clips_count": 0
+                })
+                return results
             
             # Step 2: Download video (if needed for processing)
-            print("   ⬇️ Preparing video for analysis...")
-            video_file = self._prepare_video_for_analysis(video_url, video_info)
+            log("   ⬇️ Preparing video for analysis...")
+            video_file = self._prepare_video_for_analysis(video_url, video_info, source_file)
             
             # Step 3: Analyze video content
-            print("   🔍 Analyzing video content...")
-            content_analysis = self._analyze_video_content(video_file, video_info)
+            log("   🔍 Analyzing video content...")
+            content_analysis = self._analyze_video_content(video_file, context, thumbnail_hash)
             results["content_analysis"] = content_analysis
             
+            # Thumbnail that could not be hashed up front
+            duplicate_of = (content_analysis.get("thumbnail_analysis") or {}).get("duplicate_of")
+            if duplicate_of:
+                log(f"   ♻️ Duplicate of {duplicate_of}, skipping clip extraction")
+                results.update({
+                    "processing_success": True,
+                    "duplicate_of": duplicate_of,
+                    "processing_end": datetime.now().isoformat(),
+                    "clips_count": 0
+                })
+                return results
+            
             # Step 4: Identify viral moments
-            print("   ⚡ Identifying viral moments...")
+            log("   ⚡ Identifying viral moments...")
             viral_moments = self._identify_viral_moments(video_file, content_analysis)
             results["viral_moments"] = viral_moments
             
             # Step 5: Extract optimal clips
-            print("   ✂️ Extracting optimal clips...")
-            clips = self._extract_clips(video_file, viral_moments, video_info)
+            log("   ✂️ Extracting optimal clips...")
+            clips = self._extract_clips(video_file, viral_moments, context)
             results["clips_extracted"] = clips
             
             # Step 6: Enhanced content analysis
-            print("   🧠 Generating enhanced content insights...")
+            log("   🧠 Generating enhanced content insights...")
             enhanced_analysis = self._generate_enhanced_analysis(content_analysis, clips)
             results["content_analysis"].update(enhanced_analysis)
             
@@ -87,21 +237,58 @@ class VideoProcessor:
                 "analysis_quality": self._calculate_analysis_quality(results)
             })
             
-            print(f"   ✅ Processing complete: {len(clips)} clips extracted")
+            log(f"   ✅ Processing complete: {len(clips)} clips extracted")
             return results
             
         except Exception as e:
+            # Nobody will use the clips of a failed job
+            self.release_clips(results["clips_extracted"])
             results.update({
                 "processing_success": False,
                 "error": str(e),
                 "processing_end": datetime.now().isoformat()
             })
-            print(f"   ❌ Processing error: {e}")
+            log(f"   ❌ Processing error: {e}")
             return results
         
         finally:
-            # Cleanup temporary files
-            self._cleanup_temp_files(video_file if 'video_file' in locals() else None)
+            # Unpin the media file so the store may evict it later
+            self._release_video_file(video_file if 'video_file' in locals() else None)
+    
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        """Get the request slots for a host"""
+        
+        slot = self._host_slots.get(host)
+        if slot is None:
+            with self._host_lock:
+                slot = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+        return slot
+    
+    def _session(self) -> requests.Session:
+        """This thread's keep-alive session"""
+        
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+    
+    def _http_get(self, url: str, timeout: float = 10) -> requests.Response:
+        """GET through this thread's session, within the host's request limit"""
+        
+        with self._host_slot(urlparse(url).netloc):
+            return self._session().get(url, timeout=timeout)
+    
+    def _download_media(self, url: str, suffix: str) -> str:
+        """Stream a media file into the media store, pinned until released (reused if already stored)"""
+        
+        media_path = self.media_store.lookup(url, pin=True)
+        if media_path:
+            return media_path
+        
+        # The host slot is held for the whole body, not just the headers
+        with self._host_slot(urlparse(url).netloc):
+            return self.downloader.download(self._session(), url, self.media_store, suffix, pin=True)
     
     def _detect_platform(self, url: str) -> str:
         """Detect video platform from URL"""
@@ -119,17 +306,57 @@ class VideoProcessor:
         else:
             return "unknown"
     
-    def _extract_video_info(self, video_url: str) -> Dict:
-        """Extract comprehensive video information"""
+    def _extract_video_info(self, video_url: str, cache_checked: bool = False) -> Dict:
+        """Extract comprehensive video information (cache_checked skips the cache lookup, not the store)"""
         
         platform = self._detect_platform(video_url)
         
+        if platform not in ("youtube", "tiktok"):
+            return self._extract_generic_info(video_url)
+        
+        cache_key = self._canonical_video_key(video_url, platform) if self.metadata_cache is not None else None
+        if cache_key and not cache_checked:
+            cached = self.metadata_cache.get(cache_key)
+            if cached is not None:
+                return self._info_from_cache(cached, video_url)
+        
         if platform == "youtube":
-            return self._extract_youtube_info(video_url)
-        elif platform == "tiktok":
-            return self._extract_tiktok_info(video_url)
+            video_info = self._extract_youtube_info(video_url)
         else:
-            return self._extract_generic_info(video_url)
+            video_info = self._extract_tiktok_info(video_url)
+        
+        if cache_key:
+            # Fallback and failed lookups are cached for the shorter negative TTL
+            self.metadata_cache.put(cache_key, video_info, negative=video_info.get("extraction_method") != "oembed")
+        
+        return video_info
+    
+    def _canonical_video_key(self, url: str, platform: str = None) -> Optional[str]:
+        """Cache key shared by every URL form of the same video"""
+        
+        platform = platform or self._detect_platform(url)
+        
+        if platform == "youtube":
+            video_id = self._extract_youtube_id(url)
+            return f"youtube:{video_id}" if video_id else None
+        elif platform == "tiktok":
+            match = re.search(r'/video/(\d+)', url)
+            if match:
+                return f"tiktok:{match.group(1)}"
+            parsed = urlparse(url)
+            return f"tiktok:{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+        
+        return None
+    
+    def _info_from_cache(self, cached: Dict, video_url: str) -> Dict:
+        """Video info from a cache entry, pointed at the URL being processed"""
+        
+        video_info = dict(cached)
+        video_info.pop("negative", None)
+        if "url" in video_info:
+            video_info["url"] = video_url
+        video_info["cache_hit"] = True
+        return video_info
     
     def _extract_youtube_info(self, url: str) -> Dict:
         """Extract YouTube video information using yt-dlp alternative approach"""
@@ -142,7 +369,7 @@ class VideoProcessor:
         try:
             # Try to get basic info via YouTube oEmbed API (no auth required)
             oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-            response = requests.get(oembed_url, timeout=10)
+            response = self._http_get(oembed_url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -198,7 +425,7 @@ class VideoProcessor:
         try:
             # Try to extract basic info from TikTok oEmbed
             oembed_url = f"https://www.tiktok.com/oembed?url={url}"
-            response = requests.get(oembed_url, timeout=10)
+            response = self._http_get(oembed_url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -235,14 +462,24 @@ class VideoProcessor:
             "extraction_method": "generic"
         }
     
-    def _prepare_video_for_analysis(self, url: str, video_info: Dict) -> Optional[str]:
+    def _prepare_video_for_analysis(self, url: str, video_info: Dict, source_file: str = None) -> Optional[str]:
         """Prepare video file for analysis (autonomous approach)"""
         
-        # For now, we'll work with metadata and thumbnails
-        # In a full implementation, this would handle video downloading
-        
         platform = video_info.get("provider", "unknown")
         
+        # Local footage supplied by the caller is used in place (release() ignores unpinned paths)
+        if source_file:
+            if os.path.isfile(source_file):
+                return source_file
+            print(f"   ⚠️ Source file not found, falling back to download: {source_file}")
+        
+        # Direct media URL (when the source provides one): stream the full video
+        if video_info.get("download_url"):
+            try:
+                return self._download_media(video_info["download_url"], ".mp4")
+            except Exception as e:
+                print(f"   ⚠️ Video download failed, using thumbnail: {e}")
+        
         if platform == "youtube":
             # For YouTube, we can work with thumbnails and metadata
             thumbnail_url = video_info.get("thumbnail_url")
@@ -253,43 +490,41 @@ class VideoProcessor:
         return None
     
     def _download_thumbnail(self, thumbnail_url: str, video_id: str) -> str:
-        """Download video thumbnail for visual analysis"""
+        """Get the video thumbnail for visual analysis (pinned in the media store until released)"""
         
         try:
-            response = requests.get(thumbnail_url, timeout=10)
-            if response.status_code == 200:
-                thumbnail_path = os.path.join(self.temp_dir, f"thumb_{video_id}.jpg")
-                with open(thumbnail_path, 'wb') as f:
-                    f.write(response.content)
-                return thumbnail_path
+            return self._download_media(thumbnail_url, ".jpg")
         except:
             pass
         
         return None
     
-    def _analyze_video_content(self, video_file: Optional[str], video_info: Dict) -> Dict:
+    def _analyze_video_content(self, video_file: Optional[str], context: VideoAnalysisContext,
+                               thumbnail_hash: Dict = None) -> Dict:
         """Analyze video content for viral potential and clip opportunities"""
         
+        video_info = context.video_info
         analysis = {
-            "content_type": self._classify_content_type(video_info),
-            "viral_indicators": self._identify_viral_indicators(video_info),
-            "engagement_triggers": self._identify_engagement_triggers(video_info),
-            "clip_opportunities": self._identify_clip_opportunities(video_info),
-            "content_themes": self._extract_content_themes(video_info),
+            "content_type": self._classify_content_type(context),
+            "viral_indicators": self._identify_viral_indicators(context),
+            "engagement_triggers": self._identify_engagement_triggers(context),
+            "clip_opportunities": self._identify_clip_opportunities(context),
+            "content_themes": self._extract_content_themes(context),
             "thumbnail_analysis": None
         }
         
         # If we have a thumbnail, analyze it
         if video_file and video_file.endswith('.jpg'):
-            analysis["thumbnail_analysis"] = self._analyze_thumbnail(video_file)
+            analysis["thumbnail_analysis"] = self._analyze_thumbnail(
+                video_file, self._duplicate_key(video_info), thumbnail_hash
+            )
         
         return analysis
     
-    def _classify_content_type(self, video_info: Dict) -> Dict:
+    @once_per_video
+    def _classify_content_type(self, context: VideoAnalysisContext) -> Dict:
         """Classify the type of content based on title and metadata"""
         
-        title = video_info.get("title", "").lower()
-        
         content_types = {
             "tutorial": ["how to", "tutorial", "guide", "step by step", "learn", "master"],
             "transformation": ["transformation", "before after", "progress", "journey", "results"],
@@ -305,7 +540,7 @@ class VideoProcessor:
         confidence_scores = {}
         
         for content_type, keywords in content_types.items():
-            matches = sum(1 for keyword in keywords if keyword in title)
+            matches = len(context.matches(keywords))
             if matches > 0:
                 detected_types.append(content_type)
                 confidence_scores[content_type] = matches / len(keywords)
@@ -318,11 +553,10 @@ class VideoProcessor:
             "confidence_scores": confidence_scores
         }
     
-    def _identify_viral_indicators(self, video_info: Dict) -> Dict:
+    @once_per_video
+    def _identify_viral_indicators(self, context: VideoAnalysisContext) -> Dict:
         """Identify indicators of viral potential"""
         
-        title = video_info.get("title", "").lower()
-        
         viral_keywords = {
             "urgency": ["now", "today", "urgent", "breaking", "immediately", "alert"],
             "curiosity": ["secret", "hidden", "revealed", "exposed", "truth", "mystery"],
@@ -336,7 +570,7 @@ class VideoProcessor:
         viral_score = 0
         
         for category, keywords in viral_keywords.items():
-            matches = [keyword for keyword in keywords if keyword in title]
+            matches = context.matches(keywords)
             if matches:
                 detected_indicators[category] = matches
                 viral_score += len(matches) * 10
@@ -347,14 +581,13 @@ class VideoProcessor:
             "has_high_potential": viral_score > 30
         }
     
-    def _identify_engagement_triggers(self, video_info: Dict) -> Dict:
+    @once_per_video
+    def _identify_engagement_triggers(self, context: VideoAnalysisContext) -> Dict:
         """Identify elements that trigger engagement"""
         
-        title = video_info.get("title", "").lower()
-        
         triggers = {
             "questions": ["?", "what", "why", "how", "when", "where", "which"],
-            "numbers": re.findall(r'\d+', title),
+            "numbers": re.findall(r'\d+', context.title),
             "lists": ["top", "best", "worst", "list", "things", "ways", "tips"],
             "comparison": ["vs", "versus", "better", "worse", "compare", "difference"],
             "time_based": ["day", "week", "month", "year", "minute", "hour", "seconds"],
@@ -370,7 +603,7 @@ class VideoProcessor:
                     detected_triggers[trigger_type] = indicators
                     engagement_score += len(indicators) * 5
             else:
-                matches = [indicator for indicator in indicators if indicator in title]
+                matches = context.matches(indicators)
                 if matches:
                     detected_triggers[trigger_type] = matches
                     engagement_score += len(matches) * 3
@@ -381,10 +614,11 @@ class VideoProcessor:
             "high_engagement_potential": engagement_score > 20
         }
     
-    def _identify_clip_opportunities(self, video_info: Dict) -> List[Dict]:
+    @once_per_video
+    def _identify_clip_opportunities(self, context: VideoAnalysisContext) -> List[Dict]:
         """Identify potential clip opportunities based on content analysis"""
         
-        content_type = self._classify_content_type(video_info)
+        content_type = self._classify_content_type(context)
         primary_type = content_type.get("primary_type", "general")
         
         # Define clip strategies based on content type
@@ -416,11 +650,10 @@ class VideoProcessor:
             {"type": "intro", "description": "Hook or introduction", "priority": "low"}
         ])
     
-    def _extract_content_themes(self, video_info: Dict) -> List[str]:
+    @once_per_video
+    def _extract_content_themes(self, context: VideoAnalysisContext) -> List[str]:
         """Extract content themes and topics"""
         
-        title = video_info.get("title", "").lower()
-        
         themes = {
             "fitness": ["workout", "exercise", "gym", "training", "fitness", "health"],
             "business": ["business", "entrepreneur", "money", "success", "career", "startup"],
@@ -432,18 +665,18 @@ class VideoProcessor:
         
         detected_themes = []
         for theme, keywords in themes.items():
-            if any(keyword in title for keyword in keywords):
+            if context.matches(keywords):
                 detected_themes.append(theme)
         
         return detected_themes or ["general"]
     
-    def _analyze_thumbnail(self, thumbnail_path: str) -> Dict:
-        """Analyze video thumbnail for visual indicators"""
+    def _analyze_thumbnail(self, thumbnail_path: str, video_key: str = None, thumbnail_hash: Dict = None) -> Dict:
+        """Analyze video thumbnail for visual indicators (thumbnail_hash: result of _check_duplicate)"""
         
         # This is a placeholder for thumbnail analysis
         # In a full implementation, this would use image analysis
         
-        return {
+        analysis = {
             "has_thumbnail": True,
             "analysis_method": "placeholder",
             "visual_appeal": "medium",
@@ -451,26 +684,97 @@ class VideoProcessor:
             "color_scheme": "unknown",
             "face_detection": "unknown"
         }
+        
+        # Perceptual hash: re-uploads under other URLs keep (nearly) the same thumbnail hash
+        if thumbnail_hash:
+            analysis.update(thumbnail_hash)
+        elif self.duplicate_index is not None:
+            analysis.update(self._hash_thumbnail(thumbnail_path, video_key or thumbnail_path))
+        
+        return analysis
+    
+    def _check_duplicate(self, video_info: Dict) -> Dict:
+        """Hash the oEmbed thumbnail and look it up before the video itself is downloaded"""
+        
+        thumbnail_url = video_info.get("thumbnail_url")
+        if self.duplicate_index is None or not thumbnail_url:
+            return {}
+        
+        thumbnail_path = self._download_thumbnail(thumbnail_url, video_info.get("video_id", "unknown"))
+        if not thumbnail_path:
+            return {}
+        try:
+            return self._hash_thumbnail(thumbnail_path, self._duplicate_key(video_info) or thumbnail_url)
+        finally:
+            self._release_video_file(thumbnail_path)
+    
+    def _hash_thumbnail(self, thumbnail_path: str, video_key: str) -> Dict:
+        """perceptual_hash of a thumbnail, plus duplicate_of/duplicate_distance when it is a re-upload"""
+        
+        try:
+            perceptual_hash = image_dhash(thumbnail_path)
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return {}
+        
+        result = {"perceptual_hash": f"{perceptual_hash:016x}"}
+        duplicate = self.duplicate_index.check_and_add(video_key, perceptual_hash)
+        if duplicate:
+            result["duplicate_of"], result["duplicate_distance"] = duplicate[1], duplicate[0]
+        return result
+    
+    def _duplicate_key(self, video_info: Dict) -> Optional[str]:
+        """Key a video is indexed under for duplicate detection"""
+        
+        return f"youtube:{video_info['video_id']}" if video_info.get("video_id") else video_info.get("url")
     
     def _identify_viral_moments(self, video_file: Optional[str], content_analysis: Dict) -> List[Dict]:
         """Identify potential viral moments in the video"""
         
-        # Since we don't have actual video processing yet, we'll predict based on content analysis
-        
         clip_opportunities = content_analysis.get("clip_opportunities", [])
         viral_indicators = content_analysis.get("viral_indicators", {})
+        preferred_duration = self.config.get("preferred_clip_duration_seconds", 15)
         
-        viral_moments = []
+        has_video = bool(video_file) and not video_file.endswith('.jpg')
+        
+        # Scene cuts are decoded on the detector's pool while the audio is analysed here
+        scene_future = self.scene_detector.submit(video_file) if has_video and self.scene_detector.available else None
+        
+        # With a video file, opportunities are placed on the loudest/most eventful audio peaks (best first)
+        audio_moments = []
+        if has_video and self.audio_detector.available:
+            try:
+                audio_moments = self.audio_detector.detect(video_file, preferred_duration, len(clip_opportunities))
+            except Exception as e:
+                print(f"   ⚠️ Audio analysis failed, using estimated timestamps: {e}")
+        
+        scene_cuts = []
+        if scene_future is not None:
+            try:
+                scene_cuts = scene_future.result()
+            except Exception as e:
+                print(f"   ⚠️ Scene detection failed, keeping unsnapped boundaries: {e}")
+        
+        # No audio peak for the rest: spread clips every 30 seconds
+        timings = audio_moments[:len(clip_opportunities)] + [
+            {"start_time": i * 30, "duration": preferred_duration, "end_time": i * 30 + preferred_duration}
+            for i in range(len(audio_moments), len(clip_opportunities))
+        ]
         
-        for i, opportunity in enumerate(clip_opportunities):
-            # Simulate moment identification based on content type
-            start_time = i * 30  # Spread clips every 30 seconds
-            duration = self.config["preferred_clip_duration_seconds"]
+        viral_moments = []
+        placed = []
+        
+        for i, (opportunity, timing) in enumerate(zip(clip_opportunities, timings)):
+            # Start and end on shot boundaries rather than mid-shot, never longer than preferred
+            snapped = snap_moment(timing, scene_cuts, max_duration=preferred_duration)
+            # Snapping moves boundaries by up to the tolerance, which may run into another clip
+            # (placed ones, or later ones that may keep their unsnapped timing)
+            if not any(snapped["start_time"] < other["end_time"] and other["start_time"] < snapped["end_time"]
+                       for other in placed + timings[i + 1:]):
+                timing = snapped
+            placed.append(timing)
             
             moment = {
-                "start_time": start_time,
-                "duration": duration,
-                "end_time": start_time + duration,
+                **timing,
                 "clip_type": opportunity.get("type", "highlight"),
                 "description": opportunity.get("description", "Viral moment"),
                 "priority": opportunity.get("priority", "medium"),
@@ -510,15 +814,16 @@ class VideoProcessor:
         
         return engagement_predictions.get(clip_type, {"likes": "medium", "shares": "medium", "comments": "medium"})
     
-    def _extract_clips(self, video_file: Optional[str], viral_moments: List[Dict], video_info: Dict) -> List[Dict]:
-        """Extract clip information (without actual video processing)"""
+    def _extract_clips(self, video_file: Optional[str], viral_moments: List[Dict],
+                       context: VideoAnalysisContext) -> List[Dict]:
+        """Extract clips: cut with ffmpeg when a video file is available, metadata only otherwise"""
         
         clips = []
         
         for i, moment in enumerate(viral_moments):
             clip = {
                 "clip_id": f"clip_{i+1}",
-                "source_video": video_info.get("url", "unknown"),
+                "source_video": context.video_info.get("url", "unknown"),
                 "start_time": moment["start_time"],
                 "duration": moment["duration"],
                 "end_time": moment["end_time"],
@@ -527,13 +832,18 @@ class VideoProcessor:
                 "viral_potential": moment["viral_potential"],
                 "engagement_prediction": moment["engagement_prediction"],
                 "suggested_platforms": self._suggest_platforms_for_clip(moment),
-                "content_optimization": self._optimize_clip_content(moment, video_info),
+                "content_optimization": self._optimize_clip_content(moment, context),
                 "extraction_status": "metadata_ready",  # Would be "extracted" with actual video processing
                 "file_path": None  # Would contain actual clip file path
             }
             
             clips.append(clip)
         
+        # All clips of the video are cut in parallel on the extractor's ffmpeg pool
+        if video_file and not video_file.endswith('.jpg') and self.clip_extractor.available:
+            for clip, extraction in zip(clips, self.clip_extractor.extract(video_file, viral_moments)):
+                clip.update(extraction)
+        
         return clips
     
     def _suggest_platforms_for_clip(self, moment: Dict) -> List[str]:
@@ -558,12 +868,12 @@ class VideoProcessor:
         
         return list(set(suggestions)) or ["instagram", "tiktok"]
     
-    def _optimize_clip_content(self, moment: Dict, video_info: Dict) -> Dict:
+    def _optimize_clip_content(self, moment: Dict, context: VideoAnalysisContext) -> Dict:
         """Generate content optimization suggestions for the clip"""
         
         return {
             "suggested_caption_style": self._suggest_caption_style(moment),
-            "hashtag_strategy": self._suggest_hashtag_strategy(moment, video_info),
+            "hashtag_strategy": self._suggest_hashtag_strategy(moment, context),
             "posting_time_preference": self._suggest_posting_time(moment),
             "engagement_tactics": self._suggest_engagement_tactics(moment)
         }
@@ -583,14 +893,14 @@ class VideoProcessor:
         
         return style_mapping.get(clip_type, "general_engaging")
     
-    def _suggest_hashtag_strategy(self, moment: Dict, video_info: Dict) -> Dict:
+    def _suggest_hashtag_strategy(self, moment: Dict, context: VideoAnalysisContext) -> Dict:
         """Suggest hashtag strategy for the clip"""
         
-        themes = self._extract_content_themes(video_info)
+        themes = self._extract_content_themes(context)
         viral_potential = moment.get("viral_potential", 50)
         
         strategy = {
-            "niche_hashtags": themes,
+            "niche_hashtags": list(themes),  # themes are shared by every clip of the video
             "viral_hashtags": ["#viral", "#trending"] if viral_potential > 60 else ["#fyp"],
             "platform_hashtags": ["#reels", "#shorts"],
             "total_recommended": 8
@@ -718,14 +1028,15 @@ class VideoProcessor:
         
         return sum(quality_factors)
     
-    def _cleanup_temp_files(self, video_file: Optional[str]):
-        """Clean up temporary files"""
+    def _release_video_file(self, video_file: Optional[str]):
+        """Release the media file used by a processing job"""
         
-        if video_file and os.path.exists(video_file):
-            try:
-                os.remove(video_file)
-            except:
-                pass
+        self.media_store.release(video_file)
+    
+    def release_clips(self, clips: List[Dict]):
+        """Unpin extracted clip files (kept from eviction until the caller is done with them)"""
+        
+        self.clip_extractor.release(clips)
 
 def main():
     """Test the video processing system"""
@@ -757,6 +1068,21 @@ def main():
             print(f"   ❌ Failed: {results.get('error', 'Unknown error')}")
         
         print("-" * 40)
+    
+    # Batch: sequential vs concurrent
+    batch_urls = [f"https://www.youtube.com/watch?v=dQw4w9WgXc{suffix}" for suffix in "QRSTUVWXYZ"]
+    
+    start = time.perf_counter()
+    for url in batch_urls:
+        processor.process_video(url, verbose=False)
+    sequential_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    completed = list(processor.process_videos(batch_urls, concurrency=8))
+    concurrent_seconds = time.perf_counter() - start
+    
+    print(f"\n⚡ Batch of {len(batch_urls)}: sequential {sequential_seconds:.2f}s, "
+          f"concurrent {concurrent_seconds:.2f}s ({len(completed)} results)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file